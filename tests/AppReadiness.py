@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-"
+"""Module contains application readiness probe used after app launch instead of fixed sleeps.
+
+Probe polls the device until all "ready" signals are on and no "not ready" signal is on, or deadline expires.
+Each poll is a single page source request: element signals are evaluated against the page snapshot and fall back
+to a live lookup only if locator can't be evaluated locally.
+"""
+import time
+from selenium.common.exceptions import WebDriverException
+from .Helpers import log
+from .PageSnapshot import PageSnapshot
+from .WaitEngine import DEFAULT_WAIT_ENGINE
+from .GlobalConstants import APP_READY_TIMEOUT
+
+IN_PROGRESS_INDICATOR_LOCATOR = "target.frontMostApp().mainWindow().activityIndicators()[\"In progress\"]"
+TAB_BAR_LOCATOR = "target.frontMostApp().tabBar()"
+
+
+class ElementPresentSignal(object):
+    """Signal is on when element is present on the screen.
+
+    :Usage:
+        ElementPresentSignal("target.frontMostApp().tabBar()", name="Tab bar present")
+    """
+
+    def __init__(self, locator, strategy="ios uiautomation", name=None):
+        self.locator = locator
+        self.strategy = strategy
+        self.name = name or "Element present: " + locator
+
+    def is_on(self, driver, sample):
+        """Checks signal against current sample.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - sample (ReadinessSample): Current page snapshot and previous page source.
+        """
+        nodes = sample.snapshot.resolve(self.strategy, self.locator)
+        if nodes is None:
+            if self.strategy == "ios uiautomation":
+                nodes = driver.find_elements_by_ios_uiautomation(self.locator)
+            elif self.strategy == "xpath":
+                nodes = driver.find_elements_by_xpath(self.locator)
+            else:
+                nodes = driver.find_elements_by_class_name(self.locator)
+        return len(nodes) > 0
+
+
+class ElementAbsentSignal(ElementPresentSignal):
+    """Signal is on when element is absent from the screen.
+
+    :Usage:
+        ElementAbsentSignal(IN_PROGRESS_INDICATOR_LOCATOR, name="No progress indicator")
+    """
+
+    def __init__(self, locator, strategy="ios uiautomation", name=None):
+        super(ElementAbsentSignal, self).__init__(locator, strategy, name or "Element absent: " + locator)
+
+    def is_on(self, driver, sample):
+        return not super(ElementAbsentSignal, self).is_on(driver, sample)
+
+
+class PageCurrentSignal(object):
+    """Signal is on when page object is on the screen, see BasePageObject.is_current(). A page which can't tell from
+    the snapshot doesn't block readiness.
+
+    :Usage:
+        PageCurrentSignal(BooksAllBooksPageObject, name="All books list selected")
+    """
+
+    def __init__(self, page_class, name=None):
+        self.page_class = page_class
+        self.name = name or "Page current: " + page_class.__name__
+
+    def is_on(self, driver, sample):
+        return self.page_class.is_current(driver, sample.snapshot) is not False
+
+
+class PageSourceStableSignal(object):
+    """Signal is on when page source is the same in two consecutive samples, i.e. nothing is moving or loading."""
+
+    name = "Page source stable"
+
+    def is_on(self, driver, sample):
+        return sample.previous_source is not None and sample.source == sample.previous_source
+
+
+class ReadinessSample(object):
+    """Single sample of the screen taken by the probe.
+
+    Attributes:
+        - source (str): Page source.
+        - snapshot (PageSnapshot): Parsed page source.
+        - previous_source (str): Page source of previous sample, None for the first sample.
+    """
+
+    def __init__(self, driver, source, previous_source):
+        self.source = source
+        self.snapshot = PageSnapshot(driver, source)
+        self.previous_source = previous_source
+
+
+class ReadinessResult(object):
+    """Result of waiting for the app to become ready.
+
+    Attributes:
+        - is_ready (bool): True if app became ready before deadline.
+        - time_to_ready (float): Time spent, seconds.
+        - polls (int): Number of samples taken.
+        - failed_signals (list): Names of signals preventing readiness at the last sample.
+    """
+
+    def __init__(self, is_ready, time_to_ready, polls, failed_signals):
+        self.is_ready = is_ready
+        self.time_to_ready = time_to_ready
+        self.polls = polls
+        self.failed_signals = failed_signals
+
+
+class AppReadinessProbe(object):
+    """Polls configurable signals until the app is ready.
+
+    Attributes:
+        - ready_signals (list): All of them should be on for the app to be ready.
+        - not_ready_signals (list): If any of them is on, the app is not ready.
+        - timeout (float): Deadline, seconds.
+        - history (list): ReadinessResult of each wait, e.g. time to ready of each app launch.
+    """
+
+    def __init__(self, ready_signals=None, not_ready_signals=None, timeout=APP_READY_TIMEOUT,
+                 wait_engine=DEFAULT_WAIT_ENGINE):
+        """Creates probe. By default the app is ready when tab bar is present, "In progress" indicator is absent
+        and page source doesn't change between two samples.
+
+        :Usage:
+            AppReadinessProbe(ready_signals=[ElementPresentSignal(TAB_BAR_LOCATOR)], timeout=20)
+        """
+        if ready_signals is None:
+            ready_signals = [ElementPresentSignal(TAB_BAR_LOCATOR, name="Tab bar present"),
+                             PageSourceStableSignal()]
+        if not_ready_signals is None:
+            not_ready_signals = [ElementPresentSignal(IN_PROGRESS_INDICATOR_LOCATOR,
+                                                      name="\"In progress\" indicator present")]
+        self.ready_signals = ready_signals
+        self.not_ready_signals = not_ready_signals
+        self.timeout = timeout
+        self.wait_engine = wait_engine
+        self.history = []
+
+    def wait_until_ready(self, driver, timeout=None):
+        """Polls the device until the app is ready or timeout expires.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - timeout (float): Overrides probe timeout, seconds.
+
+        :Returns:
+            ReadinessResult: Readiness and time to ready. Also added to history.
+
+        :Usage:
+            probe.wait_until_ready(self.driver).is_ready
+        """
+        log("Waiting for the app to become ready...")
+        samples = {"previous_source": None, "failed_signals": []}
+
+        def is_ready():
+            try:
+                sample = ReadinessSample(driver, driver.page_source, samples["previous_source"])
+            except (WebDriverException, SyntaxError):
+                samples["previous_source"] = None
+                samples["failed_signals"] = ["Page source unavailable"]
+                return False
+            samples["previous_source"] = sample.source
+            failed_signals = [signal.name for signal in self.not_ready_signals if signal.is_on(driver, sample)]
+            failed_signals += [signal.name for signal in self.ready_signals if not signal.is_on(driver, sample)]
+            samples["failed_signals"] = failed_signals
+            return not failed_signals
+
+        start = time.time()
+        wait = self.wait_engine.until(driver, is_ready, self.timeout if timeout is None else timeout)
+        result = ReadinessResult(not wait.timed_out, time.time() - start, wait.polls, samples["failed_signals"])
+        self.history.append(result)
+
+        if result.is_ready:
+            log("App is ready. Time to ready= %.2f s, polls= %s." % (result.time_to_ready, result.polls))
+        else:
+            log("App is not ready after %.2f s: %s" % (result.time_to_ready, ", ".join(result.failed_signals)))
+        return result
+
+
+DEFAULT_READINESS_PROBE = AppReadinessProbe()
+
+
+def verify_app_launched(driver):
+    """Checks if the app launched successfully.
+
+    Current application specific function. Waits until the app is ready: "In progress" indicator is gone,
+    tab bar is shown and the screen is stable. See AppReadinessProbe.
+
+    :Args:
+        - driver (WebDriver): Web driver object
+
+    :Returns:
+        bool: True if the app is ready.
+
+    :Usage:
+        verify_app_launched(self.driver)
+    """
+    log("Checking if app successfully started...")
+    is_started = DEFAULT_READINESS_PROBE.wait_until_ready(driver).is_ready
+    if is_started:
+        log("App is successfully launched.")
+    else:
+        log("Application didn't start successfully!")
+    return is_started
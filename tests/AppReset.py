@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-"
+"""Module contains tiered app state reset used before each test instead of unconditional relaunch.
+
+Tiers are tried from the cheapest to the most expensive, each one is verified by a readiness probe checking that
+the app is on its home page: Books tab with All list selected and no menu open. A view pushed inside Books tab hides
+the list's segmented control, so it doesn't pass the check either.
+    1. Already home - nothing to do if previous test ended on the home page.
+    2. Navigate home - tap Books tab, which also pops views pushed inside it, and select All list.
+    3. Activate app - send the app to background and back, e.g. to get rid of system dialogs, then navigate home.
+    4. Relaunch - close and launch the app.
+"""
+import time
+from .Helpers import log, navigate_to_home_page
+from .AppReadiness import AppReadinessProbe, ElementPresentSignal, PageCurrentSignal, PageSourceStableSignal, \
+    IN_PROGRESS_INDICATOR_LOCATOR
+from .PageObjects.Books.BooksPageObject import BooksPageObject, BooksAllBooksPageObject
+from .PageSnapshot import verify_selected
+from .GlobalConstants import APP_READY_TIMEOUT, HOME_PAGE_CHECK_TIMEOUT
+from .SessionState import get_session_state
+
+# selected "Books" tab means the app is on its home page
+HOME_PAGE_LOCATOR = "target.frontMostApp().tabBar().buttons().firstWithPredicate(\"name == 'Books' AND value == 1\")"
+# menus left open by a test
+ACTION_SHEET_LOCATOR = "target.frontMostApp().actionSheet()"
+POPOVER_LOCATOR = "target.frontMostApp().mainWindow().popover()"
+
+
+class ResetTier(object):
+    """Base class of reset tier.
+
+    Attributes:
+        - name (str): Tier name used in logs and statistics.
+        - verify_timeout (float): Max time to wait for the app to get ready after the tier is applied, seconds.
+    """
+    name = "Base"
+    verify_timeout = HOME_PAGE_CHECK_TIMEOUT
+
+    def apply(self, driver):
+        """Brings the app to home page, exceptions mean the tier failed."""
+        pass
+
+
+class AlreadyHomeTier(ResetTier):
+    """Does nothing, succeeds if the app is already on the home page. Nothing is expected to change, so the check
+    is short."""
+    name = "Already home"
+    verify_timeout = 1
+
+
+class NavigateHomeTier(ResetTier):
+    """Taps Books tab and selects All list."""
+    name = "Navigate home"
+
+    def apply(self, driver):
+        navigate_to_home_page(driver, verify_tap=verify_selected)
+        BooksPageObject(driver).open_all_books()
+
+
+class ActivateAppTier(ResetTier):
+    """Sends the app to background and brings it back, then taps Books tab and selects All list."""
+    name = "Activate app"
+
+    def apply(self, driver):
+        driver.background_app(0)
+        navigate_to_home_page(driver, verify_tap=verify_selected)
+        BooksPageObject(driver).open_all_books()
+
+
+class RelaunchTier(ResetTier):
+    """Closes and launches the app."""
+    name = "Relaunch"
+    verify_timeout = APP_READY_TIMEOUT
+
+    def apply(self, driver):
+        driver.close_app()
+        driver.launch_app()
+
+
+class ResetResult(object):
+    """Result of app reset.
+
+    Attributes:
+        - tier (str): Name of the tier which succeeded, None if all of them failed.
+        - elapsed (float): Time spent, seconds.
+    """
+
+    def __init__(self, tier, elapsed):
+        self.tier = tier
+        self.elapsed = elapsed
+
+    @property
+    def is_successful(self):
+        return self.tier is not None
+
+
+class AppResetManager(object):
+    """Resets app state trying the cheapest tier first.
+
+    Attributes:
+        - tiers (list): ResetTier objects in order they are tried.
+        - probe (AppReadinessProbe): Probe verifying the app is ready and on the home page.
+        - statistics (dict): Tier name -> {"attempts": int, "successes": int, "time": float}.
+    """
+
+    def __init__(self, tiers=None, probe=None):
+        """Creates manager.
+
+        :Usage:
+            AppResetManager(tiers=[NavigateHomeTier(), RelaunchTier()])
+        """
+        self.tiers = tiers or [AlreadyHomeTier(), NavigateHomeTier(), ActivateAppTier(), RelaunchTier()]
+        self.probe = probe or AppReadinessProbe(
+            ready_signals=[ElementPresentSignal(HOME_PAGE_LOCATOR, name="Books tab selected"),
+                           PageCurrentSignal(BooksAllBooksPageObject, name="All books list selected"),
+                           PageSourceStableSignal()],
+            not_ready_signals=[ElementPresentSignal(IN_PROGRESS_INDICATOR_LOCATOR,
+                                                    name="\"In progress\" indicator present"),
+                               ElementPresentSignal(ACTION_SHEET_LOCATOR, name="Action sheet open"),
+                               ElementPresentSignal(POPOVER_LOCATOR, name="Popover open")])
+        self.statistics = dict((tier.name, {"attempts": 0, "successes": 0, "time": 0.0}) for tier in self.tiers)
+
+    def reset(self, driver):
+        """Brings the app to home page using the cheapest tier that works.
+
+        :Args:
+            - driver (WebDriver): Web driver object
+
+        :Returns:
+            ResetResult: Tier which succeeded and time spent.
+
+        :Usage:
+            self.assertTrue(reset_manager.reset(self.driver).is_successful, "Failed to reset the app!")
+        """
+        start = time.time()
+        # page the app was navigated to is not known after reset, see Navigation
+        get_session_state(driver).current_page = None
+        for tier in self.tiers:
+            log("Trying to reset the app: " + tier.name + "...")
+            tier_start = time.time()
+            statistics = self.statistics[tier.name]
+            statistics["attempts"] += 1
+            try:
+                tier.apply(driver)
+                is_ready = self.probe.wait_until_ready(driver, tier.verify_timeout).is_ready
+            except Exception as e:
+                log("Reset tier " + tier.name + " failed: " + repr(e))
+                is_ready = False
+            statistics["time"] += time.time() - tier_start
+
+            if is_ready:
+                statistics["successes"] += 1
+                result = ResetResult(tier.name, time.time() - start)
+                log("App is reset: " + tier.name + ". Time taken= %.2f s." % result.elapsed)
+                return result
+
+        log("Failed to reset the app!")
+        return ResetResult(None, time.time() - start)
+
+    def log_statistics(self):
+        """Logs how many times each tier was tried and succeeded."""
+        for tier in self.tiers:
+            statistics = self.statistics[tier.name]
+            log("Reset tier \"%s\": attempts= %s, successes= %s, time= %.2f s." %
+                (tier.name, statistics["attempts"], statistics["successes"], statistics["time"]))
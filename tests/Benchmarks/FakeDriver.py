@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-"
+"""Module contains in-process fake of Appium server and application under test.
+
+FakeCommandExecutor takes place of RemoteConnection in a real Appium WebDriver, so page objects run the same client
+code as with a device, and every command they send is answered locally with configurable latency. The application
+is a set of screens built from recorded page sources. Locators are evaluated against the current screen with the
+same interpreter page snapshots use (see PageSnapshot), scrolling moves a window over the screen's list and taps are
+scripted with handlers.
+
+:Usage:
+    app = FakeApp({"all_books": FakeScreen.from_file("all_books", PAGE_SOURCES_FOLDER + "AllBooks.xml")})
+    app.on_tap("Favorites", switch_to_screen("favorites"))
+    driver = create_fake_driver(app, latency={"findElements": 0.05})
+"""
+import base64
+import time
+import uuid
+import xml.etree.cElementTree as ElementTree
+from appium import webdriver
+from ..PageSnapshot import PageSnapshot
+
+# codes of WebDriver JSON wire protocol responses
+STATUS_SUCCESS = 0
+STATUS_NO_SUCH_ELEMENT = 7
+STATUS_UNKNOWN_COMMAND = 9
+STATUS_STALE_ELEMENT_REFERENCE = 10
+STATUS_JAVASCRIPT_ERROR = 17
+
+# 1x1 transparent PNG served as a screenshot
+FAKE_SCREENSHOT = base64.b64encode(
+    "\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01\x08\x06\x00\x00\x00\x1f\x15\xc4\x89\x00\x00"
+    "\x00\rIDATx\x9cc\xf8\x0f\x00\x00\x01\x01\x00\x05\x18\xd8N\x00\x00\x00\x00IEND\xaeB`\x82")
+
+# locator strategies as sent by the client, mapped to PageSnapshot strategies
+STRATEGIES = {"-ios uiautomation": "ios uiautomation", "xpath": "xpath", "class name": "class_name"}
+
+
+class FakeScreen(object):
+    """Screen of the fake application.
+
+    If the screen has a list (collection or table view), only page_size of its cells are present in page source at
+    a time, like in a real application reusing cells. Scrolling moves that window.
+
+    Attributes:
+        - name (str): Screen name.
+        - root (Element): Page source of the screen, changed in place by scrolling and handlers.
+        - list_node (Element): List container, None if screen has no list.
+        - items (list): All cells of the list.
+        - page_size (int): Number of cells present in page source at a time.
+        - offset (int): Index of the first present cell.
+    """
+
+    def __init__(self, name, root, list_tag="UIACollectionView", page_size=6):
+        self.name = name
+        self.root = root
+        self.page_size = page_size
+        self.offset = 0
+        self.list_node = next(root.iter(list_tag), None)
+        self.items = list(self.list_node) if self.list_node is not None else []
+        self._show_items()
+
+    @classmethod
+    def from_file(cls, name, file_path, **kwargs):
+        """Creates screen from recorded page source file."""
+        return cls(name, ElementTree.parse(file_path).getroot(), **kwargs)
+
+    def _show_items(self):
+        if self.list_node is None:
+            return
+        self.list_node[:] = self.items[self.offset:self.offset + self.page_size]
+
+    def scroll(self, direction):
+        """Scrolls the list one page up or down.
+
+        :Returns:
+            bool: False if the list is already at the top or the bottom.
+        """
+        if direction == "down":
+            offset = min(self.offset + self.page_size, max(len(self.items) - self.page_size, 0))
+        elif direction == "up":
+            offset = max(self.offset - self.page_size, 0)
+        else:
+            raise ValueError("Unsupported scroll direction " + str(direction))
+        moved = offset != self.offset
+        self.offset = offset
+        self._show_items()
+        return moved
+
+    def show(self, offset, page_size=None):
+        """Moves the window of present cells, e.g. to start from the end of the list.
+
+        :Args:
+            - offset (int): Index of the first present cell, limited to the last page.
+            - page_size (int): New number of cells present at a time, unchanged if not set.
+        """
+        if page_size is not None:
+            self.page_size = page_size
+        self.offset = max(min(offset, len(self.items) - self.page_size), 0)
+        self._show_items()
+
+    def remove_item(self, node):
+        """Removes the list cell containing node, next cells move up."""
+        for item in self.items:
+            if item is node or any(child is node for child in item.iter()):
+                self.items.remove(item)
+                self.offset = min(self.offset, max(len(self.items) - self.page_size, 0))
+                self._show_items()
+                return item
+        return None
+
+
+def switch_to_screen(screen_name):
+    """Tap handler opening another screen."""
+    def handler(app, node):
+        app.current_screen = app.screens[screen_name]
+    return handler
+
+
+def remove_list_item(app, node):
+    """Tap handler removing the tapped cell from the list, e.g. un-favoriting a book on Favorites screen."""
+    app.current_screen.remove_item(node)
+
+
+class FakeApp(object):
+    """Application under test: screens, current screen and scripted reactions to taps.
+
+    Attributes:
+        - screens (dict): Screen name -> FakeScreen.
+        - current_screen (FakeScreen): Screen currently shown.
+        - version (int): Incremented on every change of the screen, cached lookups are dropped.
+    """
+
+    def __init__(self, screens, start_screen=None):
+        self.screens = screens
+        self._current_screen = screens[start_screen] if start_screen else list(screens.values())[0]
+        self._tap_handlers = {}
+        self.version = 0
+        self._snapshot = None
+        self._nodes = None
+
+    @property
+    def current_screen(self):
+        return self._current_screen
+
+    @current_screen.setter
+    def current_screen(self, screen):
+        self._current_screen = screen
+        self.changed()
+
+    def changed(self):
+        """Drops lookups cached for the previous state of the screen."""
+        self.version += 1
+        self._snapshot = None
+        self._nodes = None
+
+    def on_tap(self, element_name, handler, screen_name=None):
+        """Registers reaction to a tap on element with given name.
+
+        :Args:
+            - element_name (str): Value of "name" attribute of tapped element.
+            - handler (callable): Function taking FakeApp and tapped node.
+            - screen_name (str): If set, handler works on that screen only.
+
+        :Usage:
+            app.on_tap("favorites", remove_list_item, screen_name="favorites")
+        """
+        self._tap_handlers[(screen_name, element_name)] = handler
+
+    @property
+    def snapshot(self):
+        """Current screen as PageSnapshot, used to evaluate locators."""
+        if self._snapshot is None:
+            self._snapshot = PageSnapshot(None, root=self.current_screen.root)
+        return self._snapshot
+
+    def is_present(self, node):
+        """Checks that node is a part of the current screen, i.e. element isn't stale."""
+        if self._nodes is None:
+            self._nodes = set(self.current_screen.root.iter())
+        return node in self._nodes
+
+    def node_at(self, x, y):
+        """Returns the innermost visible node of the current screen containing the point, None if there is none."""
+        found = None
+        for node in self.current_screen.root.iter():
+            try:
+                left, top = float(node.get("x")), float(node.get("y"))
+                right, bottom = left + float(node.get("width")), top + float(node.get("height"))
+            except (TypeError, ValueError):
+                continue
+            if node.get("visible", "true") == "true" and left <= x < right and top <= y < bottom:
+                found = node
+        return found
+
+    def page_source(self):
+        return ElementTree.tostring(self.current_screen.root, encoding="utf-8")
+
+    def tap(self, node):
+        name = node.get("name")
+        handler = self._tap_handlers.get((self.current_screen.name, name)) or self._tap_handlers.get((None, name))
+        if handler is not None:
+            handler(self, node)
+            self.changed()
+
+    def scroll(self, direction):
+        moved = self.current_screen.scroll(direction)
+        self.changed()
+        return moved
+
+
+class FakeCommandExecutor(object):
+    """Stand-in for RemoteConnection answering WebDriver commands from FakeApp.
+
+    Attributes:
+        - app (FakeApp): Application under test.
+        - latency (dict): Command name -> delay before the answer, seconds.
+        - default_latency (float): Delay of commands missing from latency, seconds.
+        - commands (list): Names of all commands received.
+    """
+
+    # command name -> method answering it
+    _handlers = {
+        "newSession": "_new_session",
+        "quit": "_ok",
+        "implicitlyWait": "_ok",
+        "setScriptTimeout": "_ok",
+        "findElement": "_find_element",
+        "findElements": "_find_elements",
+        "findChildElement": "_find_child_element",
+        "findChildElements": "_find_child_elements",
+        "clickElement": "_click_element",
+        "clearElement": "_element_ok",
+        "sendKeysToElement": "_element_ok",
+        "getElementText": "_get_element_text",
+        "getElementAttribute": "_get_element_attribute",
+        "isElementDisplayed": "_is_element_displayed",
+        "isElementEnabled": "_is_element_enabled",
+        "getElementLocation": "_get_element_location",
+        "getElementSize": "_get_element_size",
+        "getPageSource": "_get_page_source",
+        "executeScript": "_execute_script",
+        "getWindowSize": "_get_window_size",
+        "getScreenOrientation": "_get_screen_orientation",
+        "setScreenOrientation": "_set_screen_orientation",
+        "screenshot": "_screenshot",
+        "touchAction": "_touch_action",
+        "multiAction": "_ok",
+        "background": "_ok",
+        "launchApp": "_ok",
+        "closeApp": "_ok",
+    }
+
+    def __init__(self, app, latency=None, default_latency=0.0, window_size=(375, 667)):
+        self.app = app
+        self.latency = latency or {}
+        self.default_latency = default_latency
+        self.window_size = window_size
+        self.orientation = "PORTRAIT"
+        self.commands = []
+        # Appium driver registers its command URLs here
+        self._commands = {}
+        self._nodes_by_id = {}
+        self._ids_by_node = {}
+
+    def execute(self, command, params):
+        self.commands.append(command)
+        delay = self.latency.get(command, self.default_latency)
+        if delay:
+            time.sleep(delay)
+        handler = self._handlers.get(command)
+        if handler is None:
+            return self._error(STATUS_UNKNOWN_COMMAND, "Command " + command + " is not supported by fake driver.")
+        return getattr(self, handler)(params or {})
+
+    @staticmethod
+    def _response(value=None):
+        return {"status": STATUS_SUCCESS, "value": value}
+
+    @staticmethod
+    def _error(status, message):
+        return {"status": status, "value": {"message": message}}
+
+    def _ok(self, params):
+        return self._response()
+
+    def _new_session(self, params):
+        response = self._response(params.get("desiredCapabilities", {}))
+        response["sessionId"] = str(uuid.uuid4())
+        return response
+
+    # ---------------- elements ----------------
+    def _element_id(self, node):
+        if node not in self._ids_by_node:
+            element_id = str(len(self._ids_by_node) + 1)
+            self._ids_by_node[node] = element_id
+            self._nodes_by_id[element_id] = node
+        return {"ELEMENT": self._ids_by_node[node]}
+
+    def _node(self, params):
+        """Returns node of element in params, None if the element is not on the screen any more."""
+        node = self._nodes_by_id.get(params.get("id"))
+        return node if node is not None and self.app.is_present(node) else None
+
+    def _resolve(self, params, root=None):
+        strategy = STRATEGIES.get(params.get("using"))
+        if strategy is None:
+            return None
+        if root is not None:
+            return PageSnapshot(None, root=root).resolve(strategy, params.get("value"))
+        return self.app.snapshot.resolve(strategy, params.get("value"))
+
+    def _find_elements(self, params, root=None):
+        nodes = self._resolve(params, root)
+        if nodes is None:
+            return self._error(STATUS_JAVASCRIPT_ERROR, "Locator can't be evaluated by fake driver.")
+        return self._response([self._element_id(node) for node in nodes])
+
+    def _find_element(self, params, root=None):
+        response = self._find_elements(params, root)
+        if response["status"] != STATUS_SUCCESS:
+            return response
+        if not response["value"]:
+            return self._error(STATUS_NO_SUCH_ELEMENT, "An element could not be located on the page.")
+        response["value"] = response["value"][0]
+        return response
+
+    def _find_child_elements(self, params):
+        node = self._node(params)
+        if node is None:
+            return self._stale()
+        return self._find_elements(params, root=node)
+
+    def _find_child_element(self, params):
+        node = self._node(params)
+        if node is None:
+            return self._stale()
+        return self._find_element(params, root=node)
+
+    def _stale(self):
+        return self._error(STATUS_STALE_ELEMENT_REFERENCE, "Element is no longer attached to the page.")
+
+    def _element_command(self, params, action):
+        node = self._node(params)
+        if node is None:
+            return self._stale()
+        return self._response(action(node))
+
+    def _element_ok(self, params):
+        return self._element_command(params, lambda node: None)
+
+    def _click_element(self, params):
+        return self._element_command(params, self.app.tap)
+
+    def _get_element_text(self, params):
+        return self._element_command(params, lambda node: node.get("value") or node.get("name") or "")
+
+    def _get_element_attribute(self, params):
+        return self._element_command(params, lambda node: node.get(params.get("name")))
+
+    def _is_element_displayed(self, params):
+        return self._element_command(params, lambda node: node.get("visible", "true") == "true")
+
+    def _is_element_enabled(self, params):
+        return self._element_command(params, lambda node: node.get("enabled", "true") == "true")
+
+    def _get_element_location(self, params):
+        return self._element_command(params, lambda node: {"x": int(node.get("x", 0)), "y": int(node.get("y", 0))})
+
+    def _get_element_size(self, params):
+        return self._element_command(params, lambda node: {"width": int(node.get("width", 0)),
+                                                           "height": int(node.get("height", 0))})
+
+    # ---------------- screen ----------------
+    def _get_page_source(self, params):
+        return self._response(self.app.page_source())
+
+    def _execute_script(self, params):
+        script = params.get("script", "")
+        args = params.get("args") or [{}]
+        if script == "mobile: scroll":
+            if args[0].get("toVisible"):
+                # elements of the fake are in page source only while shown
+                node = self._node({"id": args[0].get("element")})
+                return self._stale() if node is None else self._response()
+            self.app.scroll(args[0].get("direction"))
+            return self._response()
+        return self._error(STATUS_JAVASCRIPT_ERROR, "Script is not supported by fake driver: " + script)
+
+    def _touch_action(self, params):
+        """Taps the node under "tap" action, scrolls the list one page for every vertical swipe of the action chain:
+        finger up - down the list. Like iOS UIAutomation driver, moveTo coordinates are an offset from the press point.
+        """
+        y_start = None
+        for action in params.get("actions", []):
+            options = action.get("options") or {}
+            if action.get("action") == "tap":
+                node = self.app.node_at(options.get("x"), options.get("y"))
+                if node is not None:
+                    self.app.tap(node)
+            elif action.get("action") == "press":
+                y_start = options.get("y")
+            elif action.get("action") == "moveTo" and y_start is not None and options.get("y") is not None:
+                if options["y"]:
+                    self.app.scroll("down" if options["y"] < 0 else "up")
+                y_start = None
+        return self._response()
+
+    def _get_window_size(self, params):
+        width, height = self.window_size
+        if self.orientation == "LANDSCAPE":
+            width, height = height, width
+        return self._response({"width": width, "height": height})
+
+    def _get_screen_orientation(self, params):
+        return self._response(self.orientation)
+
+    def _set_screen_orientation(self, params):
+        self.orientation = params.get("orientation", self.orientation).upper()
+        return self._response()
+
+    def _screenshot(self, params):
+        return self._response(FAKE_SCREENSHOT)
+
+
+def create_fake_driver(app, latency=None, default_latency=0.0, window_size=(375, 667)):
+    """Creates Appium WebDriver talking to fake application instead of Appium server.
+
+    :Args:
+        - app (FakeApp): Application under test.
+        - latency (dict): Command name -> delay before the answer, seconds.
+        - default_latency (float): Delay of other commands, seconds.
+        - window_size (tuple): Screen width and height in portrait orientation.
+
+    :Returns:
+        WebDriver: Driver, its command_executor is FakeCommandExecutor.
+
+    :Usage:
+        driver = create_fake_driver(app, default_latency=0.05)
+    """
+    executor = FakeCommandExecutor(app, latency=latency, default_latency=default_latency, window_size=window_size)
+    return webdriver.Remote(executor, {"platformName": "iOS", "deviceName": "Fake device"})
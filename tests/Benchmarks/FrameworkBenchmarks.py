@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-"
+"""Module measures overhead of the framework itself, without a device.
+
+Page object operations run against FakeDriver serving recorded page sources of Books page. For every operation
+the number of commands sent to the "device" and wall time are reported. Command count doesn't depend on the machine,
+so it's compared with a baseline report to catch changes adding round trips before they get to the device farm.
+
+:Usage:
+    python -m tests.Benchmarks.FrameworkBenchmarks
+    python -m tests.Benchmarks.FrameworkBenchmarks --latency 0.05 --report /tmp/benchmarks.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+from .FakeDriver import FakeApp, FakeScreen, create_fake_driver, switch_to_screen, remove_list_item
+from ..GlobalConstants import BENCHMARK_REPORT_FILE
+from ..Helpers import scroll_down
+from ..Gestures import scroll_pages
+from ..Locators import bind_locator_profile, get_locator_profile, session_locators
+from ..Logger import LOGGER, WARNING
+from ..PageObjects.BaseObjects import BasePageElement
+from ..PageObjects.Books.BooksPageObject import BooksPageObject, BooksAllBooksPageObject, BooksFavouritesPageObject
+from ..Navigation import DEFAULT_NAVIGATION_GRAPH
+from ..PageSnapshot import PageSnapshot
+from ..Screenshots import DEFAULT_SCREENSHOT_SERVICE
+from ..ScrollSearch import scroll_to_top
+
+BENCHMARKS_FOLDER = os.path.dirname(os.path.realpath(__file__)) + "/"
+PAGE_SOURCES_FOLDER = BENCHMARKS_FOLDER + "PageSources/"
+# command counts of the current code, should be updated when a change reduces them
+BASELINE_FILE = BENCHMARKS_FOLDER + "benchmark_baseline.json"
+
+def create_books_app():
+    """Creates fake application: All and Favorites lists of Books page, un-favoriting removes a book from Favorites."""
+    app = FakeApp({"all_books": FakeScreen.from_file("all_books", PAGE_SOURCES_FOLDER + "AllBooks.xml"),
+                   "favorites": FakeScreen.from_file("favorites", PAGE_SOURCES_FOLDER + "FavoriteBooks.xml")},
+                  start_screen="all_books")
+    app.on_tap("All", switch_to_screen("all_books"))
+    app.on_tap("Favorites", switch_to_screen("favorites"))
+    app.on_tap("favorites", remove_list_item, screen_name="favorites")
+    return app
+
+
+def create_books_driver(latency=0.0):
+    """Creates fake driver of Books application, its session is bound to default (English phone) locator profile."""
+    driver = create_fake_driver(create_books_app(), default_latency=latency)
+    bind_locator_profile(driver, get_locator_profile())
+    return driver
+
+
+# ------------------ benchmarked operations -----------------------------------
+def find_element_live(driver):
+    BasePageElement(driver=driver, locator=session_locators(driver)["books_page.all"],
+                    element_name="AllBooksButton").locate()
+
+
+def find_element_in_snapshot(driver):
+    BasePageElement(driver=driver, locator=session_locators(driver)["books_page.all"], element_name="AllBooksButton",
+                    snapshot=PageSnapshot.capture(driver)).locate()
+
+
+def construct_books_page(driver):
+    books_page = BooksPageObject(driver)
+    for element in (books_page.all_books, books_page.favourites, books_page.recent_read, books_page.search_icon,
+                    books_page.more_menu_icon):
+        element.locate()
+
+
+def clean_favourites(driver):
+    BooksPageObject(driver).clean_favourites()
+
+
+def scroll_down_three_pages(driver):
+    scroll_down(driver, 3)
+
+
+def scroll_down_three_pages_chained(driver):
+    scroll_pages(driver, "down", 3, chained=True)
+
+
+def find_book_by_title_on_third_page(driver):
+    BooksPageObject(driver).find_book_by_title("Book 15", pages_to_search=3)
+
+
+def verify_catalogue_with_index(driver):
+    books_page = BooksPageObject(driver)
+    books_page.build_book_index()
+    for number in range(1, 31, 3):
+        books_page.is_book_present_on_list_by_name("Book %02d" % number)
+
+
+def check_book_absent(driver):
+    BooksPageObject(driver).is_book_present_on_list_by_name("Missing Book", expect_absent=True)
+
+
+def switch_book_lists(driver):
+    # two tests of the same session, the second one taps cached rectangles
+    for _ in range(2):
+        books_page = BooksPageObject(driver)
+        books_page.open_favorites()
+        books_page.open_all_books()
+
+
+def navigate_between_lists(driver):
+    # route from the detected current list, each hop verified by one snapshot
+    for _ in range(2):
+        DEFAULT_NAVIGATION_GRAPH.navigate(driver, BooksFavouritesPageObject)
+        DEFAULT_NAVIGATION_GRAPH.navigate(driver, BooksAllBooksPageObject)
+
+
+def scroll_to_top_of_long_list(driver):
+    # one book per page, the list is shown from its last page
+    app = driver.command_executor.app
+    app.current_screen.show(len(app.current_screen.items), page_size=1)
+    app.changed()
+    scroll_to_top(driver)
+
+
+# name, operation, iterations
+BENCHMARKS = [
+    ("find_element_live", find_element_live, 20),
+    ("find_element_in_snapshot", find_element_in_snapshot, 20),
+    ("construct_books_page", construct_books_page, 20),
+    ("clean_favourites", clean_favourites, 1),
+    ("scroll_down", scroll_down_three_pages, 20),
+    ("scroll_down_chained", scroll_down_three_pages_chained, 20),
+    ("find_book_by_title", find_book_by_title_on_third_page, 1),
+    ("verify_catalogue_with_index", verify_catalogue_with_index, 5),
+    ("check_book_absent", check_book_absent, 1),
+    ("scroll_to_top", scroll_to_top_of_long_list, 5),
+    ("switch_book_lists", switch_book_lists, 5),
+    ("navigate_between_lists", navigate_between_lists, 5),
+]
+
+
+def run_benchmark(operation, iterations, latency=0.0):
+    """Runs operation on a new fake application and driver each iteration.
+
+    :Args:
+        operation (callable): Function taking driver.
+        iterations (int): Number of runs.
+        latency (float): Delay of every command, seconds.
+
+    :Returns:
+        dict: Mean wall time, mean number of commands in total and by command name.
+    """
+    wall_time = 0.0
+    commands = Counter()
+    for _ in range(iterations):
+        driver = create_books_driver(latency)
+        executor = driver.command_executor
+        del executor.commands[:]
+        start = time.time()
+        operation(driver)
+        wall_time += time.time() - start
+        commands.update(executor.commands)
+    DEFAULT_SCREENSHOT_SERVICE.flush()
+    return {"iterations": iterations,
+            "wall_ms": round(wall_time * 1000.0 / iterations, 2),
+            "commands": round(float(sum(commands.values())) / iterations, 2),
+            "commands_by_name": dict((name, round(float(count) / iterations, 2)) for name, count in commands.items())}
+
+
+def find_regressions(report, baseline):
+    """Returns benchmarks sending more commands than in baseline report, (name, baseline, current)."""
+    regressions = []
+    for name, result in sorted(report.items()):
+        if name in baseline and result["commands"] > baseline[name]["commands"]:
+            regressions.append((name, baseline[name]["commands"], result["commands"]))
+    return regressions
+
+
+def run_benchmarks(latency=0.0, report_file=BENCHMARK_REPORT_FILE, baseline_file=BASELINE_FILE):
+    """Runs all benchmarks, saves report and compares it with baseline.
+
+    :Returns:
+        bool: False if some benchmark sends more commands than in baseline.
+    """
+    console_level = LOGGER.console_level
+    LOGGER.console_level = WARNING
+    try:
+        report = dict((name, run_benchmark(operation, iterations, latency))
+                      for name, operation, iterations in BENCHMARKS)
+    finally:
+        LOGGER.console_level = console_level
+
+    folder = os.path.dirname(report_file)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+    for name, _, _ in BENCHMARKS:
+        LOGGER.info("%s: %s commands, %s ms %s", name, report[name]["commands"], report[name]["wall_ms"],
+                    json.dumps(report[name]["commands_by_name"], sort_keys=True))
+    LOGGER.info("Benchmark report saved to %s", report_file)
+
+    if baseline_file is None:
+        return True
+    with open(baseline_file, 'r') as f:
+        regressions = find_regressions(report, json.load(f))
+    for name, baseline_commands, commands in regressions:
+        LOGGER.error("%s sends %s commands, baseline %s.", name, commands, baseline_commands)
+    return not regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Framework overhead benchmarks against fake driver.")
+    parser.add_argument("--latency", type=float, default=0.0, help="delay of every command, seconds")
+    parser.add_argument("--report", default=BENCHMARK_REPORT_FILE, help="JSON report file")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="previous JSON report, fails if command count grew")
+    arguments = parser.parse_args()
+    passed = run_benchmarks(arguments.latency, arguments.report, arguments.baseline)
+    LOGGER.flush()
+    sys.exit(0 if passed else 1)
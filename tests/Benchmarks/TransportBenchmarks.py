@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-"
+"""Module measures per-command overhead of HTTP transports against a local stand-in for Appium server.
+
+Stand-in server answers every WebDriver request at once with a small JSON response, so measured time is the cost of
+the transport itself: connection setup, request writing and response parsing. Setup of each new connection is delayed
+to model a remote Appium host, loopback connections are almost free. Server closes connections after a number of
+requests, like proxies and Appium do with idle ones, so pooled connections have to be replaced.
+
+Retry check runs against a server dropping connections without an answer: requests safe to repeat are retried on a
+new connection, a POST command is sent once and fails.
+
+:Usage:
+    python -m tests.Benchmarks.TransportBenchmarks
+    python -m tests.Benchmarks.TransportBenchmarks --commands 2000 --connect-delay 0.05
+"""
+import argparse
+import httplib
+import json
+import socket
+import threading
+import time
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from SocketServer import ThreadingMixIn
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from ..HttpTransport import PooledConnection
+from ..Logger import LOGGER
+
+SESSION_ID = "00000000-0000-0000-0000-000000000000"
+# connection setup time of a remote Appium host: TCP handshake over a few ms RTT
+TRANSPORT_BENCHMARK_CONNECT_DELAY = 0.005
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StandInServer(object):
+    """Local HTTP/1.1 server answering WebDriver requests with success.
+
+    Attributes:
+        - delay (float): Time to "process" each request, seconds.
+        - connect_delay (float): Time to set up each connection, seconds.
+        - requests_per_connection (int): Connection is closed by the server after this number of requests.
+        - drop_after (int): If set, the request after this number of answered ones is read and its connection is
+            closed without an answer.
+        - connections (int): Number of connections accepted.
+        - dropped (int): Number of requests dropped.
+        - received (dict): HTTP method -> number of requests received, dropped ones included.
+        - url (str): Server URL. Set by start().
+    """
+
+    def __init__(self, delay=0.0, connect_delay=0.0, requests_per_connection=100, drop_after=None):
+        self.delay = delay
+        self.connect_delay = connect_delay
+        self.requests_per_connection = requests_per_connection
+        self.drop_after = drop_after
+        self.connections = 0
+        self.dropped = 0
+        self.received = {}
+        self.url = None
+        self._server = None
+
+    def start(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # response is written at once, like Appium does, so server side doesn't add Nagle's delays
+            wbufsize = -1
+
+            def setup(self):
+                BaseHTTPRequestHandler.setup(self)
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                stand_in.connections += 1
+                self.requests = 0
+                if stand_in.connect_delay:
+                    time.sleep(stand_in.connect_delay)
+
+            def _answer(self):
+                length = int(self.headers.getheader('content-length') or 0)
+                if length:
+                    self.rfile.read(length)
+                stand_in.received[self.command] = stand_in.received.get(self.command, 0) + 1
+                if stand_in.drop_after is not None and self.requests >= stand_in.drop_after:
+                    stand_in.dropped += 1
+                    self.close_connection = 1
+                    return
+                if stand_in.delay:
+                    time.sleep(stand_in.delay)
+                self.requests += 1
+                data = json.dumps({"sessionId": SESSION_ID, "status": 0, "value": []})
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                if self.requests >= stand_in.requests_per_connection:
+                    self.send_header("Connection", "close")
+                    self.close_connection = 1
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_DELETE = _answer
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = "http://127.0.0.1:%s/wd/hub" % self._server.server_port
+        thread = threading.Thread(target=self._server.serve_forever, name="StandInServer")
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run_commands(connection, commands):
+    """Sends commands alternating GET and POST requests, returns mean time per command, ms."""
+    start = time.time()
+    for i in range(commands):
+        if i % 2:
+            connection.execute(Command.FIND_ELEMENTS,
+                               {"sessionId": SESSION_ID, "using": "xpath", "value": "//UIAButton"})
+        else:
+            connection.execute(Command.GET_SCREEN_ORIENTATION, {"sessionId": SESSION_ID})
+    return (time.time() - start) * 1000.0 / commands
+
+
+# name, connection factory
+TRANSPORTS = [
+    ("selenium", lambda url: RemoteConnection(url)),
+    ("selenium_keep_alive", lambda url: RemoteConnection(url, keep_alive=True)),
+    ("pooled", lambda url: PooledConnection(url)),
+]
+
+
+def run_benchmarks(commands=1000, server_delay=0.0, connect_delay=TRANSPORT_BENCHMARK_CONNECT_DELAY,
+                   requests_per_connection=100):
+    """Runs the same commands over every transport.
+
+    :Returns:
+        dict: Transport name -> mean ms per command, connections accepted by server, transport statistics.
+    """
+    report = {}
+    for name, create in TRANSPORTS:
+        server = StandInServer(server_delay, connect_delay, requests_per_connection).start()
+        try:
+            connection = create(server.url)
+            mean_ms = run_commands(connection, commands)
+            report[name] = {"mean_ms": round(mean_ms, 3), "server_connections": server.connections}
+            if isinstance(connection, PooledConnection):
+                report[name]["statistics"] = connection.statistics.to_dict()
+                connection.close()
+        finally:
+            server.stop()
+        LOGGER.info("%s: %.3f ms per command, %s connections %s", name, report[name]["mean_ms"],
+                    report[name]["server_connections"], json.dumps(report[name].get("statistics", {}),
+                                                                   sort_keys=True))
+    return report
+
+
+def run_retry_check(commands=100, drop_after=10):
+    """Sends GET commands to a server dropping every connection after drop_after answers, then a POST command to
+    a connection which is dropped.
+
+    :Returns:
+        dict: Statistics of the GET commands, number of times the POST command reached the server and whether it
+        failed. POST must reach the server once: it could have been executed before the connection was dropped.
+    """
+    server = StandInServer(drop_after=drop_after).start()
+    try:
+        connection = PooledConnection(server.url)
+        for _ in range(commands):
+            connection.execute(Command.GET_SCREEN_ORIENTATION, {"sessionId": SESSION_ID})
+        report = {"get_commands": commands, "dropped": server.dropped, "statistics": connection.statistics.to_dict()}
+        posts_received = server.received.get("POST", 0)
+        server.drop_after = 0
+        try:
+            connection.execute(Command.CLICK_ELEMENT, {"sessionId": SESSION_ID, "id": "1"})
+            report["post_failed"] = False
+        except (httplib.HTTPException, socket.error):
+            report["post_failed"] = True
+        report["post_sent"] = server.received.get("POST", 0) - posts_received
+        connection.close()
+    finally:
+        server.stop()
+    LOGGER.info("retry check: %s", json.dumps(report, sort_keys=True))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP transport overhead against local stand-in server.")
+    parser.add_argument("--commands", type=int, default=1000, help="number of commands per transport")
+    parser.add_argument("--server-delay", type=float, default=0.0, help="server processing time, seconds")
+    parser.add_argument("--connect-delay", type=float, default=TRANSPORT_BENCHMARK_CONNECT_DELAY,
+                        help="connection setup time, seconds")
+    parser.add_argument("--requests-per-connection", type=int, default=100,
+                        help="server closes connection after this number of requests")
+    arguments = parser.parse_args()
+    run_benchmarks(arguments.commands, arguments.server_delay, arguments.connect_delay,
+                   arguments.requests_per_connection)
+    run_retry_check()
+    LOGGER.flush()
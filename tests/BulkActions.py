@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-"
+"""Module contains bulk element actions: one action applied to every element matching a locator.
+
+Element list is fetched once and the action is applied to each element of it. The list is fetched again only when
+it has changed: an element became stale, or the action removes elements from the screen (e.g. un-favoriting books
+on Favorites list), in which case the list is re-fetched after each pass until it's empty.
+
+:Usage:
+    summary = tap_all(self.driver, locator, removes_elements=True)
+    if summary.remaining:
+        self.fail("Some books are still favorite!")
+"""
+import time
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from .GlobalConstants import BULK_ACTION_LIMIT
+from .Logger import LOGGER
+
+
+class BulkActionSummary(object):
+    """What bulk action did.
+
+    Attributes:
+        - name (str): Action name.
+        - acted (int): Number of elements action was applied to.
+        - failed (int): Number of elements action failed on.
+        - queries (int): Number of element list requests.
+        - remaining (int): Number of matching elements left after the action, for actions removing elements.
+        - results (list): Values returned by action, in order of elements.
+        - elapsed (float): Time spent, seconds.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.acted = 0
+        self.failed = 0
+        self.queries = 0
+        self.remaining = 0
+        self.results = []
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return "BulkActionSummary(%s: acted= %s, failed= %s, queries= %s, remaining= %s, time= %.2f s)" % \
+               (self.name, self.acted, self.failed, self.queries, self.remaining, self.elapsed)
+
+
+def find_live_elements(driver, strategy, locator):
+    """Sends a single find request using strategy and locator."""
+    if strategy == "ios uiautomation":
+        return driver.find_elements_by_ios_uiautomation(locator)
+    elif strategy == "xpath":
+        return driver.find_elements_by_xpath(locator)
+    elif strategy == "class_name":
+        return driver.find_elements_by_class_name(locator)
+    raise ValueError("Unsupported location strategy " + str(strategy))
+
+
+def act_on_all(driver, locator, action, strategy="ios uiautomation", removes_elements=False, name="action",
+               limit=BULK_ACTION_LIMIT, with_index=False):
+    """Applies action to every element matching locator.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - locator (str): Locator of the elements.
+        - action (callable): Function taking WebElement.
+        - strategy (str): Location strategy of the locator.
+        - removes_elements (bool): If True, action removes element from the screen, list is fetched again after
+            each pass until no element is left.
+        - name (str): Action name for summary and log.
+        - limit (int): Max number of actions, protects from endless loops.
+        - with_index (bool): If True, action takes element and its index in the list fetched first, None once
+            the list was fetched again.
+
+    :Returns:
+        BulkActionSummary: What was done.
+    """
+    summary = BulkActionSummary(name)
+    start = time.time()
+
+    def query():
+        summary.queries += 1
+        try:
+            return find_live_elements(driver, strategy, locator)
+        except WebDriverException:
+            return []
+
+    elements = query()
+    # index of the next element to act on, after re-fetching a list which doesn't shrink
+    position = 0
+    first_list = True
+    while position < len(elements) and summary.acted + summary.failed < limit:
+        acted = summary.acted
+        changed = False
+        for element in elements[position:]:
+            if summary.acted + summary.failed >= limit:
+                break
+            try:
+                if with_index:
+                    summary.results.append(action(element, position if first_list else None))
+                else:
+                    summary.results.append(action(element))
+                summary.acted += 1
+            except StaleElementReferenceException:
+                changed = True
+                break
+            except WebDriverException as e:
+                summary.failed += 1
+                LOGGER.warning("Bulk %s failed on element %s: %s", name, position, e)
+            position += 1
+        if removes_elements:
+            elements = query()
+            first_list = False
+            position = 0
+            if summary.acted == acted:
+                # nothing could be removed, the rest stays
+                break
+        elif changed:
+            elements = query()
+            first_list = False
+        else:
+            break
+
+    if removes_elements:
+        summary.remaining = len(elements)
+    summary.elapsed = time.time() - start
+    LOGGER.debug("%r", summary)
+    return summary
+
+
+def tap_all(driver, locator, strategy="ios uiautomation", removes_elements=False, limit=BULK_ACTION_LIMIT):
+    """Taps every element matching locator, see act_on_all().
+
+    :Usage:
+        tap_all(self.driver, session_locators(self.driver)["book.toggle_favourite"], removes_elements=True)
+    """
+    return act_on_all(driver, locator, lambda element: element.click(), strategy=strategy,
+                      removes_elements=removes_elements, name="tap", limit=limit)
+
+
+def toggle_all(driver, locator, state, strategy="ios uiautomation", snapshot=None, limit=BULK_ACTION_LIMIT):
+    """Taps every switch or toggle button matching locator which is not in the required state.
+
+    State of elements is read from snapshot if locator can be resolved against it, otherwise from each element.
+    Once the live list was fetched again (an element became stale), snapshot no longer matches it and state is read
+    from each element.
+
+    :Args:
+        - state (bool): Required state: True - on ("1", "true"), False - off.
+        - snapshot (PageSnapshot): Snapshot of the current screen.
+
+    :Usage:
+        toggle_all(self.driver, locator, False, snapshot=self.current_snapshot())
+    """
+    values = None
+    if snapshot is not None:
+        nodes = snapshot.resolve(strategy, locator)
+        if nodes is not None:
+            values = [node.get("value") for node in nodes]
+
+    def toggle(element, index):
+        if values is not None and index is not None and index < len(values):
+            value = values[index]
+        else:
+            value = element.get_attribute("value")
+        if _is_on(value) != state:
+            element.click()
+            return True
+        return False
+
+    summary = act_on_all(driver, locator, toggle, strategy=strategy, name="toggle", limit=limit, with_index=True)
+    LOGGER.debug("Toggled %s of %s elements.", summary.results.count(True), summary.acted)
+    return summary
+
+
+def read_all_texts(driver, locator, strategy="ios uiautomation", snapshot=None, limit=BULK_ACTION_LIMIT):
+    """Reads texts of all elements matching locator.
+
+    If locator can be resolved against snapshot, texts are taken from it without device requests.
+
+    :Returns:
+        BulkActionSummary: Texts are in results.
+
+    :Usage:
+        read_all_texts(self.driver, locator, snapshot=self.current_snapshot()).results
+    """
+    if snapshot is not None:
+        nodes = snapshot.resolve(strategy, locator)
+        if nodes is not None:
+            summary = BulkActionSummary("read text")
+            summary.results = [node.get("value") or node.get("name") or node.get("label") for node in nodes[:limit]]
+            summary.acted = len(summary.results)
+            return summary
+    return act_on_all(driver, locator, lambda element: element.text, strategy=strategy, name="read text",
+                      limit=limit)
+
+
+def _is_on(value):
+    return value is not None and str(value).lower() in ("1", "true")
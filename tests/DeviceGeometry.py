@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-"
+"""Module contains session scoped cache of device geometry: window size, orientation, device type and coordinates
+derived from them.
+
+Geometry doesn't change during a session unless orientation is changed, so it's fetched from the device once.
+Helpers.set_device_orientation invalidates the cache, refresh_device_geometry does it explicitly.
+"""
+from .SessionState import get_session_state
+
+# min screen side (points) of a tablet
+TABLET_MIN_WIDTH = 768
+
+
+class DeviceGeometry(object):
+    """Class represents measured device screen.
+
+    Attributes:
+        - screen_width (int): Actual screen width of device in current orientation.
+        - screen_height (int): Actual screen height of device in current orientation.
+        - orientation (str): 'PORTRAIT' or 'LANDSCAPE'.
+        - device_type (str): 'Tablet' or 'Phone'.
+        - scroll_top_coordinate (int): Calculated top coordinate on page to swipe from/to.
+        - scroll_bottom_coordinate (int): Calculated bottom coordinate on page to swipe from/to.
+        - scroll_x_coordinate (int): Calculated value for "width" coordinate on page to swipe along.
+        - page_swipe_top_coordinate (int): Top coordinate of a swipe scrolling a full page, see Gestures.
+        - page_swipe_bottom_coordinate (int): Bottom coordinate of a swipe scrolling a full page.
+        - center_x_coordinate (int): Horizontal center of the screen.
+        - center_y_coordinate (int): Vertical center of the screen.
+    """
+
+    def __init__(self, window_size, orientation):
+        """Calculates geometry.
+
+        :Args:
+            - window_size (dict): Window size as returned by driver.get_window_size().
+            - orientation (str): Orientation as returned by driver.orientation.
+        """
+        self.screen_width = window_size['width']
+        self.screen_height = window_size['height']
+        self.orientation = orientation
+
+        self.device_type = "Phone"
+        if orientation == "PORTRAIT":
+            if self.screen_width >= TABLET_MIN_WIDTH:
+                self.device_type = "Tablet"
+        else:
+            if self.screen_height >= TABLET_MIN_WIDTH:
+                self.device_type = "Tablet"
+
+        self.scroll_top_coordinate = round(0.3 * self.screen_height, 0)
+        self.scroll_bottom_coordinate = round(0.8 * self.screen_height, 0)
+        self.scroll_x_coordinate = round(0.5 * self.screen_width, 0)
+        # list height between navigation and tab bars
+        self.page_swipe_top_coordinate = round(0.12 * self.screen_height, 0)
+        self.page_swipe_bottom_coordinate = round(0.88 * self.screen_height, 0)
+        self.center_x_coordinate = round(0.5 * self.screen_width, 0)
+        self.center_y_coordinate = round(0.5 * self.screen_height, 0)
+
+
+def get_device_geometry(driver):
+    """Returns device geometry of driver's session, measures the device only if it's not known yet.
+
+    :Args:
+        - driver (WebDriver): Web driver object
+
+    :Returns:
+        DeviceGeometry: Cached geometry.
+
+    :Usage:
+        get_device_geometry(self.driver).screen_width
+    """
+    state = get_session_state(driver)
+    if state.geometry is None:
+        state.geometry = DeviceGeometry(driver.get_window_size(), driver.orientation)
+    return state.geometry
+
+
+def refresh_device_geometry(driver):
+    """Drops cached geometry and measures the device again.
+
+    :Usage:
+        refresh_device_geometry(self.driver)
+    """
+    invalidate_device_geometry(driver)
+    return get_device_geometry(driver)
+
+
+def invalidate_device_geometry(driver):
+    """Drops cached geometry, it will be measured on next request.
+
+    :Usage:
+        invalidate_device_geometry(self.driver)
+    """
+    get_session_state(driver).geometry = None
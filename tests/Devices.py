@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-"
+"""Module contains device descriptors used to run tests on a pool of devices.
+
+Device pool is a JSON file with a list of devices:
+    [{"name": "iPad", "udid": "3874653487563409857349057349053745092375903", "platformVersion": "9.3.3",
+      "url": "http://localhost:4723/wd/hub", "locale": "de"}, ...]
+
+Test process gets its device through environment variables, see DeviceDescriptor.to_environment().
+"""
+import json
+import os
+from .GlobalConstants import DEFAULT_LOCALE
+
+# environment variables describing the device test process should use
+ENV_DEVICE_NAME = 'APPIUM_DEVICE_NAME'
+ENV_UDID = 'APPIUM_UDID'
+ENV_PLATFORM_VERSION = 'APPIUM_PLATFORM_VERSION'
+ENV_APPIUM_URL = 'APPIUM_URL'
+ENV_LOCALE = 'APPIUM_LOCALE'
+
+DEFAULT_DEVICE_NAME = "My iPhone"
+# DEFAULT_UDID = '3089538653865389653485634856349346348563'   #iPhone - sample
+DEFAULT_UDID = '3874653487563409857349057349053745092375903'  # iPad - sample
+DEFAULT_PLATFORM_VERSION = '9.3.3'
+DEFAULT_APPIUM_URL = 'http://localhost:4723/wd/hub'
+
+
+class DeviceDescriptor(object):
+    """Class represents a device and Appium server controlling it.
+
+    Attributes:
+        - name (str): Device name, used as deviceName capability and in reports.
+        - udid (str): Device udid.
+        - platform_version (str): iOS version.
+        - url (str): Appium server URL.
+        - locale (str): Application locale, selects locator profile.
+    """
+
+    def __init__(self, name=DEFAULT_DEVICE_NAME, udid=DEFAULT_UDID, platform_version=DEFAULT_PLATFORM_VERSION,
+                 url=DEFAULT_APPIUM_URL, locale=DEFAULT_LOCALE):
+        self.name = name
+        self.udid = udid
+        self.platform_version = platform_version
+        self.url = url
+        self.locale = locale
+
+    @classmethod
+    def from_dict(cls, data):
+        """Creates descriptor from device pool file entry."""
+        return cls(name=data.get("name", DEFAULT_DEVICE_NAME),
+                   udid=data["udid"],
+                   platform_version=data.get("platformVersion", DEFAULT_PLATFORM_VERSION),
+                   url=data.get("url", DEFAULT_APPIUM_URL),
+                   locale=data.get("locale", DEFAULT_LOCALE))
+
+    @classmethod
+    def from_environment(cls):
+        """Creates descriptor from environment variables, defaults are used for missing ones.
+
+        :Usage:
+            device = DeviceDescriptor.from_environment()
+        """
+        return cls(name=os.getenv(ENV_DEVICE_NAME, DEFAULT_DEVICE_NAME),
+                   udid=os.getenv(ENV_UDID, DEFAULT_UDID),
+                   platform_version=os.getenv(ENV_PLATFORM_VERSION, DEFAULT_PLATFORM_VERSION),
+                   url=os.getenv(ENV_APPIUM_URL, DEFAULT_APPIUM_URL),
+                   locale=os.getenv(ENV_LOCALE, DEFAULT_LOCALE))
+
+    def to_environment(self):
+        """Returns environment variables describing the device."""
+        return {ENV_DEVICE_NAME: self.name,
+                ENV_UDID: self.udid,
+                ENV_PLATFORM_VERSION: self.platform_version,
+                ENV_APPIUM_URL: self.url,
+                ENV_LOCALE: self.locale}
+
+    def desired_capabilities(self):
+        """Returns device specific desired capabilities."""
+        return {'udid': self.udid, 'platformVersion': self.platform_version, 'deviceName': self.name}
+
+
+def load_device_pool(file_path):
+    """Reads device pool file.
+
+    :Args:
+        file_path (str): JSON file path.
+
+    :Returns:
+        list: DeviceDescriptor objects.
+
+    :Usage:
+        load_device_pool(GlobalConstants.DEVICE_POOL_FILE)
+    """
+    with open(file_path, 'r') as f:
+        return [DeviceDescriptor.from_dict(data) for data in json.load(f)]
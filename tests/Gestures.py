@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-"
+"""Module contains gesture composer: multi-step swipes sent to the device as a single touch action chain.
+
+"mobile: scroll" scrolls one page per command, so scrolling several pages costs a round trip per page.
+GestureComposer adds swipes to one TouchAction instead, any number of pages is scrolled with a single command.
+Swipe coordinates are taken from cached device geometry: one page swipe drags the list by the list height, between
+page_swipe_bottom_coordinate and page_swipe_top_coordinate, and holds the finger before release, so the list doesn't
+scroll on by momentum.
+
+Chains are opt-in (GESTURE_CHAINED_SCROLLS): drivers differ in how they run multi-press chains, e.g. iOS UIAutomation
+driver takes moveTo as an offset (GESTURE_RELATIVE_MOVE_TO). By default scroll_pages() scrolls with "mobile: scroll"
+page by page, which keeps its page semantics on every driver.
+
+scroll_to_visible() asks the server to scroll the list until an element is visible, pages are scrolled by the server
+without a client round trip per page.
+
+:Usage:
+    GestureComposer(self.driver).scroll_pages("down", 3).perform()
+    scroll_pages(self.driver, "up", 5)
+"""
+from appium.webdriver.common.touch_action import TouchAction
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from .GlobalConstants import GESTURE_SWIPE_DURATION, GESTURE_RELEASE_HOLD, GESTURE_RELATIVE_MOVE_TO, \
+    GESTURE_CHAINED_SCROLLS
+from .DeviceGeometry import get_device_geometry
+from .Logger import LOGGER
+
+SCROLL_DIRECTIONS = ("down", "up")
+
+
+class GestureComposer(object):
+    """Sequence of swipes performed as one touch action chain.
+
+    Attributes:
+        - duration (int): Default swipe duration, ms.
+        - hold (int): Time the finger rests at the end of each swipe before release, ms.
+        - relative_move_to (bool): If True, moveTo coordinates are sent as an offset from the press point.
+        - swipes (list): Swipes added and not performed yet: start and end coordinates and duration.
+    """
+
+    def __init__(self, driver, duration=GESTURE_SWIPE_DURATION, hold=GESTURE_RELEASE_HOLD,
+                 relative_move_to=GESTURE_RELATIVE_MOVE_TO):
+        """Creates empty gesture.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - duration (int): Default swipe duration, ms.
+            - hold (int): Time the finger rests before release, ms.
+            - relative_move_to (bool): If True, moveTo coordinates are an offset from the press point.
+        """
+        self.driver = driver
+        self.duration = duration
+        self.hold = hold
+        self.relative_move_to = relative_move_to
+        self.swipes = []
+
+    def swipe(self, x_start, y_start, x_end, y_end, duration=None):
+        """Adds swipe from one point to another.
+
+        :Args:
+            - duration (int): Time to take the swipe, ms. Default swipe duration if not set.
+
+        :Usage:
+            GestureComposer(self.driver).swipe(100, 400, 100, 100).swipe(100, 400, 100, 100).perform()
+        """
+        self.swipes.append((x_start, y_start, x_end, y_end, self.duration if duration is None else duration))
+        return self
+
+    def scroll_pages(self, direction, pages=1):
+        """Adds swipes scrolling the list a number of pages, each swipe drags the list by its height.
+
+        :Args:
+            - direction (str): "down" - to the end of the list (finger moves up), "up" - to the top.
+            - pages (int): Number of page swipes.
+        """
+        if direction not in SCROLL_DIRECTIONS:
+            raise ValueError("Unrecognized scroll direction \"" + str(direction) + "\".")
+        geometry = get_device_geometry(self.driver)
+        x = geometry.scroll_x_coordinate
+        if direction == "down":
+            y_start, y_end = geometry.page_swipe_bottom_coordinate, geometry.page_swipe_top_coordinate
+        else:
+            y_start, y_end = geometry.page_swipe_top_coordinate, geometry.page_swipe_bottom_coordinate
+        for _ in range(pages):
+            self.swipe(x, y_start, x, y_end)
+        return self
+
+    def to_action(self):
+        """Returns TouchAction of all swipes: press, wait, move, wait and release for each one."""
+        action = TouchAction(self.driver)
+        for x_start, y_start, x_end, y_end, duration in self.swipes:
+            action.press(x=x_start, y=y_start).wait(ms=duration)
+            if self.relative_move_to:
+                action.move_to(x=x_end - x_start, y=y_end - y_start)
+            else:
+                action.move_to(x=x_end, y=y_end)
+            if self.hold:
+                action.wait(ms=self.hold)
+            action.release()
+        return action
+
+    def perform(self):
+        """Sends all swipes to the device as a single command.
+
+        :Returns:
+            int: Number of swipes performed.
+        """
+        if not self.swipes:
+            return 0
+        self.to_action().perform()
+        swipes = len(self.swipes)
+        self.swipes = []
+        LOGGER.debug("Performed %s swipes with one command.", swipes)
+        return swipes
+
+
+def scroll_pages(driver, direction, pages=1, chained=GESTURE_CHAINED_SCROLLS):
+    """Scrolls the list a number of pages.
+
+    Pages are scrolled with "mobile: scroll" one by one, or with a single touch action chain if chained is set. If the
+    server rejects the chain, pages are scrolled one by one.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - direction (str): "down" or "up".
+        - pages (int): Number of pages.
+        - chained (bool): If True, all pages are swiped with a single command.
+
+    :Returns:
+        bool: True if all pages were scrolled.
+
+    :Usage:
+        scroll_pages(self.driver, "down", 3)
+    """
+    if pages < 1:
+        return True
+    if chained:
+        try:
+            GestureComposer(driver).scroll_pages(direction, pages).perform()
+            return True
+        except WebDriverException as e:
+            LOGGER.debug("Touch action chain failed, scrolling page by page: %s", e)
+
+    for page in range(1, pages + 1):
+        try:
+            driver.execute_script("mobile: scroll", {"direction": direction})
+        except WebDriverException as e:
+            LOGGER.warning("Failed to swipe %s page %s: %s", direction, page, e)
+            return False
+    return True
+
+
+def scroll_to_visible(driver, element):
+    """Scrolls the list until element is visible, with a single command. Pages are scrolled by the server.
+
+    Element should be in the element tree already, e.g. a cell of a list which isn't scrolled to yet.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - element (WebElement): Element to make visible.
+
+    :Returns:
+        bool: True if the list was scrolled, False if the server can't scroll to element.
+
+    :Raises:
+        StaleElementReferenceException: If element is not in the element tree any more.
+
+    :Usage:
+        scroll_to_visible(self.driver, cell)
+    """
+    try:
+        driver.execute_script("mobile: scroll", {"element": element.id, "toVisible": True})
+        return True
+    except StaleElementReferenceException:
+        raise
+    except WebDriverException as e:
+        LOGGER.debug("Server failed to scroll to element: %s", e)
+        return False
@@ -4,7 +4,37 @@ DEFAULT_WAIT_FOR_ELEMENT = 10
 DEFAULT_WAIT_FOR_ELEMENT_SCROLL = 5
 DEFAULT_SCROLL_PAGES = 6
 DEFAULT_SCROLL_DELAY = 1000
+SCROLL_PROBE_WAIT = 1.0
+LIST_HARVEST_MAX_PAGES = 100
+BULK_ACTION_LIMIT = 1000
+# static screen chrome (tab bar, segmented controls) is tapped by cached coordinates, see TapCache
+TAP_CHROME_BY_COORDINATES = os.getenv('APPIUM_TAP_BY_COORDINATES', '1') == '1'
+# touch action chains of swipes, see Gestures. Pages are scrolled with "mobile: scroll" one by one unless chained
+# scrolls are enabled: multi-swipe chains are opt-in until verified on each driver the tests run with
+GESTURE_CHAINED_SCROLLS = os.getenv('APPIUM_CHAINED_SCROLLS', '0') == '1'
+# iOS UIAutomation driver takes moveTo coordinates as an offset from the previous point
+GESTURE_RELATIVE_MOVE_TO = True
+GESTURE_SWIPE_DURATION = 500
+# finger rests before release, so a swipe scrolls by its distance without momentum
+GESTURE_RELEASE_HOLD = 200
+GESTURE_BATCH_PAGES = 5
 ALLOWED_IMAGE_DIFFERENCE_PERCENT = 3.0
+IMAGE_COMPARISON_TILE_ROWS = 64
+IMAGE_PIXEL_TOLERANCE = 8
+USE_PAGE_SNAPSHOTS = True
+DEFAULT_LOCALE = os.getenv('APP_LOCALE', 'en')
+LOCATOR_CACHE_SIZE = 1024
+DEFAULT_POLL_INTERVAL = 0.1
+DEFAULT_MAX_POLL_INTERVAL = 1.0
+DEFAULT_POLL_BACKOFF_FACTOR = 1.5
+APP_READY_TIMEOUT = 30
+HOME_PAGE_CHECK_TIMEOUT = 3
+SCREENSHOT_WORKERS = 2
+SCREENSHOT_QUEUE_SIZE = 16
+SCREENSHOT_RECOMPRESS = False
+LOG_CONSOLE_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+LOG_RING_SIZE = 5000
+LOG_BUFFER_LINES = 50
 
 TEST_ROOT_DIR = os.path.dirname(os.path.realpath(__file__)) + "/../tests_local/"
 HOST_APP_LOCATION = TEST_ROOT_DIR + '/../application/SampleApp.ipa'
@@ -14,6 +44,60 @@ REF_SCREENSHOTS_ROOT_FOLDER = TEST_ROOT_DIR + "reference_screenshots/"
 DEFAULT_IMAGE_DIFFERENCE_FILE = REF_SCREENSHOTS_ROOT_FOLDER + "temp/difference.png"
 BUNDLE_ID = 'com.sample.app'    # your app bundle id
 
+# parallel runs
+DEVICE_POOL_FILE = TEST_ROOT_DIR + "devices.json"
+TEST_LOGS_FOLDER = TEST_RESULTS_HOME_FOLDER + "logs/"
+TEST_DURATIONS_FILE = TEST_RESULTS_HOME_FOLDER + "test_durations.json"
+PARALLEL_REPORT_FILE = TEST_RESULTS_HOME_FOLDER + "parallel_report.json"
+DEFAULT_TEST_DURATION = 60.0
+# how often results queue is polled for a finished or dead worker, seconds
+WORKER_POLL_INTERVAL = 5.0
+WORKER_DRAIN_TIMEOUT = 1.0
+
+# command instrumentation, file name is formatted with device udid
+COMMAND_STATISTICS_FILE = TEST_RESULTS_HOME_FOLDER + "command_statistics_%s.json"
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+# WebDriver traffic recording and replay, see SessionRecording
+RECORD_SESSION_FILE = os.getenv('APPIUM_RECORD_FILE', '')
+REPLAY_SESSION_FILE = os.getenv('APPIUM_REPLAY_FILE', '')
+REPLAY_TIME_SCALE = float(os.getenv('APPIUM_REPLAY_TIME_SCALE', '0'))
+
+# Appium session pool, see SessionPool
+REUSE_SESSIONS = os.getenv('APPIUM_REUSE_SESSIONS', '1') == '1'
+SESSION_POOL_FOLDER = TEST_RESULTS_HOME_FOLDER + "sessions/"
+SESSION_MAX_COMMANDS = 20000
+SESSION_MAX_AGE = 4 * 3600
+SESSION_IDLE_TIMEOUT = 1800
+
+# HTTP transport of WebDriver commands, see HttpTransport: "pooled" or "selenium"
+HTTP_TRANSPORT = os.getenv('APPIUM_TRANSPORT', 'pooled')
+TRANSPORT_POOL_SIZE = 2
+TRANSPORT_TIMEOUT = 120
+TRANSPORT_COMMAND_TIMEOUTS = {"newSession": 600, "quit": 60, "getPageSource": 60, "screenshot": 60,
+                              "findElement": 30, "findElements": 30, "findChildElement": 30,
+                              "findChildElements": 30}
+
+# lookup deadlines learned from lookup latency of previous runs, see LookupLatency
+ADAPTIVE_TIMEOUTS = os.getenv('APPIUM_ADAPTIVE_TIMEOUTS', '1') == '1'
+LOOKUP_LATENCY_FILE = TEST_RESULTS_HOME_FOLDER + "lookup_latency.sqlite"
+LATENCY_SAMPLES_PER_LOCATOR = 200
+ADAPTIVE_TIMEOUT_PERCENTILE = 95
+ADAPTIVE_TIMEOUT_FACTOR = 2.0
+ADAPTIVE_TIMEOUT_MARGIN = 0.5
+ADAPTIVE_TIMEOUT_FLOOR = 1.0
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 20
+
+# navigation graph of page objects, see Navigation: declared transition costs until measured, seconds
+DEFAULT_TRANSITION_COST = 1.0
+TAB_TRANSITION_COST = 2.0
+NAVIGATION_MAX_REPLANS = 2
+# time to identify the page after a hop, screen may still be animating
+NAVIGATION_IDENTIFY_TIMEOUT = 2.0
+
+# offline benchmarks
+BENCHMARK_REPORT_FILE = TEST_RESULTS_HOME_FOLDER + "benchmarks.json"
+
 # TEMP_DIR = os.environ['TMPDIR']
 
 # Additional data
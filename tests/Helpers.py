@@ -2,8 +2,13 @@
 """Module contains different functions created to simplify UI automation of iOS applications with Appium"""
 import exceptions
 import subprocess
-import time
-from GlobalConstants import DEFAULT_SCROLL_DELAY
+from GlobalConstants import DEFAULT_SCROLL_DELAY, DEFAULT_WAIT_FOR_ELEMENT, TAP_CHROME_BY_COORDINATES
+from WaitEngine import DEFAULT_WAIT_ENGINE
+from DeviceGeometry import get_device_geometry, invalidate_device_geometry
+from Logger import LOGGER
+from Locators import bind_locator_profile, session_locators
+from Gestures import scroll_pages
+from TapCache import ElementRect, rect_key, remember_rect, forget_rect, tap_cached_rect
 
 
 def convert_text_to_xpath(text):
@@ -24,7 +29,8 @@ def convert_text_to_xpath(text):
 def scroll_up(driver, number_of_pages=1):
     """Swipe page up specified number of times.
 
-    iOS only function.
+    iOS only function. Pages are scrolled with "mobile: scroll", or with a single touch action chain if chained
+    scrolls are enabled, see Gestures.
 
     :Args:
         - driver (WebDriver): Web driver object
@@ -34,47 +40,37 @@ def scroll_up(driver, number_of_pages=1):
         scroll_up(self.driver, 3)
     """
     log("Scrolling up " + str(number_of_pages) + " pages.")
-
-    i = 1
-    while i <= number_of_pages:
-        log("Swiping up page " + str(i) + "...")
-        try:
-            driver.execute_script("mobile: scroll", {"direction": "up"})
-            log("Successfully swiped up page " + str(i) + ".")
-        except:
-            log("Failed to swipe up page " + str(i) + ".")
-        i += 1
+    if scroll_pages(driver, "up", number_of_pages):
+        log("Successfully swiped up " + str(number_of_pages) + " pages.")
+    else:
+        log("Failed to swipe up " + str(number_of_pages) + " pages.")
 
 
 def scroll_down(driver, number_of_pages=1):
     """Swipe page down specified number of times.
 
-    iOS only function.
+    iOS only function. Pages are scrolled with "mobile: scroll", or with a single touch action chain if chained
+    scrolls are enabled, see Gestures.
 
     :Args:
         - driver (WebDriver): Web driver object
         - number_of_pages (int): How many pages to swipe, default 1.
 
     :Usage:
-        scroll_up(self.driver, 3)
+        scroll_down(self.driver, 3)
     """
     log("Scrolling down " + str(number_of_pages) + " pages.")
-
-    i = 1
-    while i <= number_of_pages:
-        log("Swiping down page " + str(i) + "...")
-        try:
-            driver.execute_script("mobile: scroll", {"direction": "down"})
-            log("Successfully swiped down page " + str(i) + ".")
-        except:
-            log("Failed to swipe down page " + str(i) + ".")
-        i += 1
+    if scroll_pages(driver, "down", number_of_pages):
+        log("Successfully swiped down " + str(number_of_pages) + " pages.")
+    else:
+        log("Failed to swipe down " + str(number_of_pages) + " pages.")
 
 
 def detect_device_type(driver):
     """Detects if iOS device is tablet of mobile.
 
     iOS only function. Screen size and device orientation are used to determine device type.
+    They are measured once per session, see DeviceGeometry.
 
     :Args:
         - driver (WebDriver): Web driver object
@@ -87,26 +83,19 @@ def detect_device_type(driver):
     """
     # TODO rename to Tablet and Mobile
 
-    screen_sixe = driver.get_window_size()
-    orientation = driver.orientation
-    log("Device orientation= %s" % orientation)
-    log("Screen size= %s" % screen_sixe)
-    device_type = "Phone"
-    if orientation == "PORTRAIT":
-        if screen_sixe.__getitem__('width') >= 768:
-            device_type = "Tablet"
-    else:
-        if screen_sixe.__getitem__('height') >= 768:
-            device_type = "Tablet"
-    log("Detected device type= %s" %device_type)
+    geometry = get_device_geometry(driver)
+    log("Device orientation= %s" % geometry.orientation)
+    log("Screen size= %sx%s" % (geometry.screen_width, geometry.screen_height))
+    log("Detected device type= %s" % geometry.device_type)
 
-    return device_type
+    return geometry.device_type
 
 
 def set_device_orientation(driver, orientation):
     """Sets device orientation.
 
-    Allowed values are 'PORTRAIT' and 'LANDSCAPE'.
+    Allowed values are 'PORTRAIT' and 'LANDSCAPE'. Cached device geometry is invalidated and session is switched
+    to locator profile of the new orientation.
 
     :Args:
         - driver (WebDriver): Web driver object
@@ -116,6 +105,8 @@ def set_device_orientation(driver, orientation):
         - set_device_orientation(self.driver, 'LANDSCAPE')
     """
     driver.orientation = orientation
+    invalidate_device_geometry(driver)
+    bind_locator_profile(driver, session_locators(driver).with_orientation(orientation))
 
 
 def replace_text(string="", old="", new=""):
@@ -139,34 +130,6 @@ def replace_text(string="", old="", new=""):
     return string.replace(old, new)
 
 
-def verify_app_launched(driver):
-    """Checks if the app launched successfully.
-
-    Current application specific function. Checks if specific element, showing "In progress" status,
-    is present on the screen.
-
-    :Args:
-        - driver (WebDriver): Web driver object
-
-    :Usage:
-        verify_app_launched(self.driver)
-    """
-    driver.implicitly_wait(2)
-    log("Checking if app successfully started...")
-    is_started = False
-    time.sleep(3)
-
-    try:
-        driver.find_element_by_ios_uiautomation("target.frontMostApp().mainWindow().activityIndicators()[\"In progress\"]")
-        log("\"In progress\" indicator found.")
-        log("Application didn't start successfully!")
-    except:
-        log("App is successfully launched.")
-        is_started = True
-
-    return is_started
-
-
 def hide_keyboard(driver, key_name=None):
     """Specific function to hide keyboard by tapping on key meaning 'Done.'
 
@@ -212,6 +175,9 @@ def make_unicode(input_text):
 def log(msg):
     """Logs a message with current time
 
+    Message is written with INFO level, see Logger. Hot paths should use LOGGER.debug() with format arguments
+    instead, so the message is built only if it's written somewhere.
+
     :Usage:
         log("Test started.")
 
@@ -219,7 +185,7 @@ def log(msg):
         # >>> log("Test started.")
         # 20:02:02: Test started.
     """
-    print (time.strftime("%H:%M:%S") + ": " + make_unicode(msg))
+    LOGGER.info(msg)
 
 
 def navigate_back(driver):
@@ -271,12 +237,11 @@ def swipe_center_down(driver, swipe_speed=DEFAULT_SCROLL_DELAY):
         swipe_center_down(self.driver, 1500)
     """
     # calculate scroll coordinates
-    screen_width = driver.get_window_size().__getitem__('width')
-    screen_height = driver.get_window_size().__getitem__('height')
-    swipe_centre_coordinate_x = round(0.5 * screen_width, 0)
-    swipe_centre_coordinate_y = round(0.5 * screen_height, 0)
-    swipe_down_coordinate_x = round(0.5 * screen_width, 0)
-    swipe_down_coordinate_y = round(0.8 * screen_height, 0)
+    geometry = get_device_geometry(driver)
+    swipe_centre_coordinate_x = geometry.center_x_coordinate
+    swipe_centre_coordinate_y = geometry.center_y_coordinate
+    swipe_down_coordinate_x = geometry.center_x_coordinate
+    swipe_down_coordinate_y = geometry.scroll_bottom_coordinate
     log("Swiping from %s, %s to %s %s with delay %s" % (swipe_centre_coordinate_x, swipe_centre_coordinate_y,
                                                           swipe_down_coordinate_x, swipe_down_coordinate_y, swipe_speed))
     try:
@@ -289,23 +254,66 @@ def swipe_center_down(driver, swipe_speed=DEFAULT_SCROLL_DELAY):
         log(e.message)
 
 
-def navigate_to_home_page(driver):
+def open_tab(driver, tab_name, tap_by_coordinates=TAP_CHROME_BY_COORDINATES, verify_tap=None):
+    """Taps tab bar button.
+
+    Current application specific function. Tab bar button is tapped by cached coordinates after the first time if
+    the tap can be verified, see TapCache. If verify_tap says the tap missed, rectangle is dropped and the button is
+    looked up and tapped again.
+
+    :Args:
+        - driver (WebDriver): Web driver object
+        - tab_name (str): Name of tab bar button.
+        - tap_by_coordinates (bool): If True, tab bar button rectangle is cached and tapped without a lookup.
+        - verify_tap (callable): Takes driver, strategy and locator of the button, returns False if tap by
+            coordinates missed, e.g. PageSnapshot.verify_selected. Cached coordinates are used only if it's set.
+
+    :Returns:
+        bool: True if the button was tapped.
+
+    :Usage:
+        open_tab(self.driver, "Authors", verify_tap=verify_selected)
+    """
+    locator = "target.frontMostApp().tabBar().buttons()[\"" + tab_name + "\"]"
+    key = rect_key(driver, "ios uiautomation", locator)
+    tap_by_coordinates = tap_by_coordinates and verify_tap is not None
+    if tap_by_coordinates and tap_cached_rect(driver, key):
+        if verify_tap(driver, "ios uiautomation", locator):
+            return True
+        LOGGER.info("Tap on tab \"%s\" missed, looking the button up.", tab_name)
+        forget_rect(driver, key)
+    result = DEFAULT_WAIT_ENGINE.until(driver, lambda: driver.find_elements_by_ios_uiautomation(locator),
+                                       DEFAULT_WAIT_FOR_ELEMENT)
+    if result.timed_out:
+        return False
+    button = result.value[0]
+    if tap_by_coordinates:
+        remember_rect(driver, key, ElementRect.from_element(button))
+    button.click()
+    return True
+
+
+def navigate_to_home_page(driver, tap_by_coordinates=TAP_CHROME_BY_COORDINATES, verify_tap=None):
     """Navigates to application home page.
 
-    Current application specific function.
+    Current application specific function, see open_tab().
 
     :Args:
         - driver (WebDriver): Web driver object
+        - tap_by_coordinates (bool): If True, tab bar button rectangle is cached and tapped without a lookup.
+        - verify_tap (callable): Verifies tap by coordinates, see open_tab().
 
     :Usage:
-        navigate_to_home_page(self.driver)
+        navigate_to_home_page(self.driver, verify_tap=verify_selected)
     """
     try:
         log("Trying to navigate to Books page...")
-        driver.find_element_by_ios_uiautomation("target.frontMostApp().tabBar().buttons()[\"Books\"]").click()
-        log("Books page opened.")
+        if open_tab(driver, "Books", tap_by_coordinates, verify_tap):
+            log("Books page opened.")
+            return
     except:
-        log("Faild to navigate to Books button!")
+        pass
+    log("Faild to navigate to Books button!")
 
 
 # # #------------------------------------------ Local functions --------------------------------------------
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-"
+"""Module contains HTTP transport of WebDriver commands: pooled keep-alive connections to Appium server.
+
+Selenium RemoteConnection opens a new TCP connection for every command (or keeps a single one without any
+recovery if keep_alive is set). PooledConnection keeps idle connections open and reuses them:
+    - connections have TCP_NODELAY set, so small requests are not held back by Nagle's algorithm;
+    - timeout is set per command: newSession may take minutes, find requests should fail fast;
+    - an idle connection closed by the server meanwhile is detected before it's reused and replaced;
+    - a request failed on a kept-alive connection closed by the server is retried once on a new connection, if it
+      wasn't sent or it's safe to repeat (GET, DELETE). A command which may have run already, e.g. a click, is not
+      sent twice;
+    - connection reuse is counted in TransportStatistics.
+
+:Usage:
+    driver = webdriver.Remote(create_connection(device.url), desired_caps)
+    driver.command_executor.statistics.log_summary()
+"""
+import base64
+import errno
+import httplib
+import select
+import socket
+import string
+import threading
+import time
+import urlparse
+from selenium.webdriver.remote.errorhandler import ErrorCode
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote import utils
+from .GlobalConstants import HTTP_TRANSPORT, TRANSPORT_POOL_SIZE, TRANSPORT_TIMEOUT, TRANSPORT_COMMAND_TIMEOUTS
+from .Logger import LOGGER
+
+# errors of a kept-alive connection closed by the server, request is retried on a new connection
+_CLOSED_CONNECTION_ERRORS = (errno.EPIPE, errno.ECONNRESET, errno.ECONNABORTED)
+# requests which can be sent again if the server closed connection before answering: they may have been executed
+IDEMPOTENT_METHODS = ("GET", "DELETE")
+
+
+def _is_closed_connection_error(error):
+    if isinstance(error, socket.timeout):
+        return False
+    if isinstance(error, socket.error):
+        return error.errno in _CLOSED_CONNECTION_ERRORS
+    return True
+
+
+def _is_closed_by_server(connection):
+    """Tells whether idle connection was closed by the server: its socket is readable while no response is due."""
+    if connection.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([connection.sock], [], [], 0)
+    except (select.error, socket.error, ValueError):
+        return True
+    return bool(readable)
+
+
+class NoDelayHTTPConnection(httplib.HTTPConnection):
+    """HTTP connection with Nagle's algorithm disabled."""
+
+    def connect(self):
+        httplib.HTTPConnection.connect(self)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+class TransportStatistics(object):
+    """Connection usage of PooledConnection.
+
+    Attributes:
+        - requests (int): Number of requests sent.
+        - connections_opened (int): Number of TCP connections opened.
+        - connections_reused (int): Number of requests sent over an already open connection.
+        - retries (int): Number of requests retried because kept-alive connection was closed by the server.
+        - stale_connections (int): Number of idle connections found closed by the server before reuse.
+        - total_ms (float): Time of all requests, ms.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.retries = 0
+        self.stale_connections = 0
+        self.total_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, reused, latency_ms):
+        with self._lock:
+            self.requests += 1
+            self.total_ms += latency_ms
+            if reused:
+                self.connections_reused += 1
+            else:
+                self.connections_opened += 1
+
+    def to_dict(self):
+        return {"requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "retries": self.retries,
+                "stale_connections": self.stale_connections,
+                "mean_ms": round(self.total_ms / self.requests, 2) if self.requests else None}
+
+    def log_summary(self):
+        LOGGER.info("HTTP transport: %s requests, %s connections opened, %s reused, %s retried, mean %s ms.",
+                    self.requests, self.connections_opened, self.connections_reused, self.retries,
+                    self.to_dict()["mean_ms"])
+
+
+class PooledConnection(RemoteConnection):
+    """RemoteConnection sending commands over pooled keep-alive connections.
+
+    Attributes:
+        - pool_size (int): Max number of idle connections kept open.
+        - timeout (float): Default request timeout, seconds.
+        - command_timeouts (dict): Command name -> request timeout, seconds.
+        - statistics (TransportStatistics): Connection usage.
+    """
+
+    def __init__(self, remote_server_addr, pool_size=TRANSPORT_POOL_SIZE, timeout=TRANSPORT_TIMEOUT,
+                 command_timeouts=TRANSPORT_COMMAND_TIMEOUTS, resolve_ip=True):
+        """Creates connection to Appium server, TCP connections are opened on demand.
+
+        :Args:
+            - remote_server_addr (str): Appium server URL.
+            - pool_size (int): Max number of idle connections kept open.
+            - timeout (float): Default request timeout, seconds.
+            - command_timeouts (dict): Command name -> request timeout, seconds.
+            - resolve_ip (bool): Resolve host name once instead of on every connection.
+
+        :Usage:
+            webdriver.Remote(PooledConnection(device.url, command_timeouts={"getPageSource": 30}), desired_caps)
+        """
+        RemoteConnection.__init__(self, remote_server_addr, keep_alive=False, resolve_ip=resolve_ip)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.command_timeouts = dict(command_timeouts or {})
+        self.statistics = TransportStatistics()
+        parsed_url = urlparse.urlparse(self._url)
+        self._host = parsed_url.hostname
+        self._port = parsed_url.port or 80
+        self._base_path = parsed_url.path.rstrip('/')
+        self._headers = {"Connection": "keep-alive",
+                         "Content-Type": "application/json;charset=UTF-8",
+                         "Accept": "application/json"}
+        if parsed_url.username:
+            self._headers["Authorization"] = "Basic " + base64.standard_b64encode(
+                "%s:%s" % (parsed_url.username, parsed_url.password or ""))
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def execute(self, command, params):
+        method, path_template = self._commands[command]
+        path = string.Template(path_template).substitute(params)
+        body = utils.dump_json(params) if method in ("POST", "PUT") else None
+        timeout = self.command_timeouts.get(command, self.timeout)
+        return self._send(method, self._base_path + path, body, timeout)
+
+    def close(self):
+        """Closes idle connections."""
+        with self._lock:
+            connections, self._idle = self._idle, []
+        for connection in connections:
+            connection.close()
+
+    def _take(self, timeout):
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return NoDelayHTTPConnection(self._host, self._port, timeout=timeout), False
+            if not _is_closed_by_server(connection):
+                break
+            connection.close()
+            self.statistics.stale_connections += 1
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def _give_back(self, connection):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def _send(self, method, path, body, timeout):
+        start = time.time()
+        connection, reused = self._take(timeout)
+        try:
+            sent = False
+            try:
+                connection.request(method, path, body, self._headers)
+                sent = True
+                response = connection.getresponse()
+                data = response.read()
+            except (httplib.BadStatusLine, httplib.CannotSendRequest, socket.error) as e:
+                connection.close()
+                if not (reused and _is_closed_connection_error(e) and (not sent or method in IDEMPOTENT_METHODS)):
+                    raise
+                # kept-alive connection was closed by the server: the request wasn't sent, or it's safe to repeat
+                LOGGER.debug("Kept-alive connection closed by server, retrying %s %s", method, path)
+                self.statistics.retries += 1
+                connection, reused = NoDelayHTTPConnection(self._host, self._port, timeout=timeout), False
+                connection.request(method, path, body, self._headers)
+                response = connection.getresponse()
+                data = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._give_back(connection)
+        self.statistics.record(reused, (time.time() - start) * 1000.0)
+        return self._parse_response(response, data, timeout)
+
+    def _parse_response(self, response, data, timeout):
+        """Converts HTTP response to WebDriver response dict the way RemoteConnection does."""
+        status = response.status
+        if 300 <= status < 304:
+            return self._send('GET', urlparse.urlparse(response.getheader('location')).path, None, timeout)
+        body = data.decode('utf-8').replace('\x00', '').strip()
+        if 399 < status <= 500:
+            return {'status': status, 'value': body}
+        content_type = (response.getheader('Content-Type') or "").split(';')
+        if any(part.strip().startswith('image/png') for part in content_type):
+            return {'status': 0, 'value': body}
+        try:
+            value = utils.load_json(body)
+        except ValueError:
+            return {'status': ErrorCode.SUCCESS if 199 < status < 300 else ErrorCode.UNKNOWN_ERROR, 'value': body}
+        if 'value' not in value:
+            value['value'] = None
+        return value
+
+
+def create_connection(remote_server_addr, transport=HTTP_TRANSPORT):
+    """Returns command executor for webdriver.Remote.
+
+    :Args:
+        - remote_server_addr (str): Appium server URL.
+        - transport (str): "pooled" - PooledConnection, "selenium" - Selenium's default connection.
+
+    :Usage:
+        webdriver.Remote(create_connection(device.url), desired_caps)
+    """
+    if transport == "pooled":
+        return PooledConnection(remote_server_addr)
+    if transport == "selenium":
+        return remote_server_addr
+    raise ValueError("Unknown HTTP transport \"" + str(transport) + "\"")
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-"
+"""Module compares screenshots with reference screenshots.
+
+Images are compared as NumPy arrays band by band (tiles of full width). Comparison stops as soon as the number of
+different pixels exceeds the allowed share of the whole image, so clearly different screenshots are rejected
+after looking at a part of them only.
+
+numpy and Pillow are optional, they are not in requirements.txt as there are no wheels for them in wheelhouse/.
+The module can be imported without them, comparison raises ImportError.
+"""
+import os
+from .Helpers import log
+from .GlobalConstants import ALLOWED_IMAGE_DIFFERENCE_PERCENT, REF_SCREENSHOTS_ROOT_FOLDER, \
+    DEFAULT_IMAGE_DIFFERENCE_FILE, IMAGE_COMPARISON_TILE_ROWS, IMAGE_PIXEL_TOLERANCE
+
+try:
+    import numpy
+    from PIL import Image
+except ImportError:
+    numpy = None
+    Image = None
+
+
+class ComparisonResult(object):
+    """Result of image comparison.
+
+    Attributes:
+        - difference_percent (float): Share of different pixels, percent. If comparison stopped early, this is
+            the share found before stopping, i.e. the real difference is not less than that.
+        - allowed_percent (float): Threshold used.
+        - is_similar (bool): True if difference is within the threshold.
+        - stopped_early (bool): True if comparison stopped before the end of the image because threshold was
+            exceeded.
+        - difference_file (str): Difference image file path, None if not written.
+    """
+
+    def __init__(self, difference_percent, allowed_percent, stopped_early, difference_file):
+        self.difference_percent = difference_percent
+        self.allowed_percent = allowed_percent
+        self.is_similar = difference_percent <= allowed_percent
+        self.stopped_early = stopped_early
+        self.difference_file = difference_file
+
+
+def check_dependencies():
+    """Raises ImportError if numpy or Pillow is not installed."""
+    if numpy is None or Image is None:
+        raise ImportError("Image comparison requires numpy and Pillow: pip install numpy==1.16.6 Pillow==6.2.2")
+
+
+def load_image(file_path):
+    """Reads image file into RGB array of shape (height, width, 3)."""
+    check_dependencies()
+    return numpy.asarray(Image.open(file_path).convert("RGB"), dtype=numpy.uint8)
+
+
+def compare_arrays(actual, reference, allowed_percent=ALLOWED_IMAGE_DIFFERENCE_PERCENT,
+                   tile_rows=IMAGE_COMPARISON_TILE_ROWS, pixel_tolerance=IMAGE_PIXEL_TOLERANCE, stop_early=True):
+    """Compares two RGB arrays.
+
+    Pixel is different if any of its channels differs by more than pixel_tolerance.
+
+    :Args:
+        actual (ndarray): Captured image.
+        reference (ndarray): Reference image.
+        allowed_percent (float): Allowed share of different pixels, percent.
+        tile_rows (int): Number of rows compared at once.
+        pixel_tolerance (int): Allowed difference of a channel value, 0-255.
+        stop_early (bool): If True, comparison stops as soon as allowed share is exceeded.
+
+    :Returns:
+        tuple: (difference percent, stopped early, boolean mask of different pixels). Mask is None if image
+        sizes differ.
+    """
+    check_dependencies()
+    if actual.shape != reference.shape:
+        log("Image sizes differ: %s and %s." % (actual.shape, reference.shape))
+        return 100.0, False, None
+
+    height, width = actual.shape[:2]
+    total_pixels = float(height * width)
+    allowed_pixels = total_pixels * allowed_percent / 100.0
+    mask = numpy.zeros((height, width), dtype=bool)
+    different_pixels = 0
+
+    for top in range(0, height, tile_rows):
+        bottom = min(top + tile_rows, height)
+        band_difference = numpy.abs(actual[top:bottom].astype(numpy.int16) - reference[top:bottom].astype(numpy.int16))
+        band_mask = band_difference.max(axis=2) > pixel_tolerance
+        mask[top:bottom] = band_mask
+        different_pixels += int(numpy.count_nonzero(band_mask))
+        if stop_early and different_pixels > allowed_pixels and bottom < height:
+            return 100.0 * different_pixels / total_pixels, True, mask
+
+    return 100.0 * different_pixels / total_pixels, False, mask
+
+
+def write_difference_image(actual, mask, file_path):
+    """Writes difference image: dimmed captured image with different pixels in red."""
+    difference = (actual // 3).astype(numpy.uint8)
+    difference[mask] = (255, 0, 0)
+    folder = os.path.dirname(file_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    Image.fromarray(difference).save(file_path)
+
+
+def compare_images(actual_file, reference_file, difference_file=DEFAULT_IMAGE_DIFFERENCE_FILE,
+                   allowed_percent=ALLOWED_IMAGE_DIFFERENCE_PERCENT, stop_early=True):
+    """Compares screenshot with reference screenshot.
+
+    :Args:
+        actual_file (str): Captured screenshot file path.
+        reference_file (str): Reference screenshot file path.
+        difference_file (str): Difference image file path. If None, difference image is not written.
+        allowed_percent (float): Allowed share of different pixels, percent.
+        stop_early (bool): If True, comparison stops as soon as allowed share is exceeded.
+
+    :Returns:
+        ComparisonResult: Difference and verdict.
+
+    :Usage:
+        self.assertTrue(compare_images(self.screenshot_folder + "/test1.png", reference_file).is_similar)
+    """
+    actual = load_image(actual_file)
+    difference_percent, stopped_early, mask = compare_arrays(actual, load_image(reference_file),
+                                                             allowed_percent=allowed_percent, stop_early=stop_early)
+    if difference_file is not None and mask is not None and mask.any():
+        write_difference_image(actual, mask, difference_file)
+    else:
+        difference_file = None
+
+    result = ComparisonResult(difference_percent, allowed_percent, stopped_early, difference_file)
+    log("Compared %s with %s: difference%s %.2f%%, allowed %.2f%%." % (
+        actual_file, reference_file, " >=" if stopped_early else "=", difference_percent, allowed_percent))
+    return result
+
+
+def compare_with_reference(actual_file, reference_name, device_type="Phone", **kwargs):
+    """Compares screenshot with reference screenshot stored in REF_SCREENSHOTS_ROOT_FOLDER/<device type>/.
+
+    Difference image is written next to the screenshot with "_difference" suffix.
+
+    :Usage:
+        compare_with_reference(self.screenshot_folder + "/test1.png", "test1.png", device_type=self.device_type)
+    """
+    reference_file = os.path.join(REF_SCREENSHOTS_ROOT_FOLDER, device_type, reference_name)
+    kwargs.setdefault("difference_file", os.path.splitext(actual_file)[0] + "_difference.png")
+    return compare_images(actual_file, reference_file, **kwargs)
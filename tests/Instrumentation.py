@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-"
+"""Module records latency of WebDriver commands.
+
+Every command of a driver (find, click, send keys, execute script, touch actions, screenshot, implicit wait, ...) goes
+through WebDriver.execute(), elements found by the driver use it as well. instrument_driver() wraps execute() of
+a driver object, so each command is timed and recorded with its payload size and outcome into a histogram of its
+command name and, for find commands, into a histogram of its locator. Statistics are exported as JSON at the end
+of a run.
+
+:Usage:
+    instrument_driver(self.driver)
+    ...
+    DEFAULT_COMMAND_STATISTICS.export(GlobalConstants.COMMAND_STATISTICS_FILE)
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from .Logger import LOGGER
+from .GlobalConstants import LATENCY_BUCKETS_MS
+
+# commands looking up elements, their latency is recorded per locator as well
+FIND_COMMANDS = ("findElement", "findElements", "findChildElement", "findChildElements")
+
+
+class LatencyHistogram(object):
+    """Histogram of command latencies with fixed buckets.
+
+    Attributes:
+        - bounds (list): Upper bounds of buckets, ms. Last bucket has no upper bound.
+        - buckets (list): Number of commands in each bucket, len(bounds) + 1 items.
+        - count (int): Number of commands.
+        - total_ms (float): Sum of latencies, ms.
+        - min_ms, max_ms (float): Min and max latency, ms.
+        - request_bytes, response_bytes (int): Sum of payload sizes.
+        - outcomes (dict): Outcome -> number of commands. Outcome is "ok" or exception class name.
+    """
+
+    def __init__(self, bounds=LATENCY_BUCKETS_MS):
+        self.bounds = list(bounds)
+        self.buckets = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.outcomes = {}
+
+    def add(self, latency_ms, request_bytes=0, response_bytes=0, outcome="ok"):
+        self.buckets[bisect.bisect_left(self.bounds, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.min_ms = latency_ms if self.min_ms is None else min(self.min_ms, latency_ms)
+        self.max_ms = latency_ms if self.max_ms is None else max(self.max_ms, latency_ms)
+        self.request_bytes += request_bytes
+        self.response_bytes += response_bytes
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def percentile(self, percent):
+        """Estimates latency percentile as upper bound of the bucket it falls into, ms.
+
+        Percentile of the last bucket is estimated as max latency.
+        """
+        if not self.count:
+            return None
+        rank = self.count * percent / 100.0
+        seen = 0
+        for index, number in enumerate(self.buckets):
+            seen += number
+            if seen >= rank and number:
+                return round(min(self.bounds[index], self.max_ms) if index < len(self.bounds) else self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def to_dict(self):
+        return {"count": self.count,
+                "total_ms": round(self.total_ms, 1),
+                "mean_ms": round(self.total_ms / self.count, 1) if self.count else None,
+                "min_ms": self.min_ms and round(self.min_ms, 1),
+                "max_ms": self.max_ms and round(self.max_ms, 1),
+                "p50_ms": self.percentile(50),
+                "p90_ms": self.percentile(90),
+                "p99_ms": self.percentile(99),
+                "request_bytes": self.request_bytes,
+                "response_bytes": self.response_bytes,
+                "outcomes": self.outcomes,
+                "buckets": dict(("<=" + str(bound) if index < len(self.bounds) else ">" + str(self.bounds[-1]),
+                                 number)
+                                for index, (bound, number) in enumerate(zip(self.bounds + [None], self.buckets))
+                                if number)}
+
+
+class CommandStatistics(object):
+    """Latency histograms per command and per locator.
+
+    Attributes:
+        - commands (dict): Command key -> LatencyHistogram. Key is WebDriver command name, "mobile:" scripts are
+            recorded separately, e.g. "executeScript mobile: scroll".
+        - locators (dict): "<strategy>: <locator>" -> LatencyHistogram of find commands.
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.locators = {}
+        self._lock = threading.Lock()
+
+    def record(self, command, params, latency_ms, request_bytes, response_bytes, outcome):
+        """Adds a command to histograms."""
+        key = command
+        if command == "executeScript" and params:
+            script = params.get("script") or ""
+            if script.startswith("mobile:"):
+                key = command + " " + script
+        with self._lock:
+            self.commands.setdefault(key, LatencyHistogram()).add(latency_ms, request_bytes, response_bytes, outcome)
+            if command in FIND_COMMANDS and params:
+                locator = u"%s: %s" % (params.get("using"), params.get("value"))
+                self.locators.setdefault(locator, LatencyHistogram()).add(latency_ms, request_bytes,
+                                                                          response_bytes, outcome)
+
+    def reset(self):
+        with self._lock:
+            self.commands = {}
+            self.locators = {}
+
+    def to_dict(self):
+        with self._lock:
+            return {"commands": dict((key, histogram.to_dict()) for key, histogram in self.commands.items()),
+                    "locators": dict((key, histogram.to_dict()) for key, histogram in self.locators.items())}
+
+    def export(self, file_path):
+        """Writes statistics to JSON file.
+
+        :Usage:
+            DEFAULT_COMMAND_STATISTICS.export(GlobalConstants.COMMAND_STATISTICS_FILE)
+        """
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(file_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+        LOGGER.info("Command statistics saved to %s", file_path)
+
+    def log_summary(self, top=10):
+        """Logs commands with the biggest total time."""
+        with self._lock:
+            histograms = sorted(self.commands.items(), key=lambda item: item[1].total_ms, reverse=True)[:top]
+        for key, histogram in histograms:
+            LOGGER.info("%s: %s commands, total %.0f ms, p50 %s ms, p90 %s ms, max %.1f ms.", key, histogram.count,
+                        histogram.total_ms, histogram.percentile(50), histogram.percentile(90), histogram.max_ms)
+
+
+DEFAULT_COMMAND_STATISTICS = CommandStatistics()
+
+
+def _payload_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, basestring):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=lambda o: getattr(o, "id", None)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def instrument_driver(driver, statistics=DEFAULT_COMMAND_STATISTICS):
+    """Wraps execute() of driver object, so all its commands are recorded to statistics.
+
+    Calling it again for the same driver does nothing.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - statistics (CommandStatistics): Statistics to record commands to.
+
+    :Returns:
+        WebDriver: The same driver object.
+
+    :Usage:
+        instrument_driver(self.driver)
+    """
+    if getattr(driver, "command_statistics", None) is not None:
+        return driver
+    execute = driver.execute
+
+    def instrumented_execute(driver_command, params=None):
+        start = time.time()
+        outcome = "ok"
+        response = None
+        try:
+            response = execute(driver_command, params)
+            return response
+        except Exception as e:
+            outcome = e.__class__.__name__
+            raise
+        finally:
+            latency_ms = (time.time() - start) * 1000.0
+            statistics.record(driver_command, params, latency_ms, _payload_size(params),
+                              _payload_size(response.get("value")) if response else 0, outcome)
+
+    driver.execute = instrumented_execute
+    driver.command_statistics = statistics
+    return driver
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-"
+"""Module contains list index: every cell of a scrollable list collected in one scroll pass.
+
+List is walked from top to bottom, one page source per page. Cells of each page are parsed locally into entries
+remembering the page they were seen on, the end of the list is detected by page fingerprint (see
+PageSnapshot.fingerprint()). Questions about the list are then answered from the index without talking to the device,
+and navigation to a known cell is a known number of scrolls. The page the list is on is told by its visible cells, so
+scrolls made outside of the index don't mislead it.
+
+:Usage:
+    index = harvest_list(self.driver, "target.frontMostApp().mainWindow().collectionViews()[0]", parse_book_cell)
+    "Emma" in index
+    index.find(format="PDF")
+    index.scroll_to(self.driver, "Emma")
+"""
+import time
+from .GlobalConstants import LIST_HARVEST_MAX_PAGES
+from .Logger import LOGGER
+from .PageSnapshot import PageSnapshot
+
+LIST_CELL_TAGS = ("UIACollectionCell", "UIATableCell")
+
+
+class ListEntry(object):
+    """Cell of the list.
+
+    Fields returned by cell parser are available as attributes: entry.title, entry.format.
+
+    Attributes:
+        - key: Cell key returned by cell parser, e.g. title.
+        - page (int): Number of pages scrolled down from the top of the list when the cell was seen.
+        - fields (dict): Cell fields returned by cell parser.
+    """
+
+    def __init__(self, key, page, fields):
+        self.key = key
+        self.page = page
+        self.fields = fields
+
+    def __getattr__(self, item):
+        try:
+            return self.__dict__["fields"][item]
+        except KeyError:
+            raise AttributeError(item)
+
+    def __repr__(self):
+        return "ListEntry(%r, page=%s)" % (self.key, self.page)
+
+
+class ListIndex(object):
+    """Cells of the list in list order.
+
+    Attributes:
+        - entries (list): ListEntry objects in list order.
+        - pages (int): Number of pages walked.
+        - complete (bool): True if the end of the list was reached, i.e. absence of a cell in the index means
+            absence in the list.
+        - position (int): Page the list was scrolled to when it was last seen by the index.
+        - elapsed (float): Time spent building the index, seconds.
+        - list_locator (str): Locator of the list.
+        - parse_cell (callable): Cell parser, see harvest_list().
+        - strategy (str): Location strategy of list_locator.
+    """
+
+    def __init__(self, list_locator=None, parse_cell=None, strategy="ios uiautomation"):
+        self.list_locator = list_locator
+        self.parse_cell = parse_cell
+        self.strategy = strategy
+        self.entries = []
+        self.pages = 0
+        self.complete = False
+        self.position = 0
+        self.elapsed = 0.0
+        self._by_key = {}
+        self._seen = set()
+
+    def add(self, key, page, fields):
+        """Adds cell, cells seen on two pages are added once.
+
+        :Returns:
+            bool: True if cell was added.
+        """
+        identity = (key, tuple(sorted(fields.items())))
+        if identity in self._seen:
+            return False
+        self._seen.add(identity)
+        entry = ListEntry(key, page, fields)
+        self.entries.append(entry)
+        self._by_key.setdefault(key, entry)
+        return True
+
+    def get(self, key, default=None):
+        """Returns the first entry with key."""
+        return self._by_key.get(key, default)
+
+    def find(self, **fields):
+        """Returns entries with all given field values.
+
+        :Usage:
+            index.find(format="PDF", favourite=True)
+        """
+        return [entry for entry in self.entries
+                if all(entry.fields.get(name) == value for name, value in fields.items())]
+
+    def __contains__(self, key):
+        return key in self._by_key
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def visible_keys(self, snapshot):
+        """Returns keys of visible cells of the list in snapshot, None if the list can't be resolved locally."""
+        lists = snapshot.resolve(self.strategy, self.list_locator)
+        if lists is None:
+            return None
+        return [parsed[0] for parsed in (self.parse_cell(cell) for cell in _visible_cells(lists)) if parsed is not None]
+
+    def page_of(self, snapshot):
+        """Returns page the list is scrolled to in snapshot: the latest page its visible cells were first seen on.
+
+        :Returns:
+            int: Page number.
+            None: If no visible cell is in the index.
+        """
+        pages = [self._by_key[key].page for key in self.visible_keys(snapshot) or () if key in self._by_key]
+        return max(pages) if pages else None
+
+    def scroll_to(self, driver, key, snapshot=None):
+        """Scrolls the list to the page where cell with key was seen.
+
+        Current page is told by visible cells of the current screen. The cell is checked to be visible after scrolling.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - key: Cell key.
+            - snapshot (PageSnapshot): Snapshot of the current screen, taken if not set.
+
+        :Returns:
+            ListEntry: Entry of the cell, the cell is visible.
+            None: If cell is not in the index, current page is unknown or the cell is not visible after scrolling.
+        """
+        entry = self.get(key)
+        if entry is None:
+            return None
+        if snapshot is None:
+            snapshot = PageSnapshot.capture(driver)
+        position = self.page_of(snapshot)
+        if position is None:
+            LOGGER.debug("Page of the list is unknown, no indexed cell is visible.")
+            return None
+        self.position = position
+        if key in self.visible_keys(snapshot):
+            return entry
+
+        direction = "down" if entry.page > position else "up"
+        for _ in range(abs(entry.page - position)):
+            if not _scroll(driver, direction):
+                return None
+        LOGGER.debug("Scrolled list %s from page %s to page %s.", direction, position, entry.page)
+        self.position = entry.page
+        if key not in (self.visible_keys(PageSnapshot.capture(driver)) or ()):
+            LOGGER.debug("Cell %r is not visible after scrolling to page %s.", key, entry.page)
+            return None
+        return entry
+
+
+def _visible_cells(lists):
+    """Returns visible cells of the first list."""
+    for list_node in lists[:1]:
+        for cell in list_node:
+            if cell.tag in LIST_CELL_TAGS and cell.get("visible") != "false":
+                yield cell
+
+
+def _scroll(driver, direction):
+    try:
+        driver.execute_script("mobile: scroll", {"direction": direction})
+        return True
+    except Exception as e:
+        LOGGER.warning("Failed to swipe %s: %s", direction, e)
+        return False
+
+
+def harvest_list(driver, list_locator, parse_cell, strategy="ios uiautomation", max_pages=LIST_HARVEST_MAX_PAGES,
+                 from_top=True):
+    """Walks the list once and indexes its visible cells.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - list_locator (str): Locator of the list: collection or table view.
+        - parse_cell (callable): Takes cell node of page source, returns (key, fields dict) or None to skip the cell.
+        - strategy (str): Location strategy of list_locator.
+        - max_pages (int): Max number of pages to walk.
+        - from_top (bool): If True, the list is scrolled to the top first. Otherwise pages are counted from
+            the current position.
+
+    :Returns:
+        ListIndex: Index of the cells, the list is left scrolled to its last walked page.
+
+    :Usage:
+        harvest_list(self.driver, "target.frontMostApp().mainWindow().collectionViews()[0]", parse_book_cell)
+    """
+    start = time.time()
+    index = ListIndex(list_locator, parse_cell, strategy)
+    snapshot = PageSnapshot.capture(driver)
+
+    if from_top:
+        scrolls = 0
+        while scrolls < max_pages and _scroll(driver, "up"):
+            scrolls += 1
+            previous, snapshot = snapshot, PageSnapshot.capture(driver)
+            if snapshot.fingerprint() == previous.fingerprint():
+                break
+
+    page = 0
+    while True:
+        lists = snapshot.resolve(strategy, list_locator)
+        if lists is None:
+            raise ValueError("List locator can't be evaluated against page source: " + list_locator)
+        added = 0
+        for cell in _visible_cells(lists):
+            parsed = parse_cell(cell)
+            if parsed is not None and index.add(parsed[0], page, parsed[1]):
+                added += 1
+        index.pages = page + 1
+        LOGGER.debug("List page %s: %s new cells.", page, added)
+
+        if page + 1 >= max_pages or not _scroll(driver, "down"):
+            break
+        previous, snapshot = snapshot, PageSnapshot.capture(driver)
+        if snapshot.fingerprint() == previous.fingerprint():
+            index.complete = True
+            break
+        page += 1
+
+    index.position = page
+    index.elapsed = time.time() - start
+    LOGGER.debug("List indexed: %s cells on %s pages, end reached= %s, time= %.2f s", len(index), index.pages,
+                 index.complete, index.elapsed)
+    return index
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-"
+"""Module contains parameterized locators.
+
+Template is a locator with named parameters: ${name}. Template is parsed once, each parameter gets the escaping of
+the place it's used in, so any text can be passed as a parameter value:
+    - ios uiautomation: JavaScript string ("..." or '...'), NSPredicate string inside a JavaScript string
+      ("name == '...'") or code (array index). In LIKE pattern ("name LIKE '...'") wildcards * and ? are escaped
+      too, so the parameter matches literally.
+    - xpath: string literal is re-quoted, concat() is used if the value has both kinds of quotes.
+    - class_name: no escaping.
+Rendered locators are kept in LRU cache, so rendering the same locator again is a dictionary lookup.
+
+:Usage:
+    BOOK_BY_TITLE = LocatorTemplate("target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"${title}\"]")
+    BOOK_BY_TITLE.render(title="Pride and \"Prejudice\"")
+    BOOK_BY_TITLE.resolve(snapshot, title="Emma")
+"""
+import re
+import threading
+from collections import OrderedDict
+from .GlobalConstants import LOCATOR_CACHE_SIZE
+
+_placeholder_re = re.compile(r'\$\{([A-Za-z_]\w*)\}')
+# NSPredicate string right after it is LIKE pattern
+_like_operator_re = re.compile(r'\bLIKE(\[[a-z]*\])?\s*$', re.IGNORECASE)
+
+# places of parameters in ios uiautomation locators
+CODE = "code"
+JS_STRING = "js"
+PREDICATE_STRING = "predicate"
+LIKE_PATTERN = "like"
+
+
+class LRUCache(object):
+    """Thread safe dictionary keeping max_size last used items.
+
+    :Usage:
+        cache = LRUCache(100)
+        value = cache.get(key)
+        if value is None:
+            value = cache.put(key, compute(key))
+    """
+
+    def __init__(self, max_size=LOCATOR_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            if len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+        return value
+
+    def __len__(self):
+        return len(self._items)
+
+
+def escape_js_string(value, quote):
+    """Escapes text to be placed inside JavaScript string delimited with quote."""
+    return value.replace("\\", "\\\\").replace(quote, "\\" + quote).replace("\n", "\\n")
+
+
+def escape_predicate_string(value, quote):
+    """Escapes text to be placed inside NSPredicate string delimited with quote."""
+    return value.replace("\\", "\\\\").replace(quote, "\\" + quote)
+
+
+def escape_like_pattern(value):
+    """Escapes LIKE wildcards * and ? in text, so NSPredicate LIKE matches it literally."""
+    return value.replace("\\", "\\\\").replace("*", "\\*").replace("?", "\\?")
+
+
+def xpath_literal(value):
+    """Returns xpath string literal with value, xpath has no escaping so concat() is used if needed."""
+    if "'" not in value:
+        return "'" + value + "'"
+    if '"' not in value:
+        return '"' + value + '"'
+    return "concat(" + ", '\"', ".join('"' + part + '"' for part in value.split('"')) + ")"
+
+
+def _parse_uiautomation(template):
+    """Splits template into parts: text or (parameter name, place, JS quote, predicate quote)."""
+    parts = []
+    position = 0
+    js_quote = None
+    predicate_quote = None
+    # position of the opening quote of predicate string
+    predicate_start = 0
+    i = 0
+    while i < len(template):
+        match = _placeholder_re.match(template, i)
+        if match is not None:
+            parts.append(template[position:i])
+            if js_quote is None:
+                place = CODE
+            elif predicate_quote is None:
+                place = JS_STRING
+            elif _like_operator_re.search(template, 0, predicate_start):
+                place = LIKE_PATTERN
+            else:
+                place = PREDICATE_STRING
+            parts.append((match.group(1), place, js_quote, predicate_quote))
+            i = position = match.end()
+            continue
+        char = template[i]
+        if js_quote is None:
+            if char in "\"'":
+                js_quote = char
+        elif char == "\\":
+            # escaped JavaScript quote can delimit predicate string: "name == \"x\""
+            if template[i + 1:i + 2] == js_quote:
+                if predicate_quote is None:
+                    predicate_start = i
+                predicate_quote = None if predicate_quote == js_quote else (predicate_quote or js_quote)
+            i += 1
+        elif char == js_quote:
+            js_quote = predicate_quote = None
+        elif char in "\"'":
+            if predicate_quote is None:
+                predicate_start = i
+            predicate_quote = None if predicate_quote == char else (predicate_quote or char)
+        i += 1
+    parts.append(template[position:])
+    return parts
+
+
+def _parse_xpath(template):
+    """Splits template into parts: text or [literal parts] for string literals with parameters."""
+    parts = []
+    position = 0
+    i = 0
+    while i < len(template):
+        if template[i] in "\"'":
+            end = template.find(template[i], i + 1)
+            if end < 0:
+                break
+            literal = template[i + 1:end]
+            if _placeholder_re.search(literal):
+                parts.append(template[position:i])
+                parts.append(_split_placeholders(literal))
+                position = end + 1
+            i = end + 1
+        else:
+            i += 1
+    parts.append(template[position:])
+    return parts
+
+
+def _split_placeholders(text):
+    """Splits text into strings and (parameter name,) tuples."""
+    parts = []
+    position = 0
+    for match in _placeholder_re.finditer(text):
+        parts.append(text[position:match.start()])
+        parts.append((match.group(1),))
+        position = match.end()
+    parts.append(text[position:])
+    return parts
+
+
+class LocatorTemplate(object):
+    """Locator with named parameters.
+
+    Attributes:
+        - template (str): Locator with ${name} placeholders.
+        - strategy (str): "ios uiautomation", "xpath" or "class_name".
+        - parameters (set): Parameter names.
+    """
+
+    def __init__(self, template, strategy="ios uiautomation", cache_size=LOCATOR_CACHE_SIZE):
+        """Parses template.
+
+        :Args:
+            - template (str): Locator with ${name} placeholders.
+            - strategy (str): Location strategy of the locator, defines escaping.
+            - cache_size (int): Number of rendered locators kept.
+        """
+        self.template = template
+        self.strategy = strategy
+        self.parameters = set(_placeholder_re.findall(template))
+        if strategy == "ios uiautomation":
+            self._parts = _parse_uiautomation(template)
+        elif strategy == "xpath":
+            self._parts = _parse_xpath(template)
+        else:
+            self._parts = _split_placeholders(template)
+        self._cache = LRUCache(cache_size)
+
+    def __repr__(self):
+        return "LocatorTemplate(%r)" % self.template
+
+    def render(self, **parameters):
+        """Returns locator with parameter values inserted.
+
+        :Raises:
+            KeyError: If a parameter is missing.
+
+        :Usage:
+            BOOK_BY_TITLE.render(title="Emma")
+        """
+        key = tuple(sorted(parameters.items()))
+        locator = self._cache.get(key)
+        if locator is None:
+            missing = self.parameters.difference(parameters)
+            if missing:
+                raise KeyError("Locator template parameters are missing: " + ", ".join(sorted(missing)))
+            locator = self._cache.put(key, self._render(parameters))
+        return locator
+
+    def _render(self, parameters):
+        rendered = []
+        for part in self._parts:
+            if isinstance(part, basestring):
+                rendered.append(part)
+            elif isinstance(part, list):
+                rendered.append(xpath_literal(u"".join(
+                    item if isinstance(item, basestring) else _text(parameters[item[0]]) for item in part)))
+            elif len(part) == 1:
+                rendered.append(_text(parameters[part[0]]))
+            else:
+                name, place, js_quote, predicate_quote = part
+                value = _text(parameters[name])
+                if place == LIKE_PATTERN:
+                    value = escape_like_pattern(value)
+                if place in (PREDICATE_STRING, LIKE_PATTERN):
+                    value = escape_js_string(escape_predicate_string(value, predicate_quote), js_quote)
+                elif place == JS_STRING:
+                    value = escape_js_string(value, js_quote)
+                rendered.append(value)
+        return u"".join(_text(part) for part in rendered)
+
+    def resolve(self, snapshot, **parameters):
+        """Evaluates rendered locator against page snapshot, see PageSnapshot.resolve().
+
+        :Usage:
+            BOOK_BY_TITLE.resolve(self.current_snapshot(), title="Emma")
+        """
+        return snapshot.resolve(self.strategy, self.render(**parameters))
+
+
+def _text(value):
+    if isinstance(value, unicode):
+        return value
+    if isinstance(value, str):
+        return value.decode('utf-8')
+    return unicode(value)
+
+
+_templates = LRUCache()
+
+
+def get_locator_template(template, strategy="ios uiautomation"):
+    """Returns parsed template, templates are parsed once.
+
+    :Usage:
+        get_locator_template(session_locators(self.driver)["books_page.book_locator_by_name"]).render(book_name=name)
+    """
+    key = (template, strategy)
+    locator_template = _templates.get(key)
+    if locator_template is None:
+        locator_template = _templates.put(key, LocatorTemplate(template, strategy))
+    return locator_template
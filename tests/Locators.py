@@ -1,32 +1,220 @@
 # -*- coding: utf-8 -*-"
-""" Locators for page elements"""
+""" Locators for page elements
 
-locators = {}
+Locators are grouped into profiles: locale x device type x orientation. Profile is compiled once from base locators
+(English phone) and overrides of its locale, device type and orientation, and can't be changed afterwards, so it's
+safe to share it between threads and sessions. Each WebDriver session is bound to its own profile, see
+bind_locator_profile().
 
-# page1 English phone
-locators["page1.title"] = "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")"
-locators["page1.ok_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]"
-locators["page1.cancel_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]"
+:Usage:
+    bind_locator_profile(self.driver, get_locator_profile(locale="de", device_type="Tablet"))
+    session_locators(self.driver)["page1.title"]
+"""
+import threading
+from .GlobalConstants import DEFAULT_LOCALE
+from .SessionState import get_session_state
 
-# page2 English phone
-locators["page2.title"] = "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")"
-locators["page2.ok_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]"
-locators["page2.cancel_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]"
+DEFAULT_DEVICE_TYPE = "Phone"
+DEFAULT_ORIENTATION = "PORTRAIT"
 
+# English phone. Parameterized locators use ${name} placeholders, see LocatorTemplates
+BASE_LOCATORS = {
+    # page1
+    "page1.title": "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")",
+    "page1.ok_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]",
+    "page1.cancel_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]",
 
-# set locators for german localization. can be called on test initialization
-def set_german():
-    # page1 English phone
-    locators["page1.title"] = "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Bücher'\")"
-    locators["page1.ok_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Kürzlich\"]"
-    locators["page1.cancel_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Anmelden\"]"
+    # page2
+    "page2.title": "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")",
+    "page2.ok_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]",
+    "page2.cancel_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]",
 
+    # books page: lists are selected by segmented control, selected button has value 1
+    "books_page.all": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"All\"]",
+    "books_page.favorites": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Favorites\"]",
+    "books_page.recent": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Recent\"]",
+    "books_page.search_button": "target.frontMostApp().mainWindow().navigationBar().buttons()[\"Search\"]",
+    "books_page.more_menu_button": "target.frontMostApp().mainWindow().navigationBar().buttons()[\"More\"]",
+    "books_page.top_book": "target.frontMostApp().mainWindow().collectionViews()[0].cells()[0]",
+    "books_page.book_locator_by_name":
+        "target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"${book_name}\"]",
+    "book.toggle_favourite": "target.frontMostApp().mainWindow().collectionViews()[0].cells()"
+                             ".firstWithPredicate(\"ANY buttons.name == 'favorites'\").buttons()[\"favorites\"]",
+    # book list; templates with ${name} parameters are rendered by get_locator_template()
+    "books_page.book_list": "target.frontMostApp().mainWindow().collectionViews()[0]",
+    # favorites buttons of all cells of the book list, xpath
+    "books_page.favorite_buttons": "//UIACollectionView/UIACollectionCell/UIAButton[@name='favorites']",
+    "books_page.book_cell_by_title": "target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"${title}\"]",
+    "books_page.book_favorite_button_by_title":
+        "target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"${title}\"].buttons()[\"favorites\"]",
+    "books_page.book_favorite_button_by_text":
+        "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name "
+        "LIKE '${text}'\").buttons()[\"favorites\"]",
+    "books_page.book_format_text":
+        "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name "
+        "LIKE '${book_format}'\").staticTexts().firstWithPredicate(\"value like '${book_format}'\")",
+    "books_page.visible_book_format_text":
+        "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name "
+        "LIKE '${book_format}' and isVisible == 1\").staticTexts().firstWithPredicate(\"value like '${book_format}'\")",
+    # view mode: list button of More menu on phone, of the page on tablet
+    "books_more_menu.list_button": "target.frontMostApp().actionSheet().buttons()[\"List\"]",
+    "books_page.mode_list": "target.frontMostApp().mainWindow().navigationBar().buttons()[\"List\"]",
 
-# set locators for tablet interface in case it differs from phone's
-def set_tablet():
-    # page2 English tablet
-    locators["page2.title"] = "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")"
-    locators["page2.ok_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]"
-    locators["page2.cancel_button"] = "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]"
+    # authors page
+    "authors_page.authors_title": "target.frontMostApp().mainWindow().navigationBar().staticTexts()[\"Authors\"]",
+}
 
-    print "Locators has been set for Tablet device type."
+# locators differing from English ones, by locale
+LOCALE_OVERRIDES = {
+    "de": {
+        # page1 German
+        "page1.title": "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Bücher'\")",
+        "page1.ok_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Kürzlich\"]",
+        "page1.cancel_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Anmelden\"]",
+        # books page German
+        "books_page.all": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Alle\"]",
+        "books_page.favorites":
+            "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Favoriten\"]",
+        "books_page.recent": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Kürzlich\"]",
+        "books_more_menu.list_button": "target.frontMostApp().actionSheet().buttons()[\"Liste\"]",
+        "books_page.mode_list": "target.frontMostApp().mainWindow().navigationBar().buttons()[\"Liste\"]",
+        # authors page German
+        "authors_page.authors_title":
+            "target.frontMostApp().mainWindow().navigationBar().staticTexts()[\"Autoren\"]",
+    },
+}
+
+# locators differing from phone's ones, by device type
+DEVICE_TYPE_OVERRIDES = {
+    "Tablet": {
+        # page2 tablet
+        "page2.title": "target.frontMostApp().mainWindow().staticTexts().firstWithPredicate(\"value like 'Books'\")",
+        "page2.ok_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Ok\"]",
+        "page2.cancel_button": "target.frontMostApp().mainWindow().segmentedControls()[0].buttons()[\"Cancel\"]",
+    },
+}
+
+# locators differing from portrait ones, by orientation
+ORIENTATION_OVERRIDES = {
+    "LANDSCAPE": {},
+}
+
+
+class LocatorProfile(object):
+    """Immutable set of locators of one locale, device type and orientation.
+
+    Works as a read only dictionary: profile["page1.title"].
+
+    Attributes:
+        - locale (str): Application locale, e.g. "en", "de".
+        - device_type (str): "Phone" or "Tablet".
+        - orientation (str): "PORTRAIT" or "LANDSCAPE".
+    """
+    __slots__ = ("locale", "device_type", "orientation", "_locators", "_overrides")
+
+    def __init__(self, locale, device_type, orientation, locators, overrides=None):
+        object.__setattr__(self, "locale", locale)
+        object.__setattr__(self, "device_type", device_type)
+        object.__setattr__(self, "orientation", orientation)
+        object.__setattr__(self, "_locators", dict(locators))
+        # locators added by derive(), kept to derive profiles of other orientations
+        object.__setattr__(self, "_overrides", dict(overrides) if overrides else None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Locator profile can't be changed, create a new one with derive().")
+
+    def __getitem__(self, key):
+        try:
+            return self._locators[key]
+        except KeyError:
+            raise KeyError("Locator \"%s\" is missing from profile %r" % (key, self))
+
+    def __contains__(self, key):
+        return key in self._locators
+
+    def __iter__(self):
+        return iter(self._locators)
+
+    def __len__(self):
+        return len(self._locators)
+
+    def __repr__(self):
+        return "LocatorProfile(%s, %s, %s)" % (self.locale, self.device_type, self.orientation)
+
+    def get(self, key, default=None):
+        return self._locators.get(key, default)
+
+    def derive(self, overrides):
+        """Creates a new profile with some locators replaced or added. Profile itself is not changed.
+
+        :Usage:
+            profile.derive({"page1.title": "target.frontMostApp().mainWindow().staticTexts()[0]"})
+        """
+        all_overrides = dict(self._overrides or {})
+        all_overrides.update(overrides)
+        locators = dict(self._locators)
+        locators.update(overrides)
+        return LocatorProfile(self.locale, self.device_type, self.orientation, locators, all_overrides)
+
+    def with_orientation(self, orientation):
+        """Returns profile of the same locale and device type for another orientation, derived locators are kept."""
+        profile = get_locator_profile(self.locale, self.device_type, orientation)
+        return profile.derive(self._overrides) if self._overrides else profile
+
+
+def compile_locator_profile(locale, device_type, orientation):
+    """Merges base locators with overrides of locale, device type and orientation, in this order."""
+    locators = dict(BASE_LOCATORS)
+    locators.update(LOCALE_OVERRIDES.get(locale, {}))
+    locators.update(DEVICE_TYPE_OVERRIDES.get(device_type, {}))
+    locators.update(ORIENTATION_OVERRIDES.get(orientation, {}))
+    return LocatorProfile(locale, device_type, orientation, locators)
+
+
+_profiles = {}
+_profiles_lock = threading.Lock()
+
+
+def get_locator_profile(locale=DEFAULT_LOCALE, device_type=DEFAULT_DEVICE_TYPE, orientation=DEFAULT_ORIENTATION):
+    """Returns locator profile, each profile is compiled once per process.
+
+    :Args:
+        - locale (str): Application locale, e.g. "en", "de".
+        - device_type (str): "Phone" or "Tablet".
+        - orientation (str): "PORTRAIT" or "LANDSCAPE".
+
+    :Returns:
+        LocatorProfile: Compiled profile.
+
+    :Usage:
+        get_locator_profile(locale="de", device_type="Tablet")
+    """
+    key = (locale, device_type, orientation.upper())
+    profile = _profiles.get(key)
+    if profile is None:
+        with _profiles_lock:
+            profile = _profiles.get(key)
+            if profile is None:
+                profile = _profiles[key] = compile_locator_profile(*key)
+    return profile
+
+
+def bind_locator_profile(driver, profile):
+    """Makes page objects of driver's session use profile. Other sessions are not affected.
+
+    :Usage:
+        bind_locator_profile(self.driver, get_locator_profile(device_type=self.device_type))
+    """
+    get_session_state(driver).locator_profile = profile
+
+
+def session_locators(driver):
+    """Returns locator profile bound to driver's session, default profile if none was bound.
+
+    :Usage:
+        session_locators(self.driver)["page1.title"]
+    """
+    state = get_session_state(driver)
+    if state.locator_profile is None:
+        state.locator_profile = get_locator_profile()
+    return state.locator_profile
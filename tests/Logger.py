@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-"
+"""Module contains low overhead leveled logger.
+
+Messages are formatted lazily: format arguments are kept as is and the message is built only when it's written
+somewhere. Every record goes to an in-memory ring buffer, which is dumped to a file only if a test fails. Console
+gets records of console level and above through a buffered writer.
+
+:Usage:
+    LOGGER.debug("Element \"%s\" found on page %s.", element_name, page)
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from collections import deque
+from .GlobalConstants import LOG_CONSOLE_LEVEL, LOG_RING_SIZE, LOG_BUFFER_LINES
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVELS = dict((name, level) for level, name in LEVEL_NAMES.items())
+
+
+def _to_unicode(value):
+    if isinstance(value, unicode):
+        return value
+    if not isinstance(value, str):
+        value = str(value)
+    return value.decode('utf-8', 'replace')
+
+
+class Logger(object):
+    """Leveled logger with lazy formatting, buffered console output and in-memory ring buffer.
+
+    Attributes:
+        - console_level (int): Min level of records written to console.
+        - ring (deque): Last records, (time, level, message, args). Not formatted.
+    """
+
+    def __init__(self, console_level=LOG_CONSOLE_LEVEL, ring_size=LOG_RING_SIZE, buffer_lines=LOG_BUFFER_LINES,
+                 stream=None):
+        """Creates logger.
+
+        :Args:
+            - console_level (int or str): Min level written to console, e.g. INFO or "INFO".
+            - ring_size (int): Number of last records kept in memory.
+            - buffer_lines (int): Console is written when this number of lines is buffered.
+            - stream (file): Console stream. Default: sys.stdout.
+        """
+        self.console_level = LEVELS.get(console_level, console_level)
+        self.ring = deque(maxlen=ring_size)
+        self.buffer_lines = buffer_lines
+        self.stream = stream
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._time_second = None
+        self._time_text = ""
+
+    def is_enabled_for(self, level):
+        """Checks if records of level are written to console. Useful to skip building expensive arguments."""
+        return level >= self.console_level
+
+    def log(self, level, message, *args):
+        """Records a message. Message is formatted with args (% operator) only if it's written somewhere."""
+        record = (time.time(), level, message, args)
+        with self._lock:
+            self.ring.append(record)
+            if level >= self.console_level:
+                self._buffer.append(record)
+                if len(self._buffer) >= self.buffer_lines or level >= WARNING:
+                    self._flush_buffer()
+
+    def debug(self, message, *args):
+        self.log(DEBUG, message, *args)
+
+    def info(self, message, *args):
+        self.log(INFO, message, *args)
+
+    def warning(self, message, *args):
+        self.log(WARNING, message, *args)
+
+    def error(self, message, *args):
+        self.log(ERROR, message, *args)
+
+    def format_record(self, record):
+        """Formats record as "HH:MM:SS: message". Caller holds the lock, the time text of the last second is shared."""
+        timestamp, level, message, args = record
+        second = int(timestamp)
+        if second != self._time_second:
+            self._time_second = second
+            self._time_text = time.strftime("%H:%M:%S", time.localtime(timestamp))
+        message = _to_unicode(message)
+        if args:
+            try:
+                message = message % tuple(_to_unicode(arg) if isinstance(arg, str) else arg for arg in args)
+            except (TypeError, ValueError):
+                message = message + u" " + u" ".join(_to_unicode(repr(arg)) for arg in args)
+        if level != INFO:
+            message = LEVEL_NAMES.get(level, str(level)) + u": " + message
+        return self._time_text + u": " + message
+
+    def _flush_buffer(self):
+        if not self._buffer:
+            return
+        stream = self.stream or sys.stdout
+        text = u"\n".join(self.format_record(record) for record in self._buffer) + u"\n"
+        del self._buffer[:]
+        stream.write(text.encode('utf-8'))
+        stream.flush()
+
+    def flush(self):
+        """Writes buffered console records."""
+        with self._lock:
+            self._flush_buffer()
+
+    def clear_ring(self):
+        """Forgets records kept in memory, e.g. at the beginning of a test."""
+        with self._lock:
+            self.ring.clear()
+
+    def dump_ring(self, file_path):
+        """Writes all records kept in memory to file, e.g. when a test fails.
+
+        :Usage:
+            LOGGER.dump_ring(TEST_RESULTS_HOME_FOLDER + "logs/" + self._testMethodName + ".log")
+        """
+        with self._lock:
+            lines = [self.format_record(record).encode('utf-8') for record in self.ring]
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(file_path, 'w') as f:
+            for line in lines:
+                f.write(line)
+                f.write("\n")
+
+
+LOGGER = Logger()
+# processes ending with os._exit() (multiprocessing workers) skip atexit, they have to flush explicitly
+atexit.register(LOGGER.flush)
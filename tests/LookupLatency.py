@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-"
+"""Module contains adaptive lookup timeouts learned from element lookup latency of previous runs.
+
+Elements wait for a hand-picked time_to_wait, which is far too long for a lookup expected to fail on a fast screen.
+LatencyStore records how long it took elements to appear, per locator key and device type, in a local SQLite file
+shared by runs and parallel workers. TimeoutPolicy derives lookup deadline from a high percentile of those times:
+    deadline = percentile * factor + margin, not less than floor and never more than time_to_wait.
+Until a locator has enough samples, time_to_wait is used as is. Only lookups which found the element on the current
+page without scrolling are recorded, lookups resolved against page snapshots didn't wait at all.
+Learned deadlines apply to optional elements only (probes which are often legitimately missing), elements callers
+expect to be present always wait time_to_wait.
+
+:Usage:
+    timeout = DEFAULT_TIMEOUT_POLICY.timeout(self.driver, "books_page.all", 10)
+    DEFAULT_TIMEOUT_POLICY.record(self.driver, "books_page.all", 0.35)
+    DEFAULT_TIMEOUT_POLICY.store.flush()
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from .GlobalConstants import LOOKUP_LATENCY_FILE, LATENCY_SAMPLES_PER_LOCATOR, ADAPTIVE_TIMEOUTS, \
+    ADAPTIVE_TIMEOUT_PERCENTILE, ADAPTIVE_TIMEOUT_FACTOR, ADAPTIVE_TIMEOUT_MARGIN, ADAPTIVE_TIMEOUT_FLOOR, \
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES
+from .Locators import session_locators
+from .Logger import LOGGER
+
+_SCHEMA = ("CREATE TABLE IF NOT EXISTS lookup_latency (locator_key TEXT NOT NULL, device_type TEXT NOT NULL, "
+           "elapsed REAL NOT NULL, recorded REAL NOT NULL)",
+           "CREATE INDEX IF NOT EXISTS lookup_latency_key ON lookup_latency (locator_key, device_type, recorded)")
+
+
+def percentile(samples, percent):
+    """Returns nearest-rank percentile of samples, None if there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(int(math.ceil(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
+
+
+class LatencyStore(object):
+    """Lookup times by locator key and device type, kept in SQLite file across runs.
+
+    Samples of a device type are loaded from the file once per process. New samples are kept in memory and written
+    by flush(), only the latest max_samples per locator stay in the file. Store errors are logged and never fail
+    a test: the store is disabled instead.
+
+    Attributes:
+        - file_path (str): SQLite database file.
+        - max_samples (int): Number of latest samples kept per locator key and device type.
+        - enabled (bool): False after a database error.
+    """
+
+    def __init__(self, file_path=LOOKUP_LATENCY_FILE, max_samples=LATENCY_SAMPLES_PER_LOCATOR):
+        self.file_path = file_path
+        self.max_samples = max_samples
+        self.enabled = True
+        # device type -> locator key -> samples, latest last
+        self._samples = {}
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def samples(self, locator_key, device_type):
+        """Returns latest lookup times of locator on device type, seconds."""
+        with self._lock:
+            return list(self._device_samples(device_type).get(locator_key, ()))
+
+    def add(self, locator_key, device_type, elapsed):
+        """Records lookup time, seconds. It's written to the file by flush()."""
+        with self._lock:
+            samples = self._device_samples(device_type).setdefault(locator_key, [])
+            samples.append(elapsed)
+            del samples[:-self.max_samples]
+            self._pending.append((locator_key, device_type, elapsed, time.time()))
+
+    def flush(self):
+        """Writes new samples to the file and drops samples beyond max_samples of their locators.
+
+        :Returns:
+            int: Number of samples written.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.enabled:
+            return 0
+        try:
+            folder = os.path.dirname(self.file_path)
+            if folder and not os.path.exists(folder):
+                os.makedirs(folder)
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany("INSERT INTO lookup_latency VALUES (?, ?, ?, ?)", pending)
+                    for locator_key, device_type in set((sample[0], sample[1]) for sample in pending):
+                        connection.execute(
+                            "DELETE FROM lookup_latency WHERE locator_key = ? AND device_type = ? AND rowid NOT IN "
+                            "(SELECT rowid FROM lookup_latency WHERE locator_key = ? AND device_type = ? "
+                            "ORDER BY recorded DESC LIMIT ?)",
+                            (locator_key, device_type, locator_key, device_type, self.max_samples))
+            finally:
+                connection.close()
+        except (sqlite3.Error, OSError) as e:
+            self._disable(e)
+            return 0
+        LOGGER.debug("%s lookup latency samples saved to %s.", len(pending), self.file_path)
+        return len(pending)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.file_path, timeout=30)
+        for statement in _SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    def _device_samples(self, device_type):
+        """Returns samples of device type, loads them from the file on first use. Called under lock."""
+        samples = self._samples.get(device_type)
+        if samples is None:
+            samples = self._samples[device_type] = self._load(device_type)
+        return samples
+
+    def _load(self, device_type):
+        samples = {}
+        if not self.enabled or not os.path.exists(self.file_path):
+            return samples
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute("SELECT locator_key, elapsed FROM lookup_latency WHERE device_type = ? "
+                                          "ORDER BY recorded", (device_type,)).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            self._disable(e)
+            return samples
+        for locator_key, elapsed in rows:
+            samples.setdefault(locator_key, []).append(elapsed)
+        for locator_samples in samples.values():
+            del locator_samples[:-self.max_samples]
+        LOGGER.debug("Loaded lookup latency of %s locators on %s.", len(samples), device_type)
+        return samples
+
+    def _disable(self, error):
+        LOGGER.warning("Lookup latency store %s is disabled: %s", self.file_path, error)
+        self.enabled = False
+
+
+class TimeoutPolicy(object):
+    """Derives lookup deadlines from recorded lookup times.
+
+    Attributes:
+        - store (LatencyStore): Recorded lookup times.
+        - percentile (float): Percentile of lookup times the deadline is based on.
+        - factor (float): Percentile is multiplied by factor.
+        - margin (float): Added to deadline, seconds.
+        - floor (float): Min deadline, seconds.
+        - min_samples (int): Deadline is learned only if locator has at least this number of samples.
+        - enabled (bool): If False, time_to_wait is always used as is and nothing is recorded.
+        - adapted (int): Number of lookups given a learned deadline shorter than time_to_wait.
+    """
+
+    def __init__(self, store=None, percentile=ADAPTIVE_TIMEOUT_PERCENTILE, factor=ADAPTIVE_TIMEOUT_FACTOR,
+                 margin=ADAPTIVE_TIMEOUT_MARGIN, floor=ADAPTIVE_TIMEOUT_FLOOR, min_samples=ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+                 enabled=ADAPTIVE_TIMEOUTS):
+        self.store = store if store is not None else LatencyStore()
+        self.percentile = percentile
+        self.factor = factor
+        self.margin = margin
+        self.floor = floor
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.adapted = 0
+
+    def timeout(self, driver, locator_key, ceiling):
+        """Returns deadline of a lookup.
+
+        :Args:
+            - driver (WebDriver): Web driver object, device type is taken from its locator profile.
+            - locator_key (str): Locator name or locator itself.
+            - ceiling (float): Element's time_to_wait, seconds. Deadline is never longer.
+
+        :Returns:
+            float: Deadline, seconds.
+        """
+        if not self.enabled or ceiling <= self.floor:
+            return ceiling
+        samples = self.store.samples(locator_key, session_locators(driver).device_type)
+        if len(samples) < self.min_samples:
+            return ceiling
+        deadline = min(max(percentile(samples, self.percentile) * self.factor + self.margin, self.floor), ceiling)
+        if deadline < ceiling:
+            self.adapted += 1
+            LOGGER.debug("Learned deadline of \"%s\": %.2f s instead of %s s (%s samples).", locator_key, deadline,
+                         ceiling, len(samples))
+        return deadline
+
+    def record(self, driver, locator_key, elapsed):
+        """Records time it took element to appear, seconds."""
+        if self.enabled:
+            self.store.add(locator_key, session_locators(driver).device_type, elapsed)
+
+    def log_summary(self):
+        LOGGER.info("Adaptive timeouts: %s optional lookups with learned deadline.", self.adapted)
+
+
+DEFAULT_TIMEOUT_POLICY = TimeoutPolicy()
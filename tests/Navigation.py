@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-"
+"""Module contains navigation graph of page objects and router moving the app between them along the cheapest path.
+
+Page object classes are the pages of the graph. Each class declares its outgoing transitions (see Transition) and
+can tell from a page snapshot whether it's on the screen (BasePageObject.is_current). Page subclasses are more
+specific pages: a route to BooksPageObject ends on any Books list, a route to BooksFavouritesPageObject ends on the
+Favorites list only.
+
+Router finds the cheapest path from the current page with Dijkstra's algorithm. Cost of a transition is the median
+of its measured times, kept in the same SQLite file as lookup times (see LookupLatency), or its declared cost if it
+wasn't measured yet. Each hop is verified against a page snapshot; if the app ended up on another known page, the
+route is planned again from there. A hop which failed (its action raised or returned False) is verified the same way,
+so it's planned again as well.
+
+:Usage:
+    favorites = DEFAULT_NAVIGATION_GRAPH.navigate(self.driver, BooksFavouritesPageObject)
+"""
+import heapq
+import itertools
+import time
+from selenium.common.exceptions import WebDriverException
+from .GlobalConstants import DEFAULT_TRANSITION_COST, NAVIGATION_MAX_REPLANS, NAVIGATION_IDENTIFY_TIMEOUT
+from .Locators import session_locators
+from .LookupLatency import LatencyStore, percentile
+from .PageSnapshot import PageSnapshot
+from .SessionState import get_session_state
+from .WaitEngine import DEFAULT_WAIT_ENGINE
+from .Logger import LOGGER
+
+
+class NavigationError(Exception):
+    """Target page can't be reached."""
+    pass
+
+
+class Transition(object):
+    """Outgoing transition of a page object: action moving the app from the page to target page.
+
+    Transitions are declared in transitions attribute of page object class and inherited by its subclasses.
+
+    Attributes:
+        - target (str): Class name of target page object.
+        - action: Name of source page object method, or function taking driver. Action returning False failed.
+        - cost (float): Expected time of transition, seconds. Used until the transition is measured.
+        - name (str): Transition name for logs.
+
+    :Usage:
+        transitions = (Transition("BooksFavouritesPageObject", "open_favorites"),
+                       Transition("AuthorsPageObject", partial(open_tab, tab_name="Authors", verify_tap=verify_selected),
+                                  cost=2.0))
+    """
+
+    def __init__(self, target, action, cost=DEFAULT_TRANSITION_COST, name=None):
+        self.target = target
+        self.action = action
+        self.cost = cost
+        self.name = name or (action if isinstance(action, basestring) else "to " + target)
+
+    def perform(self, driver, source, snapshot=None):
+        """Performs transition from source page.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - source (type): Page object class the app is on.
+            - snapshot (PageSnapshot): Current snapshot, given to source page object created to call its method.
+        """
+        if not isinstance(self.action, basestring):
+            return self.action(driver)
+        page = source(driver)
+        if snapshot is not None and getattr(page, "use_snapshot", False):
+            page.snapshot = snapshot
+        return getattr(page, self.action)()
+
+    def key(self, source):
+        """Name measured times of the transition from source page are stored under."""
+        return "navigation: " + source.__name__ + " -> " + self.target
+
+
+class NavigationGraph(object):
+    """Pages and transitions between them.
+
+    Attributes:
+        - pages (dict): Class name -> page object class.
+        - store (LatencyStore): Measured transition times.
+        - max_replans (int): Max number of times the route is planned again after a hop ended on a wrong page.
+        - identify_timeout (float): Max time to identify the page after a hop, seconds.
+        - hops (int): Number of transitions performed.
+        - failed_hops (int): Number of transitions whose action failed.
+        - replans (int): Number of times the route was planned again.
+    """
+
+    def __init__(self, store=None, max_replans=NAVIGATION_MAX_REPLANS, identify_timeout=NAVIGATION_IDENTIFY_TIMEOUT):
+        self.pages = {}
+        self.store = store if store is not None else LatencyStore()
+        self.max_replans = max_replans
+        self.identify_timeout = identify_timeout
+        self.hops = 0
+        self.failed_hops = 0
+        self.replans = 0
+
+    def register(self, page_class):
+        """Adds page object class to the graph, its transitions are taken from its transitions attribute.
+
+        :Usage:
+            DEFAULT_NAVIGATION_GRAPH.register(BooksPageObject)
+        """
+        self.pages[page_class.__name__] = page_class
+        return page_class
+
+    def transitions(self, page_class):
+        """Returns transitions of page leading to other registered pages."""
+        return [transition for transition in page_class.transitions
+                if transition.target in self.pages and not issubclass(page_class, self.pages[transition.target])]
+
+    def cost(self, driver, source, transition):
+        """Returns median of measured times of transition, its declared cost if it wasn't measured."""
+        samples = self.store.samples(transition.key(source), session_locators(driver).device_type)
+        return percentile(samples, 50) if samples else transition.cost
+
+    def route(self, driver, source, target):
+        """Finds the cheapest path from source page to target page or its subclass.
+
+        :Args:
+            - driver (WebDriver): Web driver object, device type of its session selects measured costs.
+            - source (type): Page object class the app is on.
+            - target (type): Page object class to get to.
+
+        :Returns:
+            list: Hops: tuples of source page class and transition. Empty if source is target already.
+            None: If target can't be reached.
+        """
+        order = itertools.count()
+        queue = [(0.0, next(order), source, [])]
+        visited = set()
+        while queue:
+            cost, _, page, path = heapq.heappop(queue)
+            if issubclass(page, target):
+                LOGGER.debug("Route %s -> %s: %s, cost= %.2f s", source.__name__, target.__name__,
+                             [transition.name for _, transition in path], cost)
+                return path
+            if page in visited:
+                continue
+            visited.add(page)
+            for transition in self.transitions(page):
+                next_page = self.pages[transition.target]
+                if next_page not in visited:
+                    heapq.heappush(queue, (cost + self.cost(driver, page, transition), next(order), next_page,
+                                           path + [(page, transition)]))
+        return None
+
+    def identify(self, driver, snapshot, expected=None):
+        """Tells which page is on the screen.
+
+        Expected page and its subclasses are checked first, the most specific page which is current is returned.
+        Expected page is trusted if it can't tell from snapshot.
+
+        :Returns:
+            type: Page object class, None if no registered page is current.
+        """
+        pages = sorted(self.pages.values(), key=lambda page: len(page.__mro__), reverse=True)
+        if expected is not None:
+            for page in pages:
+                if issubclass(page, expected) and page.is_current(driver, snapshot):
+                    return page
+            if expected.is_current(driver, snapshot) is None:
+                return expected
+        for page in pages:
+            if (expected is None or not issubclass(page, expected)) and page.is_current(driver, snapshot):
+                return page
+        return None
+
+    def current_page(self, driver, snapshot=None):
+        """Returns page the app is on: the last page navigated to if it's still on the screen, otherwise the page
+        identified from snapshot.
+
+        :Args:
+            - snapshot (PageSnapshot): Snapshot of the current screen, taken if not set.
+        """
+        if snapshot is None:
+            snapshot = PageSnapshot.capture(driver)
+        state = get_session_state(driver)
+        state.current_page = self.identify(driver, snapshot, state.current_page)
+        return state.current_page
+
+    def identify_after_hop(self, driver, expected):
+        """Identifies the page the app is on after a hop, polling while no registered page is current.
+
+        :Returns:
+            tuple: Page object class (None if the page is still unknown after identify_timeout) and the last snapshot.
+        """
+        last = []
+
+        def identified():
+            snapshot = PageSnapshot.capture(driver)
+            last[:] = [snapshot]
+            return self.identify(driver, snapshot, expected)
+
+        page = DEFAULT_WAIT_ENGINE.until(driver, identified, self.identify_timeout).value
+        return page, last[0]
+
+    def navigate(self, driver, target):
+        """Moves the app to target page along the cheapest path, verifying each hop.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - target: Page object class or its name.
+
+        :Returns:
+            BasePageObject: Target page object of the page the app is on, it has the snapshot taken after the last
+            hop.
+
+        :Raises:
+            NavigationError: If current page is unknown, there is no route or hops keep ending on wrong pages.
+
+        :Usage:
+            favorites = DEFAULT_NAVIGATION_GRAPH.navigate(self.driver, BooksFavouritesPageObject)
+        """
+        target = self.pages[target] if isinstance(target, basestring) else target
+        state = get_session_state(driver)
+        snapshot = PageSnapshot.capture(driver)
+        page = self.current_page(driver, snapshot)
+        replans = 0
+        while page is None or not issubclass(page, target):
+            if page is None:
+                raise NavigationError("Current page is unknown, can't navigate to " + target.__name__)
+            path = self.route(driver, page, target)
+            if not path:
+                raise NavigationError("No route from " + page.__name__ + " to " + target.__name__)
+            for source, transition in path:
+                expected = self.pages[transition.target]
+                LOGGER.debug("Navigating %s -> %s: %s", source.__name__, expected.__name__, transition.name)
+                start = time.time()
+                try:
+                    failed = transition.perform(driver, source, snapshot) is False
+                except (WebDriverException, AssertionError) as e:
+                    # page objects fail with AssertionError when an element is missing
+                    LOGGER.warning("Navigation %s -> %s failed: %s", source.__name__, expected.__name__, e)
+                    failed = True
+                elapsed = time.time() - start
+                self.hops += 1
+                if failed:
+                    self.failed_hops += 1
+                page, snapshot = self.identify_after_hop(driver, expected)
+                state.current_page = page
+                if failed or page is None or not issubclass(page, expected):
+                    break
+                self.store.add(transition.key(source), session_locators(driver).device_type, elapsed)
+            else:
+                continue
+            if page is not None and issubclass(page, target):
+                # hop missed its page but landed on the target
+                break
+            replans += 1
+            self.replans += 1
+            if replans > self.max_replans:
+                raise NavigationError("Failed to navigate to " + target.__name__ + ", the app is on " +
+                                      (page.__name__ if page is not None else "unknown page"))
+            LOGGER.info("Navigation hop ended on %s, planning the route again.",
+                        page.__name__ if page is not None else "unknown page")
+
+        page_object = page(driver)
+        if getattr(page_object, "use_snapshot", False):
+            page_object.snapshot = snapshot
+        return page_object
+
+    def log_statistics(self):
+        LOGGER.info("Navigation: %s hops, %s failed, %s routes planned again.", self.hops, self.failed_hops,
+                    self.replans)
+
+
+DEFAULT_NAVIGATION_GRAPH = NavigationGraph()
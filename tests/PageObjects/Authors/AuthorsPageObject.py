@@ -1,20 +1,36 @@
 # -*- coding: utf-8 -*-"
+from functools import partial
 from ..BaseObjects import BasePageElement, BasePageObject
-from ...Locators import locators
-from ...Helpers import log
+from ...Locators import session_locators
+from ...Helpers import log, open_tab
+from ...GlobalConstants import TAB_TRANSITION_COST
+from ...Navigation import Transition, DEFAULT_NAVIGATION_GRAPH
+from ...PageSnapshot import verify_selected
 
 
 class AuthorsPageObject(BasePageObject):
     """Page object represents Books page of the app"""
+    transitions = (Transition("BooksPageObject", partial(open_tab, tab_name="Books", verify_tap=verify_selected),
+                              cost=TAB_TRANSITION_COST, name="Books tab"),)
+
     def __init__(self, driver):
         log("Opening Authors page...")
         self.driver = driver
         self.title = AuthorsTitleElement(driver=self.driver,
-                                         locator=locators["authors_page.authors_title"],
+                                         locator=session_locators(self.driver)["authors_page.authors_title"],
                                          strategy='ios uiautomation',
-                                         element_name="AuthorsTitleElement")
+                                         element_name="AuthorsTitleElement").locate()
         log("Authors page opened.")
 
+    @classmethod
+    def is_current(cls, driver, snapshot):
+        """Authors page is on the screen if its title is."""
+        nodes = cls.nodes_in_snapshot(driver, snapshot, "authors_page.authors_title")
+        return None if nodes is None else bool(nodes)
+
 
 class AuthorsTitleElement(BasePageElement):
     pass
+
+
+DEFAULT_NAVIGATION_GRAPH.register(AuthorsPageObject)
@@ -1,10 +1,24 @@
 # -*- coding: utf-8 -*-"
 """Module to store application base page elements"""
+import copy
 import unittest
 from time import strftime
 import datetime
-from ..GlobalConstants import DEFAULT_WAIT_FOR_ELEMENT, DEFAULT_LOCAL_RESULTS_FOLDER
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from ..GlobalConstants import DEFAULT_WAIT_FOR_ELEMENT, DEFAULT_LOCAL_RESULTS_FOLDER, USE_PAGE_SNAPSHOTS, \
+    SCROLL_PROBE_WAIT
 from ..Helpers import log, replace_text
+from ..Logger import LOGGER
+from ..Locators import session_locators
+from ..PageSnapshot import PageSnapshot, SnapshotElement, verify_selected
+from ..WaitEngine import DEFAULT_WAIT_ENGINE
+from ..BulkActions import tap_all, toggle_all, read_all_texts
+from ..DeviceGeometry import get_device_geometry
+from ..Screenshots import save_screenshot
+from ..ScrollSearch import ScrollSearch, SEARCH_DIRECTIONS
+from ..Gestures import scroll_to_visible
+from ..LookupLatency import DEFAULT_TIMEOUT_POLICY
+from ..TapCache import ElementRect, rect_key, get_cached_rect, remember_rect, forget_rect, tap_cached_rect
 
 
 class BasePageObject(unittest.TestCase):
@@ -14,11 +28,142 @@ class BasePageObject(unittest.TestCase):
     Normally is a container for UI elements(BasePageElement),
     that's why class can be used not only for the whole page, but to represent any set of UI element as well.
     For example: context menus, alerts, panes of controls, etc.
+
+    Elements can be declared as class attributes (see BasePageElement). Such elements are looked up on first
+    access and cached per page object instance until invalidated.
+
+    In snapshot mode page source is fetched once and all elements of the page object are resolved against it.
+    Snapshot should be invalidated after any action changing the screen.
+
+    Page objects are pages of the navigation graph (see Navigation): transitions lists ways to leave the page,
+    is_current() tells whether the page is on the screen.
+
+    Attributes:
+        - use_snapshot (bool): If True, elements are resolved against page snapshot first.
+        - snapshot (PageSnapshot): Current page snapshot. None if not taken yet or invalidated.
+        - transitions (tuple): Outgoing transitions of the page (Navigation.Transition), inherited by subclasses.
     """
+    use_snapshot = USE_PAGE_SNAPSHOTS
+    snapshot = None
+    transitions = ()
 
     def __init__(self):
         pass
 
+    @classmethod
+    def is_current(cls, driver, snapshot):
+        """Tells whether the page is on the screen.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - snapshot (PageSnapshot): Snapshot of the current screen.
+
+        :Returns:
+            bool: True if the page is on the screen, False if it isn't.
+            None: If it can't be told from snapshot.
+        """
+        return None
+
+    @staticmethod
+    def nodes_in_snapshot(driver, snapshot, locator_key, strategy='ios uiautomation'):
+        """Resolves locator of the session's locator profile against snapshot.
+
+        :Returns:
+            list: Matching nodes.
+            None: If locator is not in the profile or can't be evaluated locally.
+        """
+        locator = session_locators(driver).get(locator_key)
+        if locator is None:
+            return None
+        return snapshot.resolve(strategy, locator)
+
+    def current_snapshot(self):
+        """Returns current page snapshot, takes a new one if needed.
+
+        :Returns:
+            PageSnapshot: Current snapshot.
+            None: If snapshot mode is off.
+
+        :Usage:
+            BasePageElement(driver=self.driver, locator=locator, snapshot=self.current_snapshot())
+        """
+        if not self.use_snapshot:
+            return None
+        if self.snapshot is None:
+            self.snapshot = PageSnapshot.capture(self.driver)
+        return self.snapshot
+
+    def invalidate_snapshot(self):
+        """Drops current page snapshot. Should be called after navigation, scrolling, toggling, etc."""
+        self.snapshot = None
+
+    def invalidate_elements(self, keep_persistent=True):
+        """Drops cached elements declared on the page object class and current page snapshot.
+
+        Should be called after navigation. Declared elements will be looked up again on next access.
+
+        :Args:
+            - keep_persistent (bool): If True, elements declared with persistent=True (tab bar, segmented controls
+                and other screen chrome) stay cached.
+
+        :Usage:
+            self.invalidate_elements()
+        """
+        self.invalidate_snapshot()
+        bound_elements = self.__dict__.get('_bound_elements', {})
+        for key, element in bound_elements.items():
+            if not (keep_persistent and element.persistent):
+                del bound_elements[key]
+
+    def tap_all(self, locator, strategy="ios uiautomation", removes_elements=False):
+        """Taps every element matching locator. Element list is fetched once and fetched again only if it changes.
+
+        :Args:
+            - locator (str): Locator of the elements.
+            - strategy (str): Location strategy of the locator.
+            - removes_elements (bool): If True, tap removes element from the screen, taps are repeated until no
+                element is left.
+
+        :Returns:
+            BulkActionSummary: Number of taps, failures, list requests and elements left.
+
+        :Usage:
+            summary = self.tap_all(session_locators(self.driver)["books_page.favorite_buttons"], strategy="xpath",
+                                   removes_elements=True)
+        """
+        summary = tap_all(self.driver, locator, strategy=strategy, removes_elements=removes_elements)
+        self.invalidate_snapshot()
+        return summary
+
+    def toggle_all(self, locator, state, strategy="ios uiautomation"):
+        """Sets every switch or toggle button matching locator to state. Elements already in the state are not tapped.
+
+        :Returns:
+            BulkActionSummary: Tapped elements have True in results.
+
+        :Usage:
+            self.toggle_all(session_locators(self.driver)["books_page.favorite_buttons"], False, strategy="xpath")
+        """
+        summary = toggle_all(self.driver, locator, state, strategy=strategy, snapshot=self.current_snapshot())
+        self.invalidate_snapshot()
+        return summary
+
+    def read_all_texts(self, locator, strategy="ios uiautomation"):
+        """Reads texts of all elements matching locator, from page snapshot if possible.
+
+        :Returns:
+            list: Texts in order of elements.
+
+        :Usage:
+            titles = self.read_all_texts(BOOK_TITLES, strategy="xpath")
+        """
+        return read_all_texts(self.driver, locator, strategy=strategy, snapshot=self.current_snapshot()).results
+
+
+def verify_selected_tap(element):
+    """verify_tap of tab bar and segmented control buttons: checks in a new snapshot that the button got selected."""
+    return verify_selected(element.driver, element.strategy, element.locator, element.index)
+
 
 class BasePageElement(unittest.TestCase):
     """Class represents base UI element.
@@ -26,9 +171,22 @@ class BasePageElement(unittest.TestCase):
     Should be used as a base class for each single element on a page: link, button, picture, slider, textbox, etc.
     Contains attributes representing element's features and methods corresponding to possible actions.
 
+    Element is looked up lazily: on first access to element or is_present attribute. Resolved WebElement is cached
+    and looked up again if it became stale.
+
+    Element can be declared as a page object class attribute without driver. In this case it works as a descriptor:
+    on access through a page object instance, a copy bound to the page object's driver is created and cached
+    in that instance. Deleting the attribute drops the cached copy.
+
+    :Usage:
+        class BooksPageObject(BasePageObject):
+            all_books = BooksAllBooksElement(locator_key="books_page.all", element_name="AllBooksButton")
+
     Attributes:
         - element (WebElement): Appium(Selenium) web element itself. All actions are applied to it.
         - is_present (bool): Indicates if an element is present on current page.
+        - polls (int): Number of find requests sent during the last search.
+        - last_search (ScrollSearchResult): Result of the last live search: pages scrolled, time spent, etc.
         - screen_width (int): Measured actual screen widths of device.
         - screen_height (int): Measured actual screen height of device.
         - scroll_top_coordinate (int): Calculated top coordinate on page to swipe from/to.
@@ -37,14 +195,22 @@ class BasePageElement(unittest.TestCase):
     """
 
     def __get__(self, obj, cls=None):
-        pass
+        if obj is None:
+            return self
+        bound_elements = obj.__dict__.setdefault('_bound_elements', {})
+        if id(self) not in bound_elements:
+            bound_elements[id(self)] = self.bind(obj)
+        return bound_elements[id(self)]
 
     def __delete__(self, obj):
-        pass
+        obj.__dict__.get('_bound_elements', {}).pop(id(self), None)
 
-    def __init__(self, driver, strategy="ios uiautomation", locator="", time_to_wait=DEFAULT_WAIT_FOR_ELEMENT,
+    def __init__(self, driver=None, strategy="ios uiautomation", locator="", time_to_wait=DEFAULT_WAIT_FOR_ELEMENT,
                  screenshot_location=DEFAULT_LOCAL_RESULTS_FOLDER, element_name="", index=0,
-                 count_similar_elements=False, pages_to_search=1, search_direction='down', fail_if_not_found=True):
+                 count_similar_elements=False, pages_to_search=1, search_direction='down', fail_if_not_found=True,
+                 snapshot=None, locator_key=None, persistent=False, wait_engine=DEFAULT_WAIT_ENGINE,
+                 probe_wait=SCROLL_PROBE_WAIT, tap_by_coordinates=False, verify_tap=None,
+                 timeout_policy=DEFAULT_TIMEOUT_POLICY, optional=False):
         """Creates element class object.
 
         :Args:
@@ -61,8 +227,26 @@ class BasePageElement(unittest.TestCase):
             - pages_to_search (int): In element is not found on the screen, page will be scrolled this number of times.
                 1 is default.
             - search_direction (str): In element is not found on the screen, page will be scrolled in this direction.
-                Allowed values: "up', "down". Default: "down".
+                Allowed values: "up', "down", "both" (down to the end of the list, then up). Default: "down".
             - fail_if_not_found (bool): If true and element not found test fails, otherwise returns None.
+            - snapshot (PageSnapshot): If set, element is resolved against the snapshot first, live search is used
+                only if element is not found in it. Default: None.
+            - locator_key (str): Locator name. If set, locator is taken from locator profile of the session when
+                declared element is bound to a page object.
+            - persistent (bool): If True, declared element stays cached when page object elements are invalidated
+                after navigation. Default: False.
+            - wait_engine (WaitEngine): Engine polling for element, server implicit wait is kept at zero.
+            - probe_wait (float): Max time in seconds to look for element on each page after scrolling.
+            - tap_by_coordinates (bool): If True, element's rectangle is cached in the session and select() taps it
+                by coordinates without looking the element up. For static elements only: tab bar, segmented controls.
+                Used only with verify_tap, a tap by coordinates which can't be verified could silently miss.
+            - verify_tap (callable): Takes the element, returns False if tap by coordinates missed, e.g.
+                verify_selected_tap for tab bar and segmented control buttons.
+            - timeout_policy (TimeoutPolicy): Shortens time_to_wait of optional element to a deadline learned from
+                lookup times of previous runs. None - time_to_wait is always used.
+            - optional (bool): If True, element is a probe which is often legitimately missing, lookup gives up at
+                the learned deadline. Otherwise element is waited for time_to_wait, as callers checking presence
+                assert on the result. Default: False.
 
         :Usage:
             BasePageElement(driver=self.driver,
@@ -88,24 +272,109 @@ class BasePageElement(unittest.TestCase):
         self.pages_to_search = pages_to_search
         self.search_direction = search_direction
         self.fail_if_not_found = fail_if_not_found
+        self.snapshot = snapshot
+        self.locator_key = locator_key
+        self.persistent = persistent
+        self.wait_engine = wait_engine
+        self.probe_wait = probe_wait
+        self.tap_by_coordinates = tap_by_coordinates
+        self.verify_tap = verify_tap
+        self.timeout_policy = timeout_policy
+        self.optional = optional
+        self.page_object = None
+        self.polls = 0
+        self.last_search = None
+
+        if self.driver is not None and pages_to_search != 1:
+            self.measure_screen()
+
+        self._element = None
+        self._is_resolved = False
+
+    def bind(self, page_object):
+        """Creates a copy of declared element bound to page object.
+
+        :Args:
+            - page_object (BasePageObject): Page object, its driver and snapshot are used to find element.
+
+        :Returns:
+            BasePageElement: New not resolved element.
+        """
+        bound = copy.copy(self)
+        bound.driver = page_object.driver
+        bound.page_object = page_object
+        if self.locator_key is not None:
+            bound.locator = session_locators(bound.driver)[self.locator_key]
+        if bound.pages_to_search != 1:
+            bound.measure_screen()
+        bound.reset()
+        return bound
+
+    def measure_screen(self):
+        """Takes screen size and coordinates for swiping from session device geometry."""
+        geometry = get_device_geometry(self.driver)
+        self.screen_width = geometry.screen_width
+        self.screen_height = geometry.screen_height
+        self.scroll_top_coordinate = geometry.scroll_top_coordinate
+        self.scroll_bottom_coordinate = geometry.scroll_bottom_coordinate
+        self.scroll_x_coordinate = geometry.scroll_x_coordinate
+
+    @property
+    def element(self):
+        """WebElement, looked up on first access and cached."""
+        if not self._is_resolved:
+            self._element = self.find_element()
+            self._is_resolved = True
+        return self._element
+
+    @property
+    def is_present(self):
+        """Indicates if an element is present on current page. Element is looked up if not done yet."""
+        return self.element is not None
+
+    def locate(self):
+        """Looks up element right away instead of waiting for first access.
+
+        :Returns:
+            BasePageElement: Element itself.
+
+        :Usage:
+            self.title = AuthorsTitleElement(driver=self.driver, locator=locator).locate()
+        """
+        self.element
+        return self
 
-        if pages_to_search != 1:
-            self.screen_width = self.driver.get_window_size().__getitem__('width')
-            self.screen_height = self.driver.get_window_size().__getitem__('height')
-            self.scroll_top_coordinate = round(0.3 * self.screen_height, 0)
-            self.scroll_bottom_coordinate = round(0.8 * self.screen_height, 0)
-            self.scroll_x_coordinate = round(0.5 * self.screen_width, 0)
+    def reset(self):
+        """Drops cached WebElement, it will be looked up again on next access."""
+        self._element = None
+        self._is_resolved = False
 
-        self.is_present = False
+    def perform(self, action):
+        """Applies action to WebElement. If the element became stale, it is looked up again and action is retried.
 
-        self.element = self.find_element()
+        :Args:
+            - action (callable): Function taking WebElement.
+
+        :Returns:
+            Value returned by action.
+
+        :Usage:
+            element.perform(lambda web_element: web_element.click())
+        """
+        try:
+            return action(self.element)
+        except StaleElementReferenceException:
+            LOGGER.debug("Element \"%s\" is stale. Looking it up again...", self.element_name)
+            self.reset()
+            return action(self.element)
 
     def find_element(self):
         """Finds element by attributes specified in __init__ method.
 
         Method uses strategy and locator values to find element on a screen. Timeout specified by time_to_wait value.
         If search fails, screenshot is saved in screenshot_location. If pages_to_search > 1 and element is not found on
-        the screen page will be swiped pages_to_search times up or down depending on search_direction value.
+        the screen page will be swiped up to pages_to_search times up or down depending on search_direction value.
+        Scrolled pages are checked for probe_wait only, search stops at the end of the list (see ScrollSearch).
         If multiple elements with specified values are found, they all are presented as an array and element with
         specified index will be returned.
 
@@ -114,10 +383,7 @@ class BasePageElement(unittest.TestCase):
             None: If element not found and fail_if_not_found is False
             Assert: If element not found and fail_if_not_found is True
         """
-        log("Trying to find element \"" + self.element_name + "\"...")
-
-        # set time limit to look for element
-        self.driver.implicitly_wait(self.time_to_wait)
+        LOGGER.debug("Trying to find element \"%s\"...", self.element_name)
 
         # allowed locator strategies
         location_strategies = ["xpath", "class_name", "ios uiautomation"]
@@ -130,80 +396,60 @@ class BasePageElement(unittest.TestCase):
 
         # save the time when search for element started
         self.time = datetime.datetime.now()
-
-        # finding element
-        # counter of scrolled pages
-        i = 1
-        while i <= self.pages_to_search:
-            try:
-                if self.strategy == "ios uiautomation":
-                    elements_array = self.driver.find_elements_by_ios_uiautomation(self.locator)
-                    if self.count_similar_elements:
-                        log("Number of element with same locator= " + str(len(elements_array)) + ".")
-                    element = elements_array[self.index]
-                elif self.strategy == "xpath":
-                    elements_array = self.driver.find_elements_by_xpath(self.locator)
-                    if self.count_similar_elements:
-                        log("Number of element with same locator= " + str(len(elements_array)) + ".")
-                    element = elements_array[self.index]
-                elif self.strategy == "class_name":
-                    elements_array = self.driver.find_elements_by_class_name(self.locator)
-                    if self.count_similar_elements:
-                        log("Number of element with same locator= " + str(len(elements_array)) + ".")
-                    element = elements_array[self.index]
-                else:
-                    element = None
-                log("Element \"" + self.element_name + "\" found on page " + str(i) + ".")
-                self.driver.implicitly_wait(DEFAULT_WAIT_FOR_ELEMENT)
-
-                # print the time taken to find element
-                log("Time taken to find element= " + str(datetime.datetime.now() - self.time))
-
-                self.is_present = True
-
+        self.polls = 0
+
+        # resolve against snapshot first, it reflects the screen before any scrolling
+        snapshot = self.snapshot
+        if snapshot is None and self.page_object is not None:
+            snapshot = self.page_object.current_snapshot()
+        if snapshot is not None:
+            element = self.find_element_in_snapshot(snapshot)
+            if element is not None:
+                LOGGER.debug("Element \"%s\" found in page snapshot. Time taken to find element= %s",
+                             self.element_name, datetime.datetime.now() - self.time)
                 return element
-            except:
-                # saving screenshot and logging error for scrolled page
-                screenshot_file = "/Find_fail_" + \
-                                  replace_text(replace_text(self.element_name, old="'", new=""), old="\"", new="") + \
-                                  "_page_" + str(i) + strftime("_%H-%M-%S") + ".png"
-                screenshot_file_full = self.screenshot_location + screenshot_file
-                log("Saving screenshot " + screenshot_file_full)
-
-                # if not found exception is caught and test is not failed
-                if not self.fail_if_not_found:
-                    self.driver.save_screenshot(screenshot_file_full)
-
-                # saving final screenshot and logging error
-                log("Failed to find element \"" +
-                    replace_text(replace_text(self.element_name, old="'", new=""), old="\"", new="") + "\" on page " +
-                    str(i) + ": location strategy= \"" + self.strategy + "\"; locator= \"" + self.locator +
-                    "\"; index= \"" + str(self.index) + "\"; time to wait= \"" + str(self.time_to_wait) +
-                    "\"; screenshot file= \"" + screenshot_file + "\"")
-
-            # if not last page, swipe the scree
-            if i != self.pages_to_search:
-                if self.search_direction == 'down':
-                    log("Swiping down...")
-                    try:
-                        self.driver.execute_script("mobile: scroll", {"direction": "down"})
-                        log("Successfully swiped down.")
-                    except:
-                        log("Failed to swipe.")
-                elif self.search_direction == 'up':
-                    log("Swiping up...")
-                    try:
-                        self.driver.execute_script("mobile: scroll", {"direction": "up"})
-                        log("Successfully swiped up.")
-                    except:
-                        log("Failed to swipe.")
-                else:
-                    self.fail("Unrecognized swipe direction. Test failed.")
-
-            i += 1
-
-        # after the search set back location delay value
-        self.driver.implicitly_wait(DEFAULT_WAIT_FOR_ELEMENT)
+
+        if self.search_direction not in SEARCH_DIRECTIONS:
+            self.fail("Unrecognized swipe direction. Test failed.")
+
+        # server implicit wait stays zero, waiting is done by polling on the client side
+        # element is waited for time_to_wait (or learned deadline if optional) on the current page and for probe_wait
+        # on each scrolled one
+        first_wait = self.first_page_wait()
+        search = ScrollSearch(self.driver, self.find_live_elements_with_index, pages_to_search=self.pages_to_search,
+                              direction=self.search_direction, first_wait=first_wait,
+                              probe_wait=self.probe_wait, locate_in_snapshot=self.is_in_snapshot,
+                              wait_engine=self.wait_engine, snapshot=snapshot)
+        self.last_search = result = search.run()
+        self.polls += result.polls
+        if result.found and not result.pages_scrolled and self.timeout_policy is not None:
+            self.timeout_policy.record(self.driver, self.latency_key, result.elapsed)
+        if result.found:
+            elements_array = result.value
+            if self.count_similar_elements:
+                LOGGER.debug("Number of element with same locator= %s.", len(elements_array))
+
+            # print the time taken to find element
+            LOGGER.debug("Element \"%s\" found on page %s. Pages scrolled= %s. Polls= %s. Time taken to find "
+                         "element= %s", self.element_name, result.pages_checked, result.pages_scrolled, self.polls,
+                         datetime.datetime.now() - self.time)
+            return elements_array[self.index]
+
+        # saving screenshot and logging error
+        # if not found exception is caught and test is not failed
+        screenshot_file = None
+        if not self.fail_if_not_found:
+            screenshot_file = "/Find_fail_" + \
+                              replace_text(replace_text(self.element_name, old="'", new=""), old="\"", new="") + \
+                              "_pages_" + str(result.pages_checked) + strftime("_%H-%M-%S") + ".png"
+            save_screenshot(self.driver, self.screenshot_location + screenshot_file)
+
+        LOGGER.debug("Failed to find element \"%s\": location strategy= \"%s\"; locator= \"%s\"; index= \"%s\"; "
+                     "time to wait= \"%s\"; pages checked= \"%s\"; pages scrolled= \"%s\"; end of list reached= "
+                     "\"%s\"; polls= \"%s\"; time= \"%.2f\"; screenshot file= \"%s\"", self.element_name,
+                     self.strategy, self.locator, self.index, self.time_to_wait, result.pages_checked,
+                     result.pages_scrolled, ", ".join(result.reached_end), result.polls, result.elapsed,
+                     screenshot_file)
 
         # fail test if required
         if self.fail_if_not_found:
@@ -213,17 +459,220 @@ class BasePageElement(unittest.TestCase):
             # if not, return None object
             return None
 
+    @property
+    def latency_key(self):
+        """Name lookup times of the element are recorded under: locator name, or locator if element has none."""
+        return self.locator_key or self.locator
+
+    def first_page_wait(self):
+        """Returns time to wait for element on the current page: deadline learned by timeout policy for optional
+        element, time_to_wait otherwise.
+
+        Element which is expected to be present waits time_to_wait, giving up too early would fail the test.
+        """
+        if self.timeout_policy is None or not self.optional:
+            return self.time_to_wait
+        return self.timeout_policy.timeout(self.driver, self.latency_key, self.time_to_wait)
+
+    def is_absent(self, stability_window=0):
+        """Checks that element is not on the screen without waiting time_to_wait for it.
+
+        Element is resolved against page snapshot if locator can be evaluated locally, otherwise a single find request
+        is sent. Element missing from the snapshot is absent at once, without requests to the device. Only if the
+        caller sets stability_window, element is polled on the device for that time and must stay absent.
+        If pages_to_search > 1, each scrolled page is checked the same way, without waiting. No screenshots are saved.
+        If element is present, it is cached as if it was found by find_element().
+
+        :Args:
+            - stability_window (float): Time in seconds element must stay absent. 0 - single check.
+
+        :Returns:
+            bool: True if element is absent.
+
+        :Usage:
+            self.assertTrue(BasePageElement(driver=self.driver, locator=locator).is_absent(stability_window=1))
+        """
+        LOGGER.debug("Checking that element \"%s\" is absent...", self.element_name)
+        self.time = datetime.datetime.now()
+        self.polls = 0
+
+        snapshot = self.snapshot
+        if snapshot is None and self.page_object is not None:
+            snapshot = self.page_object.current_snapshot()
+        in_snapshot = self.is_in_snapshot(snapshot) if snapshot is not None else None
+        element = None
+        if in_snapshot:
+            element = self.find_element_in_snapshot(snapshot)
+        elif in_snapshot is None or stability_window or self.pages_to_search > 1:
+            search = ScrollSearch(self.driver, self.find_live_elements_with_index,
+                                  pages_to_search=self.pages_to_search, direction=self.search_direction,
+                                  first_wait=stability_window, probe_wait=0, locate_in_snapshot=self.is_in_snapshot,
+                                  wait_engine=self.wait_engine, snapshot=snapshot, first_miss_wait=stability_window)
+            self.last_search = result = search.run()
+            self.polls += result.polls
+            if result.found:
+                element = result.value[self.index]
+
+        # element found is cached, absence is not: the element may appear later
+        self._element = element
+        self._is_resolved = element is not None
+        is_absent = element is None
+        LOGGER.debug("Element \"%s\" absent= %s. Polls= %s. Time taken to check= %s", self.element_name, is_absent,
+                     self.polls, datetime.datetime.now() - self.time)
+        return is_absent
+
+    def find_live_elements(self):
+        """Sends a single find request to the device using element's strategy and locator.
+
+        :Returns:
+            list: WebElements found, may be empty.
+        """
+        if self.strategy == "ios uiautomation":
+            return self.driver.find_elements_by_ios_uiautomation(self.locator)
+        elif self.strategy == "xpath":
+            return self.driver.find_elements_by_xpath(self.locator)
+        elif self.strategy == "class_name":
+            return self.driver.find_elements_by_class_name(self.locator)
+        return []
+
+    def find_live_element(self):
+        """Finds WebElement on the device without scrolling, used for elements found in a snapshot.
+
+        :Returns:
+            WebElement: Element found.
+
+        :Raises:
+            NoSuchElementException: If element is not found within time_to_wait.
+        """
+        result = self.wait_engine.until(self.driver, self.find_live_elements_with_index, self.time_to_wait)
+        if result.timed_out:
+            raise NoSuchElementException("Element \"" + self.element_name + "\" not found on the screen.")
+        return result.value[self.index]
+
+    def find_live_elements_with_index(self):
+        """Condition for the wait engine: single find request, checks that element with index is present.
+
+        :Returns:
+            list: WebElements found, if there are enough of them for element's index.
+            None: Otherwise.
+        """
+        try:
+            elements_array = self.find_live_elements()
+        except WebDriverException:
+            return None
+        return elements_array if len(elements_array) > self.index else None
+
+    def find_element_in_snapshot(self, snapshot):
+        """Resolves element against page snapshot.
+
+        :Args:
+            - snapshot (PageSnapshot): Snapshot to resolve element against.
+
+        :Returns:
+            SnapshotElement: If element with specified index is present in the snapshot.
+            None: If element is missing from the snapshot or locator can't be evaluated locally.
+        """
+        nodes = snapshot.resolve(self.strategy, self.locator)
+        if nodes is None or len(nodes) <= self.index:
+            LOGGER.debug("Element \"%s\" not found in page snapshot, searching on the device...", self.element_name)
+            return None
+        if self.count_similar_elements:
+            LOGGER.debug("Number of element with same locator= %s.", len(nodes))
+        return SnapshotElement(nodes[self.index], self.find_live_element)
+
+    def is_in_snapshot(self, snapshot):
+        """Checks element against page snapshot taken while scrolling.
+
+        :Returns:
+            bool: True if element with specified index is present in the snapshot, False otherwise.
+            None: If locator can't be evaluated locally.
+        """
+        nodes = snapshot.resolve(self.strategy, self.locator)
+        return None if nodes is None else len(nodes) > self.index
+
+    def scroll_to_visible(self):
+        """Scrolls the list until element is visible with a single command, pages are scrolled by the server.
+
+        Element is looked up first, so it should be in the element tree already. Page snapshot is invalidated.
+
+        :Returns:
+            bool: True if the list was scrolled, False if element is not found or server can't scroll to it.
+
+        :Usage:
+            self.book_cell.scroll_to_visible()
+        """
+        if self.element is None:
+            return False
+        scrolled = self.perform(lambda element: scroll_to_visible(self.driver, element))
+        if scrolled and self.page_object is not None:
+            self.page_object.invalidate_snapshot()
+        return scrolled
+
     def select(self):
-        """Tap on element."""
+        """Tap on element.
+
+        If tap_by_coordinates and verify_tap are set, element's rectangle is cached the first time the element is
+        resolved, later taps are sent to its center without a lookup (see TapCache). If the tap fails, verify_tap says
+        it missed or current page snapshot shows the element elsewhere, rectangle is dropped and the element is looked
+        up again.
+        """
         log("Trying to tap element \"" + self.element_name + "\"...")
 
+        tap_by_coordinates = self.tap_by_coordinates and self.verify_tap is not None
         try:
-            self.element.click()
+            if not (tap_by_coordinates and self._tap_cached_rect()):
+                if tap_by_coordinates:
+                    self._remember_rect()
+                self.perform(lambda element: element.click())
             log("Element \"" + self.element_name + "\" tapped.")
         except:
             # log("Failed to tap element \"" + self.element_name + "\".")
             self.fail("Failed to tap element \"" + self.element_name + "\".")
 
+    def _rect_key(self):
+        return rect_key(self.driver, self.strategy, self.locator, self.index)
+
+    def _tap_cached_rect(self):
+        """Taps element by cached rectangle.
+
+        :Returns:
+            bool: True if tapped. False if rectangle is unknown, outdated or the tap missed.
+        """
+        key = self._rect_key()
+        rect = get_cached_rect(self.driver, key)
+        if rect is None:
+            return False
+        # snapshot already taken is checked for free, no new one is fetched
+        snapshot = self.page_object.snapshot if self.page_object is not None else self.snapshot
+        nodes = snapshot.resolve(self.strategy, self.locator) if snapshot is not None else None
+        if nodes is not None and (len(nodes) <= self.index or ElementRect.from_node(nodes[self.index]) != rect):
+            LOGGER.debug("Element \"%s\" moved from cached rectangle %r.", self.element_name, rect)
+            forget_rect(self.driver, key)
+            return False
+        if not tap_cached_rect(self.driver, key):
+            return False
+        if not self.verify_tap(self):
+            LOGGER.info("Tap on element \"%s\" at %r missed, looking element up.", self.element_name, rect)
+            forget_rect(self.driver, key)
+            self.reset()
+            return False
+        return True
+
+    def _remember_rect(self):
+        """Caches rectangle of resolved element, taken from page snapshot if element was found in it."""
+        element = self.element
+        if element is None:
+            return
+        try:
+            if isinstance(element, SnapshotElement):
+                rect = ElementRect.from_node(element.node)
+            else:
+                rect = ElementRect.from_element(element)
+        except WebDriverException as e:
+            LOGGER.debug("Failed to measure element \"%s\": %s", self.element_name, e)
+            return
+        remember_rect(self.driver, self._rect_key(), rect)
+
     def input_text(self, text, clean=True):
         """Type text into element.
 
@@ -238,12 +687,12 @@ class BasePageElement(unittest.TestCase):
         log("Typing " + self.text + " into \"" + self.element_name + "\" textbox...")
         if clean:
             try:
-                self.element.clear()
+                self.perform(lambda element: element.clear())
                 log("Element cleared")
             except:
                 log("Failed to clear element")
         try:
-            self.element.send_keys(text)
+            self.perform(lambda element: element.send_keys(text))
             log(text + " was successfully typed.")
         except:
             log("Failed to send \"" + text + "\" keys")
@@ -264,13 +713,13 @@ class BasePageElement(unittest.TestCase):
         log("Typing " + self.text + " into \"" + self.element_name + "\" textbox one by one...")
         if clean:
             try:
-                self.element.clear()
+                self.perform(lambda element: element.clear())
                 log("Element cleared")
             except:
                 log("Failed to clear element")
         try:
             for character in text:
-                self.element.send_keys(character)
+                self.perform(lambda element: element.send_keys(character))
             log(text + " was successfully typed.")
         except:
             log("Failed to send \"" + text + "\" keys")
@@ -284,7 +733,7 @@ class BasePageElement(unittest.TestCase):
         :Usage:
             element.get_text()
         """
-        return self.element.text
+        return self.perform(lambda element: element.text)
 
     def is_displayed(self, fail_test_if_not=False):
         """Checks if element is currently displayed on the screen.
@@ -299,10 +748,10 @@ class BasePageElement(unittest.TestCase):
         :Usage:
             element.is_displayed(fail_test_if_not=True)
         """
-        log("Checking if element is displayed on the screen...")
+        LOGGER.debug("Checking if element is displayed on the screen...")
         self.time = datetime.datetime.now()
-        is_displayed = self.element.is_displayed()
-        log("Time taken to check= " + str(datetime.datetime.now() - self.time))
+        is_displayed = self.perform(lambda element: element.is_displayed())
+        LOGGER.debug("Time taken to check= %s", datetime.datetime.now() - self.time)
 
         if fail_test_if_not and not is_displayed:
             self.fail("Test failed! Element " + self.element_name + " is not displayed!")
@@ -325,10 +774,10 @@ class BasePageElement(unittest.TestCase):
         :Usage:
             element.is_enabled()
         """
-        log("Checking if element is present somewhere on the screen...")
+        LOGGER.debug("Checking if element is present somewhere on the screen...")
         self.time = datetime.datetime.now()
-        is_enabled = self.element.is_enabled()
-        log("Time taken to check= " + str(datetime.datetime.now() - self.time))
+        is_enabled = self.perform(lambda element: element.is_enabled())
+        LOGGER.debug("Time taken to check= %s", datetime.datetime.now() - self.time)
 
         if fail_test_if_not and not is_enabled:
             self.fail("Test failed! Element " + self.element_name + " is not displayed!")
@@ -1,9 +1,37 @@
 # -*- coding: utf-8 -*-"
-from ..BaseObjects import BasePageElement, BasePageObject
-from ...Locators import locators
-from ...Helpers import log, scroll_up, replace_text
-from ...GlobalConstants import DEFAULT_WAIT_FOR_ELEMENT_SCROLL
-from ..OpenedBook.OpenedBookPageObject import OpenedBookPageObject
+from functools import partial
+from ..BaseObjects import BasePageElement, BasePageObject, verify_selected_tap
+from ...Locators import session_locators
+from ...LocatorTemplates import get_locator_template
+from ...Helpers import log, scroll_up, make_unicode, open_tab
+from ...GlobalConstants import DEFAULT_WAIT_FOR_ELEMENT_SCROLL, USE_PAGE_SNAPSHOTS, LIST_HARVEST_MAX_PAGES, \
+    TAP_CHROME_BY_COORDINATES, TAB_TRANSITION_COST
+from ...Navigation import Transition, DEFAULT_NAVIGATION_GRAPH
+from ...PageSnapshot import verify_selected
+from ...ListIndex import harvest_list
+from ...ScrollSearch import scroll_to_top
+
+
+
+def parse_book_cell(cell):
+    """Parses book cell of page source for the book index.
+
+    Cell has static texts in this order: title, author, format, and "favorites" button with value "1" when the book
+    is favorite.
+
+    :Returns:
+        tuple: Title and fields: title, author, format, favourite.
+    """
+    texts = [make_unicode(node.get("value") or node.get("name") or "") for node in cell if node.tag == "UIAStaticText"]
+    title = make_unicode(cell.get("name") or "") or (texts[0] if texts else None)
+    if not title:
+        return None
+    favourite = any(node.tag == "UIAButton" and node.get("name") == "favorites" and node.get("value") == "1"
+                    for node in cell)
+    return title, {"title": title,
+                   "author": texts[1] if len(texts) > 1 else None,
+                   "format": texts[2] if len(texts) > 2 else None,
+                   "favourite": favourite}
 
 
 # ------------------ Books page -----------------------------------
@@ -49,106 +77,186 @@ class BooksMoreMenuElement(BasePageElement):
 
 
 class BooksPageObject(BasePageObject):
-    """Page object represents Books page of the app"""
-    def __init__(self, driver, device_type="Phone"):
+    """Page object represents Books page of the app
+
+    Lists of the page (All, Favorites, Recent) are its subclasses, each is selected by its segmented control button.
+
+    Attributes:
+        - book_index (ListIndex): Books of the current list collected by build_book_index(). Presence checks and
+            find_book_by_title() use it instead of scrolling. Dropped after navigation and favourites toggling.
+        - segment_locator_key (str): Segmented control button selected on the list, None - any list of the page.
+    """
+    book_index = None
+    segment_locator_key = None
+    transitions = (Transition("BooksAllBooksPageObject", "open_all_books"),
+                   Transition("BooksFavouritesPageObject", "open_favorites"),
+                   Transition("BooksRecentReadPageObject", "open_recent_read"),
+                   Transition("AuthorsPageObject", partial(open_tab, tab_name="Authors", verify_tap=verify_selected),
+                              cost=TAB_TRANSITION_COST, name="Authors tab"))
+
+    all_books = BooksAllBooksElement(locator_key="books_page.all",
+                                     strategy='ios uiautomation',
+                                     element_name="AllBooksButton",
+                                     persistent=True,
+                                     tap_by_coordinates=TAP_CHROME_BY_COORDINATES,
+                                     verify_tap=verify_selected_tap)
+    favourites = BooksFavoritesElement(locator_key="books_page.favorites",
+                                       strategy='ios uiautomation',
+                                       element_name="FavoritesButton",
+                                       persistent=True,
+                                       tap_by_coordinates=TAP_CHROME_BY_COORDINATES,
+                                       verify_tap=verify_selected_tap)
+    recent_read = BooksRecentReadElement(locator_key="books_page.recent",
+                                         strategy='ios uiautomation',
+                                         element_name="RecentReadButton",
+                                         persistent=True,
+                                         tap_by_coordinates=TAP_CHROME_BY_COORDINATES,
+                                         verify_tap=verify_selected_tap)
+    search_icon = BooksSearchElement(locator_key="books_page.search_button",
+                                     strategy='ios uiautomation',
+                                     element_name="BooksSearchIcon",
+                                     persistent=True)
+    more_menu_icon = BooksMoreMenuElement(locator_key="books_page.more_menu_button",
+                                          strategy='ios uiautomation',
+                                          element_name="BooksMoreMenuIcon",
+                                          persistent=True)
+    top_book = BasePageElement(locator_key="books_page.top_book",
+                               strategy='ios uiautomation',
+                               element_name="BooksTopBookCell",
+                               pages_to_search=1)
+
+    def __init__(self, driver, device_type="Phone", use_snapshot=USE_PAGE_SNAPSHOTS):
         log("Opening Books page")
         self.driver = driver
         self.device_type = device_type
-
-        if not hasattr(self, 'all_books'):
-            log("Dont have attribute all_books. Initiating...")
-
-            self.all_books = BooksAllBooksElement(driver=self.driver,
-                                                  locator=locators["books_page.all"],
-                                                  strategy='ios uiautomation',
-                                                  element_name="AllBooksButton")
-
+        self.use_snapshot = use_snapshot
         log("Books page opened.")
 
-    def open_all_books(self):
-        if not hasattr(self, "all_books"):
-            log("Dont have attribute 'all_books'. Initiating...")
+    @classmethod
+    def is_current(cls, driver, snapshot):
+        """Books page is on the screen if its segmented control is, a list of it if its button is selected."""
+        nodes = cls.nodes_in_snapshot(driver, snapshot, cls.segment_locator_key or "books_page.all")
+        if nodes is None:
+            return None
+        if not nodes:
+            return False
+        return cls.segment_locator_key is None or nodes[0].get("value") == "1"
+
+    def invalidate_elements(self, keep_persistent=True):
+        super(BooksPageObject, self).invalidate_elements(keep_persistent)
+        self.book_index = None
+
+    def build_book_index(self, max_pages=LIST_HARVEST_MAX_PAGES, from_top=True):
+        """Walks the book list from top to bottom once and indexes all books: title, author, format, favourite state
+        and page they are on.
+
+        :Args:
+            - max_pages (int): Max number of pages to walk.
+            - from_top (bool): If True, the list is scrolled to the top first.
+
+        :Returns:
+            ListIndex: Book index, also kept in book_index.
+
+        :Usage:
+            index = books_page.build_book_index()
+            missing = [title for title in catalogue if title not in index]
+        """
+        log("Indexing book list...")
+        self.book_index = harvest_list(self.driver, session_locators(self.driver)["books_page.book_list"],
+                                       parse_book_cell, max_pages=max_pages, from_top=from_top)
+        self.invalidate_snapshot()
+        log("Book list indexed: " + str(len(self.book_index)) + " books on " + str(self.book_index.pages) + " pages.")
+        return self.book_index
+
+    def _complete_book_index(self):
+        """Returns book index if it covers the whole list, None otherwise."""
+        if self.book_index is not None and self.book_index.complete:
+            return self.book_index
+        return None
 
-            self.all_books = BooksAllBooksElement(driver=self.driver,
-                                                  locator=locators["books_page.all"],
-                                                  strategy='ios uiautomation',
-                                                  element_name="AllBooksButton")
-        return self.all_books.select()
+    def open_all_books(self):
+        result = self.all_books.select()
+        self.invalidate_elements()
+        return result
 
     def open_favorites(self):
-        if not hasattr(self, "favourites"):
-            log("Dont have attribute 'favourites'. Initiating...")
-
-            self.favourites = BooksFavoritesElement(driver=self.driver,
-                                                    locator=locators["books_page.favorites"],
-                                                    strategy='ios uiautomation',
-                                                    element_name="FavoritesButton")
-        return self.favourites.select()
+        result = self.favourites.select()
+        self.invalidate_elements()
+        return result
 
     def open_recent_read(self):
-        if not hasattr(self, "recent_read"):
-            log("Dont have attribute 'recent_read'. Initiating...")
-
-            self.recent_read = BooksRecentReadElement(driver=self.driver,
-                                                      locator=locators["books_page.recent"],
-                                                      strategy='ios uiautomation',
-                                                      element_name="RecentReadButton")
-        return self.recent_read.select()
+        result = self.recent_read.select()
+        self.invalidate_elements()
+        return result
 
     def open_search(self):
-        self.search_icon = BooksSearchElement(driver=self.driver,
-                                              locator=locators["books_page.search_button"],
-                                              strategy='ios uiautomation',
-                                              element_name="BooksSearchIcon")
-        return self.search_icon.select()
+        result = self.search_icon.select()
+        self.invalidate_elements()
+        return result
 
     def open_books_more_menu(self):
         if self.device_type == "Phone":
-            if not hasattr(self, "more_menu_icon"):
-                log("Dont have attribute 'more_menu_icon'. Initiating...")
-
-                self.more_menu_icon = BooksMoreMenuElement(driver=self.driver,
-                                                           locator=locators["books_page.more_menu_button"],
-                                                           strategy='ios uiautomation',
-                                                           element_name="BooksMoreMenuIcon")
-            return self.more_menu_icon.select()
+            result = self.more_menu_icon.select()
+            self.invalidate_elements()
+            return result
 
     def close_books_more_menu(self):
         self.open_books_more_menu()
 
-    def is_book_present_on_list_by_name(self, book_name, pages_to_search=1, time_to_wait=5):
+    def is_book_present_on_list_by_name(self, book_name, pages_to_search=1, time_to_wait=5, expect_absent=False,
+                                        stability_window=0):
+        book_index = self._complete_book_index()
+        if book_index is not None:
+            return make_unicode(book_name) in book_index
 
         # build locator
-        self.title_locator = replace_text(string=locators["books_page.book_locator_by_name"], old="book_name", new=book_name)
-
-        return BasePageElement(driver=self.driver,
-                               locator=self.title_locator,
-                               strategy='ios uiautomation',
-                               element_name=book_name,
-                               pages_to_search=pages_to_search,
-                               fail_if_not_found=False,
-                               time_to_wait=time_to_wait).is_present
-
-    def is_book_present_on_list_by_format(self, book_format, pages_to_search=1, time_to_wait=5):
+        self.title_locator = get_locator_template(session_locators(self.driver)["books_page.book_locator_by_name"]) \
+            .render(book_name=book_name)
+
+        return self._is_present(BasePageElement(driver=self.driver,
+                                                locator=self.title_locator,
+                                                strategy='ios uiautomation',
+                                                element_name=book_name,
+                                                pages_to_search=pages_to_search,
+                                                fail_if_not_found=False,
+                                                time_to_wait=time_to_wait), expect_absent, stability_window)
+
+    def is_book_present_on_list_by_format(self, book_format, pages_to_search=1, time_to_wait=5, expect_absent=False,
+                                        stability_window=0):
+        book_index = self._complete_book_index()
+        if book_index is not None:
+            return len(book_index.find(format=make_unicode(book_format))) > 0
 
         # build locator
-        self.format_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name LIKE '" + book_format + "'\").staticTexts().firstWithPredicate(\"value like '" + book_format + "'\")"
-
-        return BasePageElement(driver=self.driver,
-                               locator=self.format_locator,
-                               strategy='ios uiautomation',
-                               element_name=book_format,
-                               pages_to_search=pages_to_search,
-                               fail_if_not_found=False,
-                               time_to_wait=time_to_wait).is_present
-
-    def is_any_book_present(self, pages_to_search=1, time_to_wait=5):
-        return BasePageElement(driver=self.driver,
-                               locator=locators["book.toggle_favourite"],
-                               strategy='ios uiautomation',
-                               pages_to_search=pages_to_search,
-                               fail_if_not_found=False,
-                               time_to_wait=time_to_wait).is_present
+        self.format_locator = get_locator_template(session_locators(self.driver)["books_page.book_format_text"]) \
+            .render(book_format=book_format)
+
+        return self._is_present(BasePageElement(driver=self.driver,
+                                                locator=self.format_locator,
+                                                strategy='ios uiautomation',
+                                                element_name=book_format,
+                                                pages_to_search=pages_to_search,
+                                                fail_if_not_found=False,
+                                                time_to_wait=time_to_wait), expect_absent, stability_window)
+
+    def is_any_book_present(self, pages_to_search=1, time_to_wait=5, expect_absent=False, stability_window=0):
+        return self._is_present(BasePageElement(driver=self.driver,
+                                                locator=session_locators(self.driver)["book.toggle_favourite"],
+                                                strategy='ios uiautomation',
+                                                pages_to_search=pages_to_search,
+                                                fail_if_not_found=False,
+                                                time_to_wait=time_to_wait), expect_absent, stability_window)
+
+    def _is_present(self, element, expect_absent, stability_window=0):
+        """Checks presence of element.
+
+        If absence is expected, element is checked against page snapshot or with a single find request, instead of
+        waiting time_to_wait for the element. Absence is confirmed over stability_window seconds if it's set.
+        """
+        if expect_absent:
+            element.snapshot = self.current_snapshot()
+            return not element.is_absent(stability_window=stability_window)
+        return element.is_present
 
     def make_top_pane_visible(self):
         """Method makes top and bottom panes visible after they have been hidden by scrolling down."""
@@ -157,27 +265,33 @@ class BooksPageObject(BasePageObject):
                 scroll_up(self.driver, 1)
 
     def get_to_top_of_page(self):
-        if not hasattr(self, "top_book"):
-            log("Dont have attribute 'top_book'. Initiating...")
-            self.top_book = BasePageElement(driver=self.driver,
-                                            locator=locators["books_page.top_book"],
-                                            strategy='ios uiautomation',
-                                            element_name="BooksTopBookCell",
-                                            pages_to_search=1)
-        while not self.top_book.is_displayed():
-            scroll_up(self.driver, 1)
+        """Scrolls book list to the top, pages are swiped up in batches of a single command (see scroll_to_top)."""
+        scroll_to_top(self.driver, at_top=self.is_top_book_visible, snapshot=self.current_snapshot())
+        self.invalidate_snapshot()
+
+    def is_top_book_visible(self, snapshot):
+        """Checks in page snapshot that the first book cell is visible, i.e. the list is at the top.
+
+        :Returns:
+            bool: True if top book is visible.
+            None: If top book locator can't be evaluated locally.
+        """
+        nodes = snapshot.resolve(self.top_book.strategy, self.top_book.locator)
+        if nodes is None:
+            return None
+        return bool(nodes) and nodes[0].get("visible", "true") == "true"
 
     def clean_favourites(self, get_back_to_all_books_page=True):
         self.open_favorites()
         log("Started cleaning favorites...")
-        self.favorites_locator = locators["book.toggle_favourite"]
-        while len(self.driver.find_elements_by_ios_uiautomation(self.favorites_locator)) > 0:
-            self.driver.find_elements_by_ios_uiautomation(self.favorites_locator)[0].click()
-            log("Removed book from favorites.")
-        log("Favorites cleaned.")
+        # un-favoriting removes the book from Favorites list, the list is fetched again until it's empty
+        summary = self.tap_all(session_locators(self.driver)["books_page.favorite_buttons"], strategy="xpath",
+                               removes_elements=True)
+        log("Removed " + str(summary.acted) + " books from favorites with " + str(summary.queries) + " list requests.")
 
-        if self.is_any_book_present():
+        if summary.remaining:
             self.fail("Some books are still favorite!")
+        log("Favorites cleaned.")
 
         if get_back_to_all_books_page:
             self.open_all_books()
@@ -191,36 +305,41 @@ class BooksPageObject(BasePageObject):
 
         if check_current:
             self.top_item_toggle_favorite = BasePageElement(driver=self.driver,
-                                                            locator=locators["book.toggle_favourite"],
+                                                            locator=session_locators(self.driver)["book.toggle_favourite"],
                                                             strategy='ios uiautomation',
                                                             element_name="BooksTopItemFavorite",
                                                             time_to_wait=3,
                                                             pages_to_search=1,
-                                                            fail_if_not_found=False)
+                                                            fail_if_not_found=False,
+                                                            snapshot=self.current_snapshot())
 
-        # if len(self.driver.find_elements_by_ios_uiautomation(locators["book.toggle_favourite"])) == 0:
-        if not check_current or self.top_item_toggle_favorite.element is None:
+        # if len(self.driver.find_elements_by_ios_uiautomation(session_locators(self.driver)["book.toggle_favourite"])) == 0:
+        # grid view is the usual case here, so the check doesn't wait for favorites buttons to appear
+        if not check_current or self.top_item_toggle_favorite.is_absent():
             if self.device_type == "Phone":
                 self.open_books_more_menu()
                 self.list_icon = BasePageElement(driver=self.driver,
-                                                 locator=locators["books_more_menu.list_button"],
+                                                 locator=session_locators(self.driver)["books_more_menu.list_button"],
                                                  strategy='ios uiautomation',
                                                  element_name="BooksListViewButton",
                                                  time_to_wait=5)
                 self.list_icon.select()
             else:
                 self.mode_list_button = BasePageElement(driver=self.driver,
-                                                        locator=locators["books_page.mode_list"],
+                                                        locator=session_locators(self.driver)["books_page.mode_list"],
                                                         strategy='ios uiautomation',
-                                                        element_name="BooksListModeButton")
+                                                        element_name="BooksListModeButton",
+                                                        snapshot=self.current_snapshot())
                 self.mode_list_button.select()
+            self.invalidate_elements()
             log("Switched to list view.")
         else:
             log("Current view is List.")
 
     def toggle_favorites_by_title(self, book_title):
         # build locator
-        self.favorite_element_locator = self.title_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"" + book_title + "\"].buttons()[\"favorites\"]"
+        self.favorite_element_locator = self.title_locator = get_locator_template(
+            session_locators(self.driver)["books_page.book_favorite_button_by_title"]).render(title=book_title)
 
         log("Trying to add book \"" + book_title + "\" to favorites...")
 
@@ -229,12 +348,15 @@ class BooksPageObject(BasePageObject):
                                                  strategy='ios uiautomation',
                                                  element_name="BooksToggleFavoritesButton")
         self.favorites_element.select()
+        self.invalidate_snapshot()
+        self.book_index = None
 
         log("Book \"" + book_title + "\" favorites toggled.")
 
     def toggle_favorites_by_format(self, book_format):
         # build locator
-        self.favorite_element_locator = self.title_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name LIKE '" + book_format + "'\").buttons()[\"favorites\"]"
+        self.favorite_element_locator = self.title_locator = get_locator_template(
+            session_locators(self.driver)["books_page.book_favorite_button_by_text"]).render(text=book_format)
 
         log("Trying to add book with format \"" + book_format + "\" to favorites...")
 
@@ -243,12 +365,15 @@ class BooksPageObject(BasePageObject):
                                                  strategy='ios uiautomation',
                                                  element_name="BooksToggleFavoritesButton")
         self.favorites_element.select()
+        self.invalidate_snapshot()
+        self.book_index = None
 
         log("Book with format \"" + book_format + "\" favorites toggled.")
 
     def toggle_favorites_by_author(self, author):
         # build locator
-        self.favorite_element_locator = self.title_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name LIKE '" + author + "'\").buttons()[\"favorites\"]"
+        self.favorite_element_locator = self.title_locator = get_locator_template(
+            session_locators(self.driver)["books_page.book_favorite_button_by_text"]).render(text=author)
 
         log("Trying to add book by author \"" + author + "\" to favorites...")
 
@@ -257,6 +382,8 @@ class BooksPageObject(BasePageObject):
                                                  strategy='ios uiautomation',
                                                  element_name="BooksToggleFavoritesButton")
         self.favorites_element.select()
+        self.invalidate_snapshot()
+        self.book_index = None
 
         log("Book by author \"" + author + "\" favorites toggled.")
 
@@ -265,30 +392,43 @@ class BooksPageObject(BasePageObject):
         return BookListObject(self.driver, book_format=book_format, pages_to_search=self.pages_to_search, search_direction=search_direction, device_type=self.device_type)
 
     def find_book_by_title(self, book_title, pages_to_search=1, search_direction='down'):
+        # known book: scroll straight to its page, or search the whole list if it's not there after scrolling
+        book_title = make_unicode(book_title)
+        if self.book_index is not None and book_title in self.book_index:
+            if self.book_index.scroll_to(self.driver, book_title) is None:
+                pages_to_search = max(pages_to_search, self.book_index.pages)
+                search_direction = "both"
+            self.invalidate_snapshot()
         self.pages_to_search = pages_to_search
         return BookListObject(self.driver, book_title=book_title, pages_to_search=self.pages_to_search, search_direction=search_direction, device_type=self.device_type)
 
 
-# ------------------ Favourites Books page -----------------------------------
+# ------------------ All Books page -----------------------------------
 class BooksAllBooksPageObject(BooksPageObject):
-    pass
+    segment_locator_key = "books_page.all"
 
 
-# ------------------ All Books page -----------------------------------
+# ------------------ Recent Read Books page -----------------------------------
 class BooksRecentReadPageObject(BooksPageObject):
-    pass
+    segment_locator_key = "books_page.recent"
 
 
-# ------------------ All Books page -----------------------------------
+# ------------------ Favourites Books page -----------------------------------
 class BooksFavouritesPageObject(BooksPageObject):
-    pass
+    segment_locator_key = "books_page.favorites"
+
+
+for page_class in (BooksPageObject, BooksAllBooksPageObject, BooksRecentReadPageObject, BooksFavouritesPageObject):
+    DEFAULT_NAVIGATION_GRAPH.register(page_class)
 
 
 # ------------------- Book object on the list----------------------
 class BookListObject(BasePageObject):
     """Page object represents Books page of the app"""
-    def __init__(self, driver, book_title=None, book_format=None, pages_to_search=1, search_direction='down', device_type="Phone"):
+    def __init__(self, driver, book_title=None, book_format=None, pages_to_search=1, search_direction='down',
+                 device_type="Phone", use_snapshot=USE_PAGE_SNAPSHOTS):
         self.driver = driver
+        self.use_snapshot = use_snapshot
         self.book_format = book_format
         self.book_title = book_title
         self.pages_to_search = pages_to_search
@@ -296,31 +436,37 @@ class BookListObject(BasePageObject):
 
         if self.book_format is not None:
             log("Trying to find book in " + book_format + " format...")
-            self.format_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells().firstWithPredicate(\"ANY staticTexts.name LIKE '" + book_format + "' and isVisible == 1\").staticTexts().firstWithPredicate(\"value like '" + book_format +"'\")"
+            self.format_locator = get_locator_template(
+                session_locators(self.driver)["books_page.visible_book_format_text"]).render(book_format=book_format)
             self.format_el = BookFormatElement(driver=self.driver,
                                                strategy='ios uiautomation',
                                                locator=self.format_locator,
                                                time_to_wait=DEFAULT_WAIT_FOR_ELEMENT_SCROLL,
                                                pages_to_search=self.pages_to_search,
                                                search_direction=search_direction,
-                                               element_name="Book format - " + self.book_format)
+                                               element_name="Book format - " + self.book_format,
+                                               snapshot=self.current_snapshot()).locate()
             log("Book in " + book_format + " format found.")
             self.element_to_open_book = self.format_el
 
         if self.book_title is not None:
             log("Trying to find book with title " + self.book_title + "...")
-            self.title_locator = "target.frontMostApp().mainWindow().collectionViews()[0].cells()[\"" + self.book_title + "\"]"
+            self.title_locator = get_locator_template(
+                session_locators(self.driver)["books_page.book_cell_by_title"]).render(title=self.book_title)
             self.title_el = BookTitleElement(driver=self.driver,
                                              strategy='ios uiautomation',
                                              locator=self.title_locator,
                                              time_to_wait=DEFAULT_WAIT_FOR_ELEMENT_SCROLL,
                                              pages_to_search=self.pages_to_search,
                                              search_direction=search_direction,
-                                             element_name="Book - " + self.book_title)
+                                             element_name="Book - " + self.book_title,
+                                             snapshot=self.current_snapshot()).locate()
             log("Book with " + self.book_title + " title found.")
             self.element_to_open_book = self.title_el
 
     def open_book(self):
+        # opened book page object is imported on use: Books page works without it, e.g. in offline benchmarks
+        from ..OpenedBook.OpenedBookPageObject import OpenedBookPageObject
         self.element_to_open_book.select()
         return OpenedBookPageObject(self.driver, device_type=self.device_type, book_title=self.book_title)
 
@@ -0,0 +1,621 @@
+# -*- coding: utf-8 -*-"
+"""Module contains page snapshot: one page source fetch, parsed and indexed to resolve many locators locally.
+
+Supported locator strategies are the ones used by BasePageElement: "ios uiautomation", "xpath" and "class_name".
+UIAutomation locators are evaluated by a small interpreter which understands element accessors
+(frontMostApp(), mainWindow(), tabBar(), buttons(), cells(), ...), indexes, names and the common subset of
+NSPredicate syntax used in firstWithPredicate()/withPredicate(). Anything outside of that subset is reported as
+unsupported and the caller is expected to fall back to a live lookup.
+"""
+import re
+import zlib
+import xml.etree.cElementTree as ElementTree
+from collections import defaultdict
+from .Helpers import make_unicode
+from .Logger import LOGGER
+from .LocatorTemplates import LRUCache
+
+# element accessors returning arrays of direct children of given type
+UIA_ARRAY_ACCESSORS = {
+    "activityIndicators": "UIAActivityIndicator",
+    "buttons": "UIAButton",
+    "cells": "UIACollectionCell UIATableCell",
+    "collectionViews": "UIACollectionView",
+    "images": "UIAImage",
+    "links": "UIALink",
+    "navigationBars": "UIANavigationBar",
+    "pageIndicators": "UIAPageIndicator",
+    "pickers": "UIAPicker",
+    "progressIndicators": "UIAProgressIndicator",
+    "scrollViews": "UIAScrollView",
+    "searchBars": "UIASearchBar",
+    "secureTextFields": "UIASecureTextField",
+    "segmentedControls": "UIASegmentedControl",
+    "sliders": "UIASlider",
+    "staticTexts": "UIAStaticText",
+    "switches": "UIASwitch",
+    "tabBars": "UIATabBar",
+    "tableViews": "UIATableView",
+    "textFields": "UIATextField",
+    "textViews": "UIATextView",
+    "toolbars": "UIAToolbar",
+    "webViews": "UIAWebView",
+    "windows": "UIAWindow",
+}
+
+# element accessors returning the first element of given type found in a subtree
+UIA_SINGLE_ACCESSORS = {
+    "actionSheet": "UIAActionSheet",
+    "alert": "UIAAlert",
+    "editingMenu": "UIAEditingMenu",
+    "keyboard": "UIAKeyboard",
+    "navigationBar": "UIANavigationBar",
+    "popover": "UIAPopover",
+    "statusBar": "UIAStatusBar",
+    "tabBar": "UIATabBar",
+    "toolbar": "UIAToolbar",
+}
+
+# subtrees changing on their own (clock, battery), ignored by fingerprint
+FINGERPRINT_IGNORED_TAGS = ("UIAStatusBar",)
+
+# predicate keys which are stored as "true"/"false" attributes in page source
+PREDICATE_BOOLEAN_KEYS = {"isVisible": "visible", "isEnabled": "enabled", "isValid": "valid"}
+
+
+class UnsupportedLocator(Exception):
+    """Raised when a locator can't be evaluated against a snapshot. Live lookup should be used instead."""
+    pass
+
+
+class PageSnapshot(object):
+    """Class represents parsed page source of the application at a moment of time.
+
+    Snapshot is built from a single driver.page_source call. All elements are indexed by type and name,
+    so multiple locators of one page object are resolved without additional round trips to the device.
+
+    Attributes:
+        - driver (WebDriver): Web driver object snapshot was taken with.
+        - root (Element): Root node of parsed page source.
+        - source_length (int): Length of page source, characters.
+    """
+
+    def __init__(self, driver, page_source=None, root=None):
+        """Creates snapshot from page source string.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - page_source (str): Page source as returned by driver.page_source.
+            - root (Element): Already parsed page source, used instead of page_source.
+
+        :Usage:
+            PageSnapshot(self.driver, self.driver.page_source)
+        """
+        self.driver = driver
+        if root is None:
+            self.source_length = len(page_source)
+            if isinstance(page_source, unicode):
+                page_source = page_source.encode('utf-8')
+            root = ElementTree.fromstring(page_source)
+        else:
+            self.source_length = 0
+        self.root = root
+
+        self._by_tag = defaultdict(list)
+        self._by_name = defaultdict(list)
+        for node in self.root.iter():
+            self._by_tag[node.tag].append(node)
+            name = node.get("name")
+            if name is not None:
+                self._by_name[name].append(node)
+
+        self._resolved = {}
+        self._fingerprint = None
+
+    @classmethod
+    def capture(cls, driver):
+        """Fetches page source once and builds snapshot from it.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+
+        :Returns:
+            PageSnapshot: New snapshot object.
+
+        :Usage:
+            snapshot = PageSnapshot.capture(self.driver)
+        """
+        LOGGER.debug("Taking page snapshot...")
+        snapshot = cls(driver, driver.page_source)
+        LOGGER.debug("Page snapshot taken: %s characters.", snapshot.source_length)
+        return snapshot
+
+    def nodes_by_tag(self, tag):
+        """Returns all nodes of given type in document order."""
+        return self._by_tag.get(tag, [])
+
+    def nodes_by_name(self, name):
+        """Returns all nodes with given name in document order."""
+        return self._by_name.get(name, [])
+
+    def fingerprint(self):
+        """Returns checksum of visible content of the screen: type, name, value and position of every node.
+
+        Status bar is ignored, so two snapshots of the same unchanged screen have equal fingerprints. Used to tell
+        if scrolling moved the list.
+
+        :Usage:
+            if PageSnapshot.capture(self.driver).fingerprint() == before: log("End of the list.")
+        """
+        if self._fingerprint is None:
+            checksum = 0
+            nodes = [self.root]
+            while nodes:
+                node = nodes.pop()
+                if node.tag in FINGERPRINT_IGNORED_TAGS:
+                    continue
+                text = u"|".join(make_unicode(node.get(key) or u"") for key in ("name", "value", "x", "y"))
+                checksum = zlib.crc32((node.tag + u"|" + text).encode('utf-8'), checksum)
+                nodes.extend(reversed(list(node)))
+            self._fingerprint = checksum
+        return self._fingerprint
+
+    def resolve(self, strategy, locator):
+        """Resolves locator against the snapshot.
+
+        Results are cached, so each locator is evaluated once per snapshot.
+
+        :Args:
+            - strategy (str): "ios uiautomation", "xpath" or "class_name".
+            - locator (str): Locator string.
+
+        :Returns:
+            list: Matching nodes, empty list if nothing matched.
+            None: If locator can't be evaluated locally.
+
+        :Usage:
+            snapshot.resolve("ios uiautomation", "target.frontMostApp().tabBar().buttons()[\"Books\"]")
+        """
+        key = (strategy, locator)
+        if key not in self._resolved:
+            try:
+                if strategy == "ios uiautomation":
+                    nodes = UIAutomationQuery.compile(locator).evaluate(self)
+                elif strategy == "xpath":
+                    nodes = self._resolve_xpath(locator)
+                elif strategy == "class_name":
+                    nodes = list(self.nodes_by_tag(locator))
+                else:
+                    raise UnsupportedLocator("Unsupported strategy " + strategy)
+            except UnsupportedLocator as e:
+                LOGGER.debug("Locator can't be resolved from snapshot: %s", e.args[0])
+                nodes = None
+            self._resolved[key] = nodes
+        return self._resolved[key]
+
+    def is_selected(self, strategy, locator, index=0):
+        """Tells if tab bar button or segmented control button is selected: its value is 1.
+
+        :Returns:
+            bool: True if element with index is found and selected.
+            None: If locator can't be evaluated locally.
+        """
+        nodes = self.resolve(strategy, locator)
+        if nodes is None:
+            return None
+        return len(nodes) > index and nodes[index].get("value") == "1"
+
+    def _resolve_xpath(self, locator):
+        """ElementTree supports limited xpath only, anything else is reported as unsupported."""
+        if locator.startswith("/"):
+            locator = "." + locator
+        try:
+            return self.root.findall(locator)
+        except (SyntaxError, KeyError) as e:
+            raise UnsupportedLocator(u"Unsupported xpath \"" + make_unicode(locator) + u"\"")
+
+
+def verify_selected(driver, strategy, locator, index=0):
+    """Checks in a new snapshot that tapped tab bar or segmented control button got selected.
+
+    Used to verify taps by cached coordinates, see TapCache.
+
+    :Returns:
+        bool: False if the button is not selected, True if it is or it can't be told from the snapshot.
+
+    :Usage:
+        open_tab(self.driver, "Authors", verify_tap=verify_selected)
+    """
+    return PageSnapshot.capture(driver).is_selected(strategy, locator, index) is not False
+
+
+class SnapshotElement(object):
+    """Stand-in for WebElement found in a page snapshot.
+
+    Snapshot proves that element exists, so the real WebElement is looked up only when it's needed for an action
+    (tap, typing, reading current state) and without waiting. Any WebElement attribute is available.
+
+    Attributes:
+        - node (Element): Page source node matched by locator.
+    """
+
+    def __init__(self, node, live_lookup):
+        """Creates element proxy.
+
+        :Args:
+            - node (Element): Page source node.
+            - live_lookup (callable): Function without arguments returning WebElement.
+        """
+        self.node = node
+        self._live_lookup = live_lookup
+        self._live_element = None
+
+    def get_snapshot_attribute(self, name):
+        """Returns attribute value as it was at the moment of snapshot, e.g. "name", "value", "visible"."""
+        return self.node.get(name)
+
+    @property
+    def live_element(self):
+        """Real WebElement, looked up on first use."""
+        if self._live_element is None:
+            self._live_element = self._live_lookup()
+        return self._live_element
+
+    def __getattr__(self, item):
+        if item.startswith("__"):
+            raise AttributeError(item)
+        return getattr(self.live_element, item)
+
+
+class UIAutomationQuery(object):
+    """Parsed UIAutomation locator which can be evaluated against a PageSnapshot.
+
+    :Usage:
+        UIAutomationQuery("target.frontMostApp().mainWindow().buttons()[0]").evaluate(snapshot)
+    """
+
+    _token_re = re.compile(r'\s*(?:(?P<name>[A-Za-z_]\w*)|(?P<number>-?\d+)|(?P<punct>[.()\[\],])|'
+                           r'(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'))')
+
+    _cache = LRUCache()
+
+    def __init__(self, locator):
+        self.locator = make_unicode(locator)
+        self.steps = self._parse(self.locator)
+
+    @classmethod
+    def compile(cls, locator):
+        """Returns parsed locator, recently used locators are not parsed again.
+
+        :Raises:
+            UnsupportedLocator: If locator can't be evaluated locally.
+        """
+        query = cls._cache.get(locator)
+        if query is None:
+            query = cls._cache.put(locator, cls(locator))
+        return query
+
+    @classmethod
+    def _tokenize(cls, text):
+        tokens = []
+        position = 0
+        text = text.strip().rstrip(";")
+        while position < len(text):
+            match = cls._token_re.match(text, position)
+            if match is None or match.end() == position:
+                raise UnsupportedLocator("Can't parse \"" + text[position:] + "\"")
+            kind = match.lastgroup
+            value = match.group(kind)
+            if kind == "number":
+                value = int(value)
+            elif kind == "string":
+                value = _unescape_js_string(value[1:-1])
+            tokens.append((kind, value))
+            position = match.end()
+        return tokens
+
+    def _parse(self, locator):
+        """Converts locator into list of steps: ("call", name, args) or ("item", key)."""
+        tokens = self._tokenize(locator)
+        if not tokens or tokens[0] != ("name", "target"):
+            raise UnsupportedLocator("Locator should start with \"target\"")
+        steps = []
+        i = 1
+        while i < len(tokens):
+            kind, value = tokens[i]
+            if (kind, value) == ("punct", "."):
+                if i + 2 >= len(tokens) or tokens[i + 1][0] != "name" or tokens[i + 2] != ("punct", "("):
+                    raise UnsupportedLocator("Method call expected")
+                method = tokens[i + 1][1]
+                args = []
+                i += 3
+                while tokens[i] != ("punct", ")"):
+                    if tokens[i][0] in ("string", "number"):
+                        args.append(tokens[i][1])
+                    elif tokens[i] != ("punct", ","):
+                        raise UnsupportedLocator("Unsupported argument of " + method + "()")
+                    i += 1
+                    if i >= len(tokens):
+                        raise UnsupportedLocator("Unclosed call of " + method + "()")
+                steps.append(("call", method, args))
+                i += 1
+            elif (kind, value) == ("punct", "["):
+                if i + 2 >= len(tokens) or tokens[i + 1][0] not in ("string", "number") or \
+                        tokens[i + 2] != ("punct", "]"):
+                    raise UnsupportedLocator("Unsupported element array subscript")
+                steps.append(("item", tokens[i + 1][1]))
+                i += 3
+            else:
+                raise UnsupportedLocator("Unexpected token \"" + unicode(value) + "\"")
+        return steps
+
+    def evaluate(self, snapshot):
+        """Evaluates locator.
+
+        :Returns:
+            list: Matching nodes. Empty list, if locator evaluates to UIAElementNil.
+        """
+        # current value: ("target", None), ("element", node or None) or ("array", [nodes])
+        kind, value = "target", None
+        for step in self.steps:
+            if step[0] == "item":
+                kind, value = self._subscript(kind, value, step[1])
+            else:
+                kind, value = self._call(snapshot, kind, value, step[1], step[2])
+        if kind == "array":
+            return value
+        if kind == "element":
+            return [value] if value is not None else []
+        raise UnsupportedLocator("Locator doesn't evaluate to an element")
+
+    @staticmethod
+    def _subscript(kind, value, key):
+        if kind != "array":
+            raise UnsupportedLocator("Subscript applied to non array")
+        if isinstance(key, int):
+            return "element", value[key] if 0 <= key < len(value) else None
+        return "element", _first(node for node in value if node.get("name") == key)
+
+    def _call(self, snapshot, kind, value, method, args):
+        if kind == "target":
+            if method == "frontMostApp":
+                applications = snapshot.nodes_by_tag("UIAApplication")
+                return "element", applications[0] if applications else snapshot.root
+            raise UnsupportedLocator("Unsupported target method " + method + "()")
+
+        if kind == "element":
+            if value is None:
+                # UIAElementNil: every accessor returns nil or empty array
+                return ("array", []) if method in UIA_ARRAY_ACCESSORS or method == "elements" else ("element", None)
+            if method == "mainWindow":
+                return "element", _first(child for child in value if child.tag == "UIAWindow")
+            if method in UIA_ARRAY_ACCESSORS:
+                tags = UIA_ARRAY_ACCESSORS[method].split()
+                return "array", [child for child in value if child.tag in tags]
+            if method == "elements":
+                return "array", list(value)
+            if method in UIA_SINGLE_ACCESSORS:
+                tag = UIA_SINGLE_ACCESSORS[method]
+                return "element", _first(node for node in value.iter(tag) if node is not value)
+            raise UnsupportedLocator("Unsupported element method " + method + "()")
+
+        # element array methods
+        if method in ("firstWithPredicate", "withPredicate") and len(args) == 1:
+            predicate = Predicate.compile(args[0])
+            matching = [node for node in value if predicate.matches(node)]
+        elif method in ("firstWithName", "withName") and len(args) == 1:
+            matching = [node for node in value if node.get("name") == args[0]]
+        elif method in ("firstWithValueForKey", "withValueForKey") and len(args) == 2:
+            matching = [node for node in value if _attribute_value(node, args[1]) == unicode(args[0])]
+        else:
+            raise UnsupportedLocator("Unsupported element array method " + method + "()")
+
+        if method.startswith("first"):
+            return "element", matching[0] if matching else None
+        return "array", matching
+
+
+class Predicate(object):
+    """Subset of NSPredicate used by UIAutomation locators.
+
+    Supports comparisons ==, =, !=, <>, <, >, <=, >=, LIKE, CONTAINS, BEGINSWITH, ENDSWITH with [c] and [d]
+    modifiers, AND, OR, NOT, parentheses and ANY with key paths through element arrays like "staticTexts.name".
+
+    :Usage:
+        Predicate.compile("ANY staticTexts.name LIKE 'PDF' and isVisible == 1").matches(node)
+    """
+
+    _token_re = re.compile(r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')|(?P<number>-?\d+(?:\.\d+)?)|'
+                           r'(?P<operator>==|!=|<>|<=|>=|=|<|>|&&|\|\||\(|\))|'
+                           r'(?P<name>[A-Za-z_][\w.]*)(?P<modifier>\[[cd]+\])?)')
+    _string_operators = ("LIKE", "CONTAINS", "BEGINSWITH", "ENDSWITH")
+    _cache = LRUCache()
+
+    def __init__(self, text):
+        self.text = text
+        self._tokens = self._tokenize(text)
+        self._position = 0
+        self.tree = self._parse_or()
+        if self._position != len(self._tokens):
+            raise UnsupportedLocator("Unexpected end of predicate \"" + text + "\"")
+        del self._tokens
+
+    @classmethod
+    def compile(cls, text):
+        """Returns compiled predicate, recently used predicates are not parsed again."""
+        predicate = cls._cache.get(text)
+        if predicate is None:
+            predicate = cls._cache.put(text, cls(text))
+        return predicate
+
+    @classmethod
+    def _tokenize(cls, text):
+        tokens = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = cls._token_re.match(text, position)
+            if match is None or match.end() == position:
+                raise UnsupportedLocator("Can't parse predicate \"" + text + "\"")
+            if match.group("string") is not None:
+                tokens.append(("value", _unescape_js_string(match.group("string")[1:-1])))
+            elif match.group("number") is not None:
+                tokens.append(("value", float(match.group("number"))))
+            elif match.group("operator") is not None:
+                tokens.append(("op", {"=": "==", "<>": "!=", "&&": "AND", "||": "OR"}.get(match.group("operator"),
+                                                                                       match.group("operator"))))
+            else:
+                word = match.group("name")
+                modifier = match.group("modifier") or ""
+                if word.upper() in ("AND", "OR", "NOT", "ANY", "SOME") + cls._string_operators:
+                    tokens.append(("op", word.upper() + modifier))
+                elif word.upper() in ("TRUE", "YES", "FALSE", "NO"):
+                    tokens.append(("value", 1.0 if word.upper() in ("TRUE", "YES") else 0.0))
+                elif word == "TRUEPREDICATE":
+                    tokens.append(("value", True))
+                else:
+                    tokens.append(("key", word))
+            position = match.end()
+        return tokens
+
+    def _peek(self):
+        return self._tokens[self._position] if self._position < len(self._tokens) else (None, None)
+
+    def _next(self):
+        token = self._peek()
+        self._position += 1
+        return token
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while self._peek() == ("op", "OR"):
+            self._next()
+            node = ("or", node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._peek() == ("op", "AND"):
+            self._next()
+            node = ("and", node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if self._peek() == ("op", "NOT"):
+            self._next()
+            return ("not", self._parse_not())
+        if self._peek() == ("op", "("):
+            self._next()
+            node = self._parse_or()
+            if self._next() != ("op", ")"):
+                raise UnsupportedLocator("Unbalanced parentheses in predicate \"" + self.text + "\"")
+            return node
+        if self._peek() == ("value", True):
+            self._next()
+            return ("true",)
+        return self._parse_comparison()
+
+    def _parse_comparison(self):
+        any_modifier = self._peek() in (("op", "ANY"), ("op", "SOME"))
+        if any_modifier:
+            self._next()
+        kind, key = self._next()
+        if kind != "key":
+            raise UnsupportedLocator("Key expected in predicate \"" + self.text + "\"")
+        kind, operator = self._next()
+        if kind != "op":
+            raise UnsupportedLocator("Operator expected in predicate \"" + self.text + "\"")
+        kind, expected = self._next()
+        if kind != "value":
+            raise UnsupportedLocator("Value expected in predicate \"" + self.text + "\"")
+
+        name, _, modifier = operator.partition("[")
+        if name not in self._string_operators + ("==", "!=", "<", ">", "<=", ">="):
+            raise UnsupportedLocator("Unsupported operator " + operator)
+        ignore_case = "c" in modifier
+        if name == "LIKE":
+            # \* and \? are literal characters, not wildcards
+            pattern = "^" + "".join(re.escape(token[1]) if token.startswith("\\") else
+                                    ".*" if token == "*" else "." if token == "?" else re.escape(token)
+                                    for token in re.findall(r'\\.|.', unicode(expected), re.DOTALL)) + "$"
+            expected = re.compile(pattern, re.IGNORECASE | re.UNICODE if ignore_case else re.UNICODE)
+        return ("compare", key, name, expected, ignore_case)
+
+    def matches(self, node):
+        """Checks if page source node matches predicate."""
+        return self._evaluate(self.tree, node)
+
+    def _evaluate(self, tree, node):
+        kind = tree[0]
+        if kind == "and":
+            return self._evaluate(tree[1], node) and self._evaluate(tree[2], node)
+        if kind == "or":
+            return self._evaluate(tree[1], node) or self._evaluate(tree[2], node)
+        if kind == "not":
+            return not self._evaluate(tree[1], node)
+        if kind == "true":
+            return True
+        _, key, operator, expected, ignore_case = tree
+        return any(_compare(actual, operator, expected, ignore_case) for actual in _key_path_values(node, key))
+
+
+def _compare(actual, operator, expected, ignore_case):
+    if actual is None:
+        return operator == "!="
+    if isinstance(expected, float):
+        try:
+            actual = float(actual)
+        except ValueError:
+            return operator == "!="
+    elif ignore_case and operator != "LIKE":
+        actual, expected = actual.lower(), expected.lower()
+
+    if operator == "LIKE":
+        return expected.match(actual) is not None
+    if operator == "CONTAINS":
+        return expected in actual
+    if operator == "BEGINSWITH":
+        return actual.startswith(expected)
+    if operator == "ENDSWITH":
+        return actual.endswith(expected)
+    if operator == "==":
+        return actual == expected
+    if operator == "!=":
+        return actual != expected
+    if operator == "<":
+        return actual < expected
+    if operator == ">":
+        return actual > expected
+    if operator == "<=":
+        return actual <= expected
+    return actual >= expected
+
+
+def _key_path_values(node, key):
+    """Returns list of values for key path, e.g. "name" or "staticTexts.name"."""
+    parts = key.split(".")
+    nodes = [node]
+    for part in parts[:-1]:
+        if part not in UIA_ARRAY_ACCESSORS:
+            raise UnsupportedLocator("Unsupported key path " + key)
+        tags = UIA_ARRAY_ACCESSORS[part].split()
+        nodes = [child for parent in nodes for child in parent if child.tag in tags]
+    return [_attribute_value(n, parts[-1]) for n in nodes]
+
+
+def _attribute_value(node, key):
+    if key in PREDICATE_BOOLEAN_KEYS:
+        return "1" if node.get(PREDICATE_BOOLEAN_KEYS[key]) == "true" else "0"
+    if key not in ("name", "label", "value"):
+        raise UnsupportedLocator("Unsupported predicate key " + key)
+    return node.get(key)
+
+
+def _unescape_js_string(text):
+    return re.sub(r'\\(.)', lambda match: {"n": "\n", "t": "\t"}.get(match.group(1), match.group(1)), text)
+
+
+def _first(iterable):
+    for item in iterable:
+        return item
+    return None
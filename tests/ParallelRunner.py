@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-"
+"""Module runs tests concurrently on a pool of devices, one worker process per device.
+
+Tests are assigned to devices with longest-processing-time-first scheduling: tests sorted by duration of previous
+runs, each one goes to the device with the least total assigned time. Results of all devices are merged into one
+report and test durations are saved for the next run.
+
+:Usage:
+    python -m tests.ParallelRunner devices.json tests.test_iOS_class
+"""
+import json
+import heapq
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+import unittest
+from Queue import Empty
+from .Helpers import log
+from .Logger import LOGGER
+from .Devices import load_device_pool
+from .GlobalConstants import DEVICE_POOL_FILE, TEST_DURATIONS_FILE, PARALLEL_REPORT_FILE, DEFAULT_TEST_DURATION, \
+    WORKER_POLL_INTERVAL, WORKER_DRAIN_TIMEOUT
+
+
+def collect_test_ids(names):
+    """Loads tests by module/class/method names.
+
+    :Returns:
+        list: Test ids, e.g. "tests.test_iOS_class.OurTests.test_1_is_installed".
+    """
+    def flatten(suite):
+        for test in suite:
+            if isinstance(test, unittest.TestSuite):
+                for nested_test in flatten(test):
+                    yield nested_test
+            else:
+                yield test
+    return [test.id() for test in flatten(unittest.TestLoader().loadTestsFromNames(names))]
+
+
+def load_durations(file_path=TEST_DURATIONS_FILE):
+    """Reads test durations of previous runs, test id -> seconds. Returns empty dict if there is no file yet."""
+    if not os.path.exists(file_path):
+        return {}
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def save_durations(durations, file_path=TEST_DURATIONS_FILE):
+    """Saves test durations, test id -> seconds."""
+    folder = os.path.dirname(file_path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(file_path, 'w') as f:
+        json.dump(durations, f, indent=2, sort_keys=True)
+
+
+def schedule_tests(test_ids, device_count, durations, default_duration=DEFAULT_TEST_DURATION):
+    """Assigns tests to devices with longest-processing-time-first scheduling.
+
+    :Args:
+        test_ids (list): Test ids.
+        device_count (int): Number of devices.
+        durations (dict): Known test durations, test id -> seconds.
+        default_duration (float): Duration of a test which hasn't run yet, seconds.
+
+    :Returns:
+        list: For each device: list of test ids, sorted by id to keep test class fixtures together.
+
+    :Usage:
+        schedule_tests(["a.T.test_1", "a.T.test_2"], 2, {"a.T.test_1": 30.0})
+    """
+    loads = [(0.0, device_index) for device_index in range(device_count)]
+    heapq.heapify(loads)
+    assigned = [[] for _ in range(device_count)]
+    for test_id in sorted(test_ids, key=lambda t: durations.get(t, default_duration), reverse=True):
+        load, device_index = heapq.heappop(loads)
+        assigned[device_index].append(test_id)
+        heapq.heappush(loads, (load + durations.get(test_id, default_duration), device_index))
+    return [sorted(tests) for tests in assigned]
+
+
+class TimedTestResult(unittest.TestResult):
+    """Test result recording outcome and duration of each test.
+
+    Each record is passed to on_record function as soon as the test is finished, if it's set.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.on_record = kwargs.pop("on_record", None)
+        super(TimedTestResult, self).__init__(*args, **kwargs)
+        self.records = []
+        self._start = None
+
+    def startTest(self, test):
+        super(TimedTestResult, self).startTest(test)
+        self._start = time.time()
+
+    def _record(self, test, outcome, details=""):
+        record = {"test": test.id(), "outcome": outcome, "details": details,
+                  "duration": time.time() - self._start if self._start else 0.0}
+        self.records.append(record)
+        if self.on_record is not None:
+            self.on_record(record)
+
+    def addSuccess(self, test):
+        super(TimedTestResult, self).addSuccess(test)
+        self._record(test, "passed")
+
+    def addFailure(self, test, err):
+        super(TimedTestResult, self).addFailure(test, err)
+        self._record(test, "failed", self.failures[-1][1])
+
+    def addError(self, test, err):
+        super(TimedTestResult, self).addError(test, err)
+        self._record(test, "error", self.errors[-1][1])
+
+    def addSkip(self, test, reason):
+        super(TimedTestResult, self).addSkip(test, reason)
+        self._record(test, "skipped", reason)
+
+
+def run_device_worker(device, test_ids, results_queue):
+    """Worker process: runs tests on one device and sends records to results queue.
+
+    Each record is sent as soon as its test is finished, so results of finished tests are kept if the worker dies.
+    ("done", udid, None) is sent after the last test.
+    Device is passed to test classes through environment variables.
+    """
+    os.environ.update(device.to_environment())
+    reported = set()
+
+    def send(record):
+        record["device"] = device.name
+        record["udid"] = device.udid
+        reported.add(record["test"])
+        results_queue.put(("record", device.udid, record))
+
+    try:
+        suite = unittest.TestLoader().loadTestsFromNames(test_ids)
+        suite.run(TimedTestResult(on_record=send))
+    except Exception:
+        details = traceback.format_exc()
+        for test_id in test_ids:
+            if test_id not in reported:
+                send({"test": test_id, "outcome": "error", "details": details, "duration": 0.0})
+    finally:
+        # worker process ends with os._exit(), atexit doesn't flush buffered console records
+        LOGGER.flush()
+    results_queue.put(("done", device.udid, None))
+
+
+def collect_results(results_queue, workers, poll_interval=WORKER_POLL_INTERVAL, drain_timeout=WORKER_DRAIN_TIMEOUT):
+    """Reads test records from results queue until every worker is done or dead.
+
+    Tests of a worker which exited without sending their records (device lost, crash, killed) are recorded as errors.
+
+    :Args:
+        results_queue (multiprocessing.Queue): Queue workers send records to, see run_device_worker().
+        workers (dict): Device udid -> (device, assigned test ids, worker process).
+        poll_interval (float): How long to wait for a record before checking workers, seconds.
+        drain_timeout (float): How long to wait for records still in the queue of a dead worker, seconds.
+
+    :Returns:
+        list: Test records.
+    """
+    reported = dict((udid, {}) for udid in workers)
+    running = set(workers)
+
+    def handle(message):
+        kind, udid, record = message
+        if kind == "record":
+            reported[udid][record["test"]] = record
+        else:
+            running.discard(udid)
+
+    while running:
+        try:
+            handle(results_queue.get(timeout=poll_interval))
+            continue
+        except Empty:
+            pass
+        for udid in list(running):
+            device, device_tests, worker = workers[udid]
+            if worker.exitcode is None:
+                continue
+            # records sent before the worker exited can still be in the pipe
+            try:
+                while udid in running:
+                    handle(results_queue.get(timeout=drain_timeout))
+            except Empty:
+                pass
+            if udid not in running:
+                continue
+            running.discard(udid)
+            missing = [test_id for test_id in device_tests if test_id not in reported[udid]]
+            log("Worker of device \"%s\" (%s) exited with code %s, %s tests not finished." % (
+                device.name, udid, worker.exitcode, len(missing)))
+            for test_id in missing:
+                reported[udid][test_id] = {"test": test_id, "outcome": "error", "duration": 0.0,
+                                           "details": "Worker exited with code %s before the test finished."
+                                                      % worker.exitcode,
+                                           "device": device.name, "udid": udid}
+    return [record for device_records in reported.values() for record in device_records.values()]
+
+
+def run_parallel(devices, test_ids, durations_file=TEST_DURATIONS_FILE, report_file=PARALLEL_REPORT_FILE):
+    """Runs tests on all devices concurrently and merges results.
+
+    :Args:
+        devices (list): DeviceDescriptor objects.
+        test_ids (list): Test ids.
+        durations_file (str): File with test durations of previous runs, updated after the run.
+        report_file (str): Merged JSON report.
+
+    :Returns:
+        dict: Merged report: summary and records of all tests.
+
+    :Usage:
+        run_parallel(load_device_pool(DEVICE_POOL_FILE), collect_test_ids(["test_iOS_class"]))
+    """
+    durations = load_durations(durations_file)
+    assignments = schedule_tests(test_ids, len(devices), durations)
+
+    results_queue = multiprocessing.Queue()
+    workers = {}
+    start = time.time()
+    for device, device_tests in zip(devices, assignments):
+        if not device_tests:
+            continue
+        log("Device \"%s\" (%s): %s tests, estimated %.0f s." % (
+            device.name, device.udid, len(device_tests),
+            sum(durations.get(test_id, DEFAULT_TEST_DURATION) for test_id in device_tests)))
+        worker = multiprocessing.Process(target=run_device_worker, args=(device, device_tests, results_queue))
+        # forked worker would write records still buffered in the parent again
+        LOGGER.flush()
+        worker.start()
+        workers[device.udid] = (device, device_tests, worker)
+
+    # read results before joining, so workers are not blocked on a full queue
+    records = collect_results(results_queue, workers)
+    for _, _, worker in workers.values():
+        worker.join()
+
+    for record in records:
+        if record["outcome"] in ("passed", "failed"):
+            durations[record["test"]] = round(record["duration"], 2)
+    save_durations(durations, durations_file)
+
+    summary = {"tests": len(records), "wall_time": round(time.time() - start, 2), "devices": len(workers)}
+    for outcome in ("passed", "failed", "error", "skipped"):
+        summary[outcome] = len([record for record in records if record["outcome"] == outcome])
+    report = {"summary": summary, "records": sorted(records, key=lambda record: record["test"])}
+
+    folder = os.path.dirname(report_file)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+    with open(report_file, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    for record in report["records"]:
+        log("%s: %s on %s (%.1f s)" % (record["test"], record["outcome"], record["device"], record["duration"]))
+    log("Ran %(tests)s tests on %(devices)s devices in %(wall_time)s s: %(passed)s passed, %(failed)s failed, "
+        "%(error)s errors, %(skipped)s skipped." % summary)
+    return report
+
+
+if __name__ == "__main__":
+    pool_file = sys.argv[1] if len(sys.argv) > 1 else DEVICE_POOL_FILE
+    test_names = sys.argv[2:] or ["tests.test_iOS_class"]
+    parallel_report = run_parallel(load_device_pool(pool_file), collect_test_ids(test_names))
+    sys.exit(0 if parallel_report["summary"]["failed"] + parallel_report["summary"]["error"] == 0 else 1)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-"
+"""Module contains asynchronous screenshot service.
+
+Test thread only downloads screenshot payload from the device. Decoding, optional recompression and writing to disk
+are done by background workers taking jobs from a bounded queue: if workers fall behind, test thread waits for
+a free slot instead of piling up memory. flush() should be called at test teardown to make sure all files are written.
+"""
+import base64
+import os
+import threading
+import Queue
+from io import BytesIO
+from .Helpers import log
+from .GlobalConstants import SCREENSHOT_WORKERS, SCREENSHOT_QUEUE_SIZE, SCREENSHOT_RECOMPRESS
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class ScreenshotService(object):
+    """Saves screenshots in background threads.
+
+    Attributes:
+        - workers (int): Number of background worker threads.
+        - queue_size (int): Max number of screenshots waiting to be written.
+        - recompress (bool): If True and Pillow is installed, PNG files are recompressed with max compression.
+        - errors (list): Errors of screenshots failed since last flush, (file path, error message).
+        - saved (int): Number of screenshots written.
+    """
+
+    def __init__(self, workers=SCREENSHOT_WORKERS, queue_size=SCREENSHOT_QUEUE_SIZE, recompress=SCREENSHOT_RECOMPRESS):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.recompress = recompress and Image is not None
+        self.errors = []
+        self.saved = 0
+        self._queue = Queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._work, name="ScreenshotWorker-" + str(i))
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def capture(self, driver, file_path):
+        """Downloads screenshot from the device and queues it for writing.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - file_path (str): PNG file path. Missing folders are created.
+
+        :Returns:
+            bool: True if screenshot was taken and queued, False if device failed to take it.
+
+        :Usage:
+            DEFAULT_SCREENSHOT_SERVICE.capture(self.driver, self.screenshot_folder + "/test1.png")
+        """
+        self._start()
+        try:
+            payload = driver.get_screenshot_as_base64()
+        except Exception as e:
+            log("Failed to take screenshot " + file_path + ": " + repr(e))
+            return False
+        self._queue.put((payload, file_path))
+        return True
+
+    def _work(self):
+        while True:
+            payload, file_path = self._queue.get()
+            try:
+                self._write(payload, file_path)
+                with self._lock:
+                    self.saved += 1
+            except Exception as e:
+                with self._lock:
+                    self.errors.append((file_path, repr(e)))
+            finally:
+                self._queue.task_done()
+
+    def _write(self, payload, file_path):
+        data = base64.b64decode(payload.encode('ascii') if isinstance(payload, unicode) else payload)
+        if self.recompress:
+            output = BytesIO()
+            Image.open(BytesIO(data)).save(output, format="PNG", optimize=True)
+            data = output.getvalue()
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.exists(folder):
+            try:
+                os.makedirs(folder)
+            except OSError:
+                # created by another worker
+                if not os.path.isdir(folder):
+                    raise
+        with open(file_path, 'wb') as f:
+            f.write(data)
+
+    def flush(self):
+        """Waits until all queued screenshots are written.
+
+        :Returns:
+            list: Errors since last flush, (file path, error message).
+
+        :Usage:
+            DEFAULT_SCREENSHOT_SERVICE.flush()
+        """
+        self._queue.join()
+        with self._lock:
+            errors, self.errors = self.errors, []
+        for file_path, error in errors:
+            log("Failed to save screenshot " + file_path + ": " + error)
+        return errors
+
+
+DEFAULT_SCREENSHOT_SERVICE = ScreenshotService()
+
+
+def save_screenshot(driver, file_path):
+    """Takes screenshot, the file is written in background. See ScreenshotService.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - file_path (str): PNG file path.
+
+    :Usage:
+        save_screenshot(self.driver, self.screenshot_folder + "/test1.png")
+    """
+    log("Saving screenshot " + file_path)
+    return DEFAULT_SCREENSHOT_SERVICE.capture(driver, file_path)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-"
+"""Module contains scroll search: looking for an element on several pages of a scrollable list.
+
+Element is waited for full time on the current page only, unless page snapshot of the current screen shows it's not
+there: then it's only probed, in case the screen is still changing. After each scroll page source is fetched once, it's
+used for two things:
+    - fingerprint of the screen: if it didn't change after scrolling, the end of the list is reached and search
+      in that direction stops;
+    - check of the element in the page snapshot: if locator can be evaluated locally, there is no need to wait for
+      the element on a page which doesn't have it. Otherwise element is waited for a short probe time.
+Search can go in both directions: down to the end or page limit, then up, skipping pages already seen.
+
+scroll_to_top() uses the same end detection to get to the top of a list, swiping pages in batches checked by one
+page source each.
+
+:Usage:
+    result = ScrollSearch(driver, condition, pages_to_search=6, direction="both").run()
+    scroll_to_top(driver)
+"""
+import time
+from .GlobalConstants import SCROLL_PROBE_WAIT, GESTURE_BATCH_PAGES, LIST_HARVEST_MAX_PAGES
+from .Gestures import scroll_pages
+from .PageSnapshot import PageSnapshot
+from .WaitEngine import DEFAULT_WAIT_ENGINE
+from .Logger import LOGGER
+
+SEARCH_DIRECTIONS = ("down", "up", "both")
+
+
+class ScrollSearchResult(object):
+    """Result of scroll search.
+
+    Attributes:
+        - value: Value returned by condition, None if element wasn't found.
+        - found (bool): True if element was found.
+        - pages_scrolled (int): Number of scrolls made.
+        - pages_checked (int): Number of pages element was looked for on, including the first one.
+        - polls (int): Number of live find requests.
+        - elapsed (float): Search time, seconds.
+        - reached_end (list): Directions in which the end of the list was reached.
+    """
+
+    def __init__(self):
+        self.value = None
+        self.found = False
+        self.pages_scrolled = 0
+        self.pages_checked = 0
+        self.polls = 0
+        self.elapsed = 0.0
+        self.reached_end = []
+
+
+class ScrollSearch(object):
+    """Scroll search of an element.
+
+    Attributes:
+        - pages_to_search (int): Max number of pages to check in each direction, including the current one.
+        - direction (str): "down", "up" or "both" (down first, then up).
+        - first_wait (float): Time to wait for element on the current page, seconds.
+        - probe_wait (float): Time to wait for element on each page after scrolling, seconds.
+        - first_miss_wait (float): Time to wait for element on the current page if its snapshot doesn't have it.
+        - snapshot (PageSnapshot): Snapshot of the current screen.
+    """
+
+    def __init__(self, driver, condition, pages_to_search=1, direction="down", first_wait=0, probe_wait=SCROLL_PROBE_WAIT,
+                 locate_in_snapshot=None, wait_engine=DEFAULT_WAIT_ENGINE, snapshot=None, first_miss_wait=None):
+        """Creates search.
+
+        :Args:
+            - driver (WebDriver): Web driver object.
+            - condition (callable): Single live lookup, returns a true value if element is found.
+            - pages_to_search (int): Max number of pages to check in each direction, including the current one.
+            - direction (str): "down", "up" or "both".
+            - first_wait (float): Time to wait for element on the current page, seconds.
+            - probe_wait (float): Time to wait for element on each page after scrolling, seconds.
+            - locate_in_snapshot (callable): Takes PageSnapshot, returns True or False if element is or isn't in it,
+                None if it can't be told locally.
+            - wait_engine (WaitEngine): Engine polling for element.
+            - snapshot (PageSnapshot): Snapshot of the current screen. If it's not set, it's taken before the first
+                wait when more than one page is searched and locate_in_snapshot is set.
+            - first_miss_wait (float): Time to wait for element on the current page if locate_in_snapshot says it's
+                not in the snapshot, seconds. probe_wait if not set.
+        """
+        if direction not in SEARCH_DIRECTIONS:
+            raise ValueError("Unrecognized search direction \"" + str(direction) + "\".")
+        self.driver = driver
+        self.condition = condition
+        self.pages_to_search = pages_to_search
+        self.direction = direction
+        self.first_wait = first_wait
+        self.probe_wait = probe_wait
+        self.locate_in_snapshot = locate_in_snapshot
+        self.wait_engine = wait_engine
+        self.snapshot = snapshot
+        self.first_miss_wait = probe_wait if first_miss_wait is None else first_miss_wait
+
+    def run(self):
+        """Looks for element.
+
+        :Returns:
+            ScrollSearchResult: Result, check found attribute.
+        """
+        result = ScrollSearchResult()
+        start = time.time()
+        try:
+            self._search(result)
+        finally:
+            result.elapsed = time.time() - start
+        LOGGER.debug("Scroll search %s: found= %s; pages checked= %s; pages scrolled= %s; end reached= %s; "
+                     "polls= %s; time= %.2f s", self.direction, result.found, result.pages_checked,
+                     result.pages_scrolled, result.reached_end, result.polls, result.elapsed)
+        return result
+
+    def _wait(self, result, timeout):
+        wait_result = self.wait_engine.until(self.driver, self.condition, timeout)
+        result.polls += wait_result.polls
+        if not wait_result.timed_out:
+            result.value = wait_result.value
+            result.found = True
+        return result.found
+
+    def _take_snapshot(self):
+        return PageSnapshot.capture(self.driver)
+
+    def _search(self, result):
+        result.pages_checked = 1
+        snapshot = self.snapshot
+        if snapshot is None and self.locate_in_snapshot is not None and self.pages_to_search > 1:
+            snapshot = self._take_snapshot()
+        first_wait = self.first_wait
+        if snapshot is not None and self.locate_in_snapshot is not None and self.locate_in_snapshot(snapshot) is False:
+            first_wait = min(first_wait, self.first_miss_wait)
+        if self._wait(result, first_wait) or self.pages_to_search <= 1:
+            return
+
+        directions = ["down", "up"] if self.direction == "both" else [self.direction]
+        fingerprint = (snapshot if snapshot is not None else self._take_snapshot()).fingerprint()
+        seen = set([fingerprint])
+        for direction in directions:
+            pages = 1
+            while pages < self.pages_to_search:
+                try:
+                    self.driver.execute_script("mobile: scroll", {"direction": direction})
+                except Exception as e:
+                    LOGGER.warning("Failed to swipe %s: %s", direction, e)
+                    break
+                result.pages_scrolled += 1
+                snapshot = self._take_snapshot()
+                new_fingerprint = snapshot.fingerprint()
+                if new_fingerprint == fingerprint:
+                    result.reached_end.append(direction)
+                    break
+                fingerprint = new_fingerprint
+                if fingerprint in seen:
+                    # page checked while searching in the other direction
+                    continue
+                seen.add(fingerprint)
+                pages += 1
+                result.pages_checked += 1
+
+                in_snapshot = self.locate_in_snapshot(snapshot) if self.locate_in_snapshot is not None else None
+                if in_snapshot is False:
+                    continue
+                if self._wait(result, self.probe_wait):
+                    return
+
+
+def scroll_to_top(driver, at_top=None, snapshot=None, max_pages=LIST_HARVEST_MAX_PAGES,
+                  batch_pages=GESTURE_BATCH_PAGES):
+    """Scrolls the list up to its top.
+
+    Pages are swiped up in batches, a batch is a single command if chained scrolls are enabled (see Gestures). Page
+    source is fetched once after each batch: the top is reached if at_top says so or the screen didn't change. Batch
+    size is fixed: the last batch, confirming the top, is swiped in vain and costs device time.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - at_top (callable): Takes PageSnapshot, returns True if the list is at the top.
+        - snapshot (PageSnapshot): Snapshot of the current screen, taken if not set.
+        - max_pages (int): Max number of pages to swipe.
+        - batch_pages (int): Number of pages in a batch.
+
+    :Returns:
+        int: Number of pages swiped.
+
+    :Usage:
+        scroll_to_top(self.driver, snapshot=self.current_snapshot())
+    """
+    start = time.time()
+    if snapshot is None:
+        snapshot = PageSnapshot.capture(driver)
+    if at_top is not None and at_top(snapshot):
+        return 0
+
+    fingerprint = snapshot.fingerprint()
+    swiped = 0
+    batches = 0
+    while swiped < max_pages:
+        batch = min(batch_pages, max_pages - swiped)
+        if not scroll_pages(driver, "up", batch):
+            break
+        swiped += batch
+        batches += 1
+        snapshot = PageSnapshot.capture(driver)
+        if at_top is not None and at_top(snapshot):
+            break
+        new_fingerprint = snapshot.fingerprint()
+        if new_fingerprint == fingerprint:
+            break
+        fingerprint = new_fingerprint
+    LOGGER.debug("Scrolled to top: pages swiped= %s; batches= %s; time= %.2f s", swiped, batches, time.time() - start)
+    return swiped
@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-"
+"""Module contains pool of Appium sessions reused by test classes and test runs.
+
+Creating a session bootstraps Instruments/WebDriverAgent on the device, which takes 20-60 s. Pool keeps sessions open
+instead of quitting them after each test class:
+    - released session stays idle in the pool and is handed out to the next test class with the same Appium server
+      and capabilities;
+    - session id is saved to a registry file, so another test process (next run, ParallelRunner worker) reattaches to
+      the still alive session instead of creating a new one;
+    - session is health-checked with a cheap command before being handed out, dead sessions are replaced;
+    - session is recycled (quit and replaced) after SESSION_MAX_COMMANDS commands or SESSION_MAX_AGE seconds.
+Appium server closes sessions idle for longer than newCommandTimeout capability, so it should be long enough to cover
+the gap between test classes and runs, see SESSION_IDLE_TIMEOUT.
+
+:Usage:
+    driver = DEFAULT_SESSION_POOL.acquire(device.url, desired_caps)
+    ...
+    DEFAULT_SESSION_POOL.release(driver)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from appium import webdriver
+from selenium.webdriver.remote.command import Command
+from .GlobalConstants import SESSION_POOL_FOLDER, SESSION_MAX_COMMANDS, SESSION_MAX_AGE, REUSE_SESSIONS
+from .Logger import LOGGER
+from .HttpTransport import create_connection
+
+
+def session_key(url, desired_capabilities):
+    """Returns pool key of Appium server URL and capabilities."""
+    data = json.dumps([url, desired_capabilities], sort_keys=True)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()[:16]
+
+
+class AttachedRemote(webdriver.Remote):
+    """Appium driver attached to an existing session instead of creating a new one.
+
+    :Usage:
+        AttachedRemote(device.url, session_id, capabilities)
+    """
+
+    def __init__(self, command_executor, session_id, capabilities):
+        self._attach_to = (session_id, capabilities)
+        webdriver.Remote.__init__(self, command_executor, capabilities)
+
+    def start_session(self, desired_capabilities, browser_profile=None):
+        self.session_id, self.capabilities = self._attach_to
+        self.w3c = "specificationLevel" in self.capabilities
+
+
+def create_remote(command_executor, desired_capabilities):
+    """Creates driver with a new session, Appium server URL is wrapped into configured HTTP transport."""
+    return webdriver.Remote(create_connection(command_executor), desired_capabilities)
+
+
+def attach_remote(command_executor, session_id, capabilities):
+    """Creates driver of existing session, Appium server URL is wrapped into configured HTTP transport."""
+    return AttachedRemote(create_connection(command_executor), session_id, capabilities)
+
+
+class PooledSession(object):
+    """Session of the pool.
+
+    Attributes:
+        - key (str): Pool key, see session_key().
+        - driver (WebDriver): Driver of the session.
+        - created (float): Session creation time, seconds since epoch.
+        - commands (int): Number of commands sent in the session, by all processes.
+        - in_use (bool): True while session is handed out.
+    """
+
+    def __init__(self, key, driver, created, commands=0):
+        self.key = key
+        self.driver = driver
+        self.created = created
+        self.commands = commands
+        self.in_use = False
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+    def to_dict(self):
+        return {"session_id": self.driver.session_id,
+                "capabilities": self.driver.capabilities,
+                "created": self.created,
+                "commands": self.commands,
+                # process using the session, other processes don't reattach to it
+                "pid": os.getpid() if self.in_use else None}
+
+
+class SessionPool(object):
+    """Pool of Appium sessions.
+
+    Attributes:
+        - registry_folder (str): Folder of registry files, one per pool key.
+        - max_commands (int): Session is recycled after this number of commands.
+        - max_age (float): Session is recycled after this time, seconds.
+        - enabled (bool): If False, acquire() always creates a new session and release() quits it.
+        - created (int): Number of sessions created.
+        - reused (int): Number of sessions handed out again, in this process or by reattaching.
+        - recycled (int): Number of sessions quit because of command count, age or failed health check.
+    """
+
+    def __init__(self, registry_folder=SESSION_POOL_FOLDER, max_commands=SESSION_MAX_COMMANDS,
+                 max_age=SESSION_MAX_AGE, enabled=REUSE_SESSIONS, create_driver=create_remote,
+                 attach_driver=attach_remote):
+        """Creates pool.
+
+        :Args:
+            - registry_folder (str): Folder of registry files.
+            - max_commands (int): Session is recycled after this number of commands.
+            - max_age (float): Session is recycled after this time, seconds.
+            - enabled (bool): If False, sessions are not reused.
+            - create_driver (callable): Creates driver with a new session: (command_executor, desired_capabilities).
+            - attach_driver (callable): Creates driver of existing session: (command_executor, session_id,
+                capabilities).
+        """
+        self.registry_folder = registry_folder
+        self.max_commands = max_commands
+        self.max_age = max_age
+        self.enabled = enabled
+        self.create_driver = create_driver
+        self.attach_driver = attach_driver
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self._idle = {}
+        self._busy = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, command_executor, desired_capabilities):
+        """Returns driver of a healthy session: idle one, reattached one or a new one.
+
+        :Args:
+            - command_executor (str): Appium server URL.
+            - desired_capabilities (dict): Capabilities of the session.
+
+        :Returns:
+            WebDriver: Driver of the session. Should be given back with release().
+        """
+        key = session_key(command_executor, desired_capabilities)
+        session = None
+        if self.enabled:
+            with self._lock:
+                session = self._idle.pop(key, None)
+            if session is None:
+                session = self._reattach(key, command_executor)
+            if session is not None and not self._is_usable(session):
+                self._recycle(session)
+                session = None
+            if session is not None:
+                self.reused += 1
+                LOGGER.info("Reusing Appium session %s: %s commands, %.0f s old.", session.driver.session_id,
+                            session.commands, session.age)
+
+        if session is None:
+            start = time.time()
+            session = self._track(PooledSession(key, self.create_driver(command_executor, desired_capabilities),
+                                                time.time()))
+            self.created += 1
+            LOGGER.info("Appium session %s created in %.1f s.", session.driver.session_id, time.time() - start)
+
+        session.in_use = True
+        with self._lock:
+            self._busy[id(session.driver)] = session
+        self._save(session)
+        return session.driver
+
+    def release(self, driver):
+        """Gives session back to the pool, it stays open for the next test class or run.
+
+        Session is quit if the pool is disabled.
+        """
+        with self._lock:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            LOGGER.warning("Session %s doesn't belong to the pool, quitting it.", driver.session_id)
+            self._quit(driver)
+            return
+        if not self.enabled:
+            self._discard(session)
+            return
+        session.in_use = False
+        self._save(session)
+        with self._lock:
+            previous = self._idle.pop(session.key, None)
+            self._idle[session.key] = session
+        if previous is not None:
+            self._discard(previous)
+
+    def discard(self, driver):
+        """Quits session and removes it from the pool, e.g. after the application got into a broken state."""
+        with self._lock:
+            session = self._busy.pop(id(driver), None)
+        if session is not None:
+            self._discard(session)
+        else:
+            self._quit(driver)
+
+    def close_all(self):
+        """Quits all idle sessions of this process and removes them from registry."""
+        with self._lock:
+            sessions = list(self._idle.values())
+            self._idle.clear()
+        for session in sessions:
+            self._discard(session)
+
+    def log_statistics(self):
+        LOGGER.info("Session pool: %s sessions created, %s reused, %s recycled.", self.created, self.reused,
+                    self.recycled)
+
+    # ------------------ internals -----------------------------------
+    def _is_usable(self, session):
+        if session.commands >= self.max_commands:
+            LOGGER.info("Recycling Appium session %s: %s commands sent.", session.driver.session_id, session.commands)
+            return False
+        if session.age >= self.max_age:
+            LOGGER.info("Recycling Appium session %s: %.0f s old.", session.driver.session_id, session.age)
+            return False
+        try:
+            session.driver.execute(Command.GET_SCREEN_ORIENTATION)
+        except Exception as e:
+            LOGGER.info("Appium session %s failed health check: %s", session.driver.session_id, e)
+            return False
+        return True
+
+    def _reattach(self, key, command_executor):
+        record = self._load(key)
+        if record is None:
+            return None
+        if record.get("pid") not in (None, os.getpid()) and _is_process_alive(record["pid"]):
+            LOGGER.debug("Appium session %s is used by process %s.", record["session_id"], record["pid"])
+            return None
+        try:
+            driver = self.attach_driver(command_executor, record["session_id"], record["capabilities"])
+        except Exception as e:
+            LOGGER.info("Failed to reattach to Appium session %s: %s", record["session_id"], e)
+            self._forget(key)
+            return None
+        LOGGER.debug("Reattached to Appium session %s.", record["session_id"])
+        return self._track(PooledSession(key, driver, record["created"], record["commands"]))
+
+    def _track(self, session):
+        """Counts commands of the session."""
+        execute = session.driver.execute
+
+        def counted_execute(driver_command, params=None):
+            session.commands += 1
+            return execute(driver_command, params)
+
+        session.driver.execute = counted_execute
+        return session
+
+    def _recycle(self, session):
+        self.recycled += 1
+        self._discard(session)
+
+    def _discard(self, session):
+        self._forget(session.key)
+        self._quit(session.driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+            LOGGER.debug("Appium session %s closed.", driver.session_id)
+        except Exception:
+            pass
+
+    def _registry_file(self, key):
+        return os.path.join(self.registry_folder, key + ".json")
+
+    def _load(self, key):
+        try:
+            with open(self._registry_file(key), 'r') as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return None
+
+    def _save(self, session):
+        if not self.enabled:
+            return
+        if not os.path.exists(self.registry_folder):
+            os.makedirs(self.registry_folder)
+        with open(self._registry_file(session.key), 'w') as f:
+            json.dump(session.to_dict(), f)
+
+    def _forget(self, key):
+        try:
+            os.remove(self._registry_file(key))
+        except OSError:
+            pass
+
+
+def _is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+DEFAULT_SESSION_POOL = SessionPool()
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-"
+"""Module records WebDriver traffic of a test run and replays it without a device.
+
+RecordingConnection is a RemoteConnection writing every command sent to Appium server together with server response
+and latency to a session file: gzipped JSON lines, one exchange per line. ReplayServer is a local HTTP server
+answering requests of webdriver.Remote with recorded responses, optionally as slow as the device was.
+
+Replayed run doesn't have to send exactly the same commands. Each request is matched with the next recorded exchange
+with the same method, path and body, recorded exchanges skipped on the way are counted as removed commands and
+requests without a recorded exchange are counted as added ones (answered with an error).
+
+:Usage:
+    # recording
+    driver = webdriver.Remote(RecordingConnection(device.url, "session.jsonl.gz"), desired_caps)
+    # replay
+    server = ReplayServer("session.jsonl.gz", time_scale=0.0).start()
+    driver = webdriver.Remote(server.url, desired_caps)
+"""
+import gzip
+import json
+import string
+import threading
+import time
+from BaseHTTPServer import HTTPServer, BaseHTTPRequestHandler
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from .Logger import LOGGER
+
+SESSION_FILE_FORMAT = 1
+
+# status of "unknown command" response of WebDriver JSON wire protocol, used for requests missing from recording
+STATUS_UNKNOWN_COMMAND = 9
+
+
+def _normalize_body(method, path, body):
+    """Returns request body in comparable form: parsed JSON without session id."""
+    if method != "POST" or path.rstrip("/") == "/session" or not body:
+        return None
+    if isinstance(body, basestring):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body
+    if isinstance(body, dict):
+        body = dict((key, value) for key, value in body.items() if key != "sessionId")
+    return json.dumps(body, sort_keys=True)
+
+
+class RecordingConnection(RemoteConnection):
+    """RemoteConnection saving every command and response to session file.
+
+    Attributes:
+        - session_file (str): Path of the session file. Written as the test goes, closed by close().
+        - exchanges (int): Number of exchanges recorded.
+    """
+
+    def __init__(self, remote_server_addr, session_file, keep_alive=False):
+        """Creates connection to Appium server.
+
+        :Args:
+            - remote_server_addr (str): Appium server URL.
+            - session_file (str): Path of the session file, ".gz" is recommended but not required.
+            - keep_alive (bool): Use HTTP keep-alive.
+
+        :Usage:
+            webdriver.Remote(RecordingConnection(device.url, GlobalConstants.RECORD_SESSION_FILE), desired_caps)
+        """
+        RemoteConnection.__init__(self, remote_server_addr, keep_alive=keep_alive)
+        self.session_file = session_file
+        self.exchanges = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(session_file, 'wb')
+        self._write({"format": SESSION_FILE_FORMAT, "url": remote_server_addr, "recorded": time.time()})
+
+    def _write(self, data):
+        self._file.write(json.dumps(data, separators=(",", ":")) + "\n")
+
+    def execute(self, command, params):
+        method, path_template = self._commands[command]
+        path = string.Template(path_template).substitute(params)
+        start = time.time()
+        response = RemoteConnection.execute(self, command, params)
+        elapsed = time.time() - start
+        with self._lock:
+            self._write({"command": command,
+                         "method": method,
+                         "path": path,
+                         "body": _normalize_body(method, path, params),
+                         "response": response,
+                         "elapsed": round(elapsed, 4)})
+            self.exchanges += 1
+        return response
+
+    def close(self):
+        """Closes session file. Should be called after driver.quit()."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                LOGGER.info("%s WebDriver exchanges recorded to %s", self.exchanges, self.session_file)
+
+
+def load_session(session_file):
+    """Reads session file.
+
+    :Returns:
+        list: Exchanges as dicts: command, method, path, body, response, elapsed.
+    """
+    exchanges = []
+    with gzip.open(session_file, 'rb') as f:
+        header = json.loads(f.readline())
+        if header.get("format") != SESSION_FILE_FORMAT:
+            raise ValueError("Unsupported session file format " + str(header.get("format")))
+        for line in f:
+            if line.strip():
+                exchanges.append(json.loads(line))
+    return exchanges
+
+
+class ReplayServer(object):
+    """Local HTTP server answering WebDriver requests with recorded responses.
+
+    Attributes:
+        - exchanges (list): Recorded exchanges.
+        - time_scale (float): Recorded latency is multiplied by it before answering. 0 - answer at once,
+            1 - as slow as the device was.
+        - matched (int): Requests answered with recorded responses.
+        - added (list): Requests missing from recording, (method, path).
+        - url (str): Server URL to pass to webdriver.Remote. Set by start().
+    """
+
+    def __init__(self, session_file, time_scale=0.0, port=0):
+        self.exchanges = load_session(session_file)
+        self.time_scale = time_scale
+        self.port = port
+        self.matched = 0
+        self.added = []
+        self.url = None
+        self._position = 0
+        self._used = set()
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self):
+        """Starts server in a background thread.
+
+        :Returns:
+            ReplayServer: Server itself.
+        """
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                length = int(self.headers.getheader('content-length') or 0)
+                body = self.rfile.read(length) if length else None
+                response = replay.answer(self.command, self.path, body)
+                data = json.dumps(response)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_DELETE = _answer
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = HTTPServer(("127.0.0.1", self.port), Handler)
+        self.url = "http://127.0.0.1:%s/wd/hub" % self._server.server_port
+        thread = threading.Thread(target=self._server.serve_forever, name="ReplayServer")
+        thread.daemon = True
+        thread.start()
+        LOGGER.info("Replaying %s WebDriver exchanges at %s", len(self.exchanges), self.url)
+        return self
+
+    def stop(self):
+        """Stops server and logs how replayed run differs from recording."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        summary = self.summary()
+        LOGGER.info("Replay finished: %s commands matched, %s added, %s removed.", summary["matched"], summary["added"],
+                    summary["removed"])
+        return summary
+
+    def summary(self):
+        """Returns numbers of matched, added and removed (recorded but not requested) commands."""
+        with self._lock:
+            return {"matched": self.matched, "added": len(self.added),
+                    "removed": len(self.exchanges) - len(self._used)}
+
+    def answer(self, method, path, body):
+        """Finds recorded response for request.
+
+        Recording is searched forward from the last matched exchange, then from the beginning, so repeated requests
+        (polling, page source) get responses in recorded order.
+        """
+        prefix = "/wd/hub"
+        if path.startswith(prefix):
+            path = path[len(prefix):]
+        key = (method, path, _normalize_body(method, path, body))
+        with self._lock:
+            index = self._find(key, self._position, len(self.exchanges))
+            if index is None:
+                index = self._find(key, 0, self._position)
+            if index is None:
+                self.added.append((method, path))
+                LOGGER.warning("Request is missing from recording: %s %s", method, path)
+                return {"status": STATUS_UNKNOWN_COMMAND,
+                        "value": {"message": "Request is missing from recording: " + method + " " + path}}
+            exchange = self.exchanges[index]
+            self._used.add(index)
+            self._position = index + 1
+            self.matched += 1
+        if self.time_scale:
+            time.sleep(exchange["elapsed"] * self.time_scale)
+        return exchange["response"]
+
+    def _find(self, key, start, end):
+        for index in range(start, end):
+            exchange = self.exchanges[index]
+            if (exchange["method"], exchange["path"], exchange["body"]) == key:
+                return index
+        return None
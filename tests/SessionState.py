@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-"
+"""Module keeps client side state of WebDriver sessions to avoid redundant requests to the device."""
+import weakref
+
+# session states by driver object, state is dropped together with the driver
+_session_states = weakref.WeakKeyDictionary()
+
+
+class SessionState(object):
+    """Class represents what is known on the client side about a WebDriver session.
+
+    Attributes:
+        - implicit_wait (float): Implicit wait timeout last sent to the server, seconds. None if unknown.
+        - geometry (DeviceGeometry): Cached window size, orientation and device type. None if not measured yet.
+        - locator_profile (LocatorProfile): Locators used by page objects of the session. None if not bound yet.
+        - element_rects (dict): Cached rectangles of static elements tapped by coordinates, see TapCache.
+        - current_page (type): Page object class the app was last navigated to, see Navigation. None if unknown.
+    """
+
+    def __init__(self):
+        self.implicit_wait = None
+        self.geometry = None
+        self.locator_profile = None
+        self.element_rects = {}
+        self.current_page = None
+
+
+def get_session_state(driver):
+    """Returns state of driver's session, creates a new one for unknown driver.
+
+    :Args:
+        - driver (WebDriver): Web driver object
+
+    :Returns:
+        SessionState: Session state.
+
+    :Usage:
+        get_session_state(self.driver).implicit_wait
+    """
+    state = _session_states.get(driver)
+    if state is None:
+        state = _session_states[driver] = SessionState()
+    return state
+
+
+def reset_session_state(driver):
+    """Forgets everything known about driver's session. Should be called when a new session is started.
+
+    :Usage:
+        reset_session_state(self.driver)
+    """
+    _session_states.pop(driver, None)
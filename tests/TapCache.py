@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-"
+"""Module contains session scoped cache of element rectangles used to tap static elements by coordinates.
+
+Tab bar buttons, segmented controls and navigation bar buttons don't move within a session, yet every tap on them
+looks the element up on the device first. Rectangle of such element is cached the first time the element is
+resolved, later taps are sent to the center of the rectangle without a lookup. Rectangles are kept per session and
+keyed by locator and by locale, device type and orientation of the session's locator profile, so a rectangle
+measured in portrait is not used in landscape.
+
+Taps by coordinates are used only with a verification, a tap which silently missed would leave the app on the wrong
+screen: tab bar and segmented control buttons are checked to be selected in the next page snapshot (see
+PageSnapshot.verify_selected). Cached rectangle is dropped when the tap fails or its verification says it missed,
+the element is looked up and tapped again then.
+
+:Usage:
+    key = rect_key(driver, "ios uiautomation", locator)
+    if not tap_cached_rect(driver, key):
+        element = driver.find_element_by_ios_uiautomation(locator)
+        remember_rect(driver, key, ElementRect.from_element(element))
+        element.click()
+"""
+from selenium.common.exceptions import WebDriverException
+from .Locators import session_locators
+from .SessionState import get_session_state
+from .Logger import LOGGER
+
+
+class ElementRect(object):
+    """Element position and size on the screen.
+
+    Attributes:
+        - x (int): Left edge.
+        - y (int): Top edge.
+        - width (int): Width.
+        - height (int): Height.
+    """
+
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_node(cls, node):
+        """Creates rectangle from page source node attributes.
+
+        :Returns:
+            ElementRect: Rectangle, None if node has no size.
+        """
+        try:
+            rect = cls(int(float(node.get("x"))), int(float(node.get("y"))), int(float(node.get("width"))),
+                       int(float(node.get("height"))))
+        except (TypeError, ValueError):
+            return None
+        return rect if rect.width > 0 and rect.height > 0 else None
+
+    @classmethod
+    def from_element(cls, element):
+        """Creates rectangle from WebElement location and size, two requests to the device.
+
+        :Returns:
+            ElementRect: Rectangle, None if element has no size.
+        """
+        location = element.location
+        size = element.size
+        rect = cls(int(location["x"]), int(location["y"]), int(size["width"]), int(size["height"]))
+        return rect if rect.width > 0 and rect.height > 0 else None
+
+    @property
+    def center(self):
+        return self.x + self.width // 2, self.y + self.height // 2
+
+    def __eq__(self, other):
+        return isinstance(other, ElementRect) and (self.x, self.y, self.width, self.height) == \
+            (other.x, other.y, other.width, other.height)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return "ElementRect(%s, %s, %s, %s)" % (self.x, self.y, self.width, self.height)
+
+
+def rect_key(driver, strategy, locator, index=0):
+    """Returns cache key of element: locator and locale, device type and orientation of session's locator profile."""
+    profile = session_locators(driver)
+    return strategy, locator, index, profile.locale, profile.device_type, profile.orientation
+
+
+def get_cached_rect(driver, key):
+    """Returns cached rectangle of element, None if it's not known."""
+    return get_session_state(driver).element_rects.get(key)
+
+
+def remember_rect(driver, key, rect):
+    """Caches rectangle of element for the session. None rectangle is ignored."""
+    if rect is not None:
+        get_session_state(driver).element_rects[key] = rect
+
+
+def forget_rect(driver, key):
+    """Drops cached rectangle of element."""
+    get_session_state(driver).element_rects.pop(key, None)
+
+
+def tap_cached_rect(driver, key):
+    """Taps center of cached rectangle of element with a single command.
+
+    :Args:
+        - driver (WebDriver): Web driver object.
+        - key (tuple): Element key, see rect_key().
+
+    :Returns:
+        bool: True if tapped. False if rectangle is not cached or the tap failed, rectangle is dropped then.
+    """
+    rect = get_cached_rect(driver, key)
+    if rect is None:
+        return False
+    try:
+        driver.tap([rect.center])
+    except WebDriverException as e:
+        LOGGER.debug("Tap at %r failed: %s", rect, e)
+        forget_rect(driver, key)
+        return False
+    LOGGER.debug("Tapped cached rectangle %r.", rect)
+    return True
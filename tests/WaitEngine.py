@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-"
+"""Module contains client side wait engine used instead of server implicit waits.
+
+Server implicit wait is kept at zero, every lookup is a single immediate request and waiting is done by polling
+on the client side. Implicit wait value sent to the server is tracked per session, so it's never set twice.
+"""
+import random
+import time
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException
+from .SessionState import get_session_state
+from .GlobalConstants import DEFAULT_POLL_INTERVAL, DEFAULT_MAX_POLL_INTERVAL, DEFAULT_POLL_BACKOFF_FACTOR
+
+
+def set_implicit_wait(driver, seconds):
+    """Sets server implicit wait timeout, request is sent only if the value differs from the current one.
+
+    :Args:
+        - driver (WebDriver): Web driver object
+        - seconds (float): Timeout, seconds.
+
+    :Returns:
+        bool: True if request was sent.
+
+    :Usage:
+        set_implicit_wait(self.driver, 0)
+    """
+    state = get_session_state(driver)
+    if state.implicit_wait == seconds:
+        return False
+    driver.implicitly_wait(seconds)
+    state.implicit_wait = seconds
+    return True
+
+
+class FixedPolling(object):
+    """Polls with the same interval.
+
+    :Usage:
+        WaitEngine(FixedPolling(0.5))
+    """
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+
+    def intervals(self):
+        """Generates intervals between polls, seconds."""
+        while True:
+            yield self.interval
+
+
+class ExponentialPolling(object):
+    """Polls often at first, then interval grows by factor after each poll up to max_interval.
+
+    :Usage:
+        WaitEngine(ExponentialPolling(0.1, 2, 1.0))
+    """
+
+    def __init__(self, initial_interval=DEFAULT_POLL_INTERVAL, factor=DEFAULT_POLL_BACKOFF_FACTOR,
+                 max_interval=DEFAULT_MAX_POLL_INTERVAL):
+        self.initial_interval = initial_interval
+        self.factor = factor
+        self.max_interval = max_interval
+
+    def intervals(self):
+        """Generates intervals between polls, seconds."""
+        interval = self.initial_interval
+        while True:
+            yield interval
+            interval = min(interval * self.factor, self.max_interval)
+
+
+class JitteredPolling(object):
+    """Randomizes intervals of another polling strategy by +-jitter share, so parallel sessions don't poll in sync.
+
+    :Usage:
+        WaitEngine(JitteredPolling(ExponentialPolling(), 0.3))
+    """
+
+    def __init__(self, polling=None, jitter=0.25):
+        self.polling = polling or FixedPolling()
+        self.jitter = jitter
+
+    def intervals(self):
+        """Generates intervals between polls, seconds."""
+        for interval in self.polling.intervals():
+            yield interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class WaitResult(object):
+    """Result of waiting for a condition.
+
+    Attributes:
+        - value: Last value returned by condition, None if condition raised ignored exception.
+        - polls (int): Number of times condition was checked.
+        - elapsed (float): Time spent, seconds.
+        - timed_out (bool): True if condition wasn't met before timeout.
+    """
+
+    def __init__(self, value, polls, elapsed, timed_out):
+        self.value = value
+        self.polls = polls
+        self.elapsed = elapsed
+        self.timed_out = timed_out
+
+
+class WaitEngine(object):
+    """Waits for conditions by polling on the client side with server implicit wait set to zero.
+
+    Attributes:
+        - polling: Polling strategy: FixedPolling, ExponentialPolling or JitteredPolling.
+        - ignored_exceptions (tuple): Exceptions raised by condition which mean "not yet".
+    """
+
+    def __init__(self, polling=None,
+                 ignored_exceptions=(NoSuchElementException, StaleElementReferenceException, IndexError)):
+        self.polling = polling or ExponentialPolling()
+        self.ignored_exceptions = ignored_exceptions
+
+    def until(self, driver, condition, timeout):
+        """Checks condition until it returns truthy value or timeout expires.
+
+        Condition is always checked at least once, and once more right at the deadline.
+
+        :Args:
+            - driver (WebDriver): Web driver object, its implicit wait is set to zero if not yet.
+            - condition (callable): Function without arguments, truthy result means condition is met.
+            - timeout (float): Max time to wait, seconds.
+
+        :Returns:
+            WaitResult: Last condition value, number of polls and time spent.
+
+        :Usage:
+            DEFAULT_WAIT_ENGINE.until(self.driver, lambda: self.driver.find_elements_by_xpath("//*"), 5)
+        """
+        set_implicit_wait(driver, 0)
+        start = time.time()
+        deadline = start + timeout
+        intervals = self.polling.intervals()
+        polls = 0
+        while True:
+            polls += 1
+            try:
+                value = condition()
+            except self.ignored_exceptions:
+                value = None
+            now = time.time()
+            if value:
+                return WaitResult(value, polls, now - start, False)
+            if now >= deadline:
+                return WaitResult(value, polls, now - start, True)
+            time.sleep(max(0, min(next(intervals), deadline - now)))
+
+
+DEFAULT_WAIT_ENGINE = WaitEngine()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-"
+"""Tests of screenshot comparison on small synthetic images, no device is needed.
+
+:Usage:
+    python -m unittest tests.test_ImageComparison
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from .ImageComparison import numpy, Image, compare_arrays, compare_images
+
+
+def create_image(height=10, width=10, different_rows=0, different_pixels=0):
+    """Creates black RGB array, the first rows and then the first pixels of the next row are red."""
+    image = numpy.zeros((height, width, 3), dtype=numpy.uint8)
+    image[:different_rows] = (255, 0, 0)
+    image[different_rows, :different_pixels] = (255, 0, 0)
+    return image
+
+
+@unittest.skipIf(numpy is None or Image is None, "numpy and Pillow are not installed")
+class ImageComparisonTests(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.reference_file = self.save(create_image(), "reference.png")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def save(self, image, name):
+        file_path = os.path.join(self.folder, name)
+        Image.fromarray(image).save(file_path)
+        return file_path
+
+    def test_difference_percent_and_file(self):
+        actual_file = self.save(create_image(different_pixels=5), "actual.png")
+        difference_file = os.path.join(self.folder, "temp", "difference.png")
+
+        result = compare_images(actual_file, self.reference_file, difference_file=difference_file, allowed_percent=10)
+
+        self.assertAlmostEqual(result.difference_percent, 5.0)
+        self.assertTrue(result.is_similar)
+        self.assertFalse(result.stopped_early)
+        self.assertEqual(result.difference_file, difference_file)
+        difference = numpy.asarray(Image.open(difference_file).convert("RGB"))
+        self.assertEqual(difference[0, 4].tolist(), [255, 0, 0])
+        self.assertEqual(difference[0, 5].tolist(), [0, 0, 0])
+
+    def test_identical_images(self):
+        actual_file = self.save(create_image(), "actual.png")
+        difference_file = os.path.join(self.folder, "difference.png")
+
+        result = compare_images(actual_file, self.reference_file, difference_file=difference_file)
+
+        self.assertEqual(result.difference_percent, 0.0)
+        self.assertTrue(result.is_similar)
+        self.assertIsNone(result.difference_file)
+        self.assertFalse(os.path.exists(difference_file))
+
+    def test_stops_early_above_threshold(self):
+        # the first band of 2 rows already has 20% different pixels
+        actual = create_image(different_rows=5)
+
+        percent, stopped_early, _ = compare_arrays(actual, create_image(), allowed_percent=3, tile_rows=2)
+        self.assertTrue(stopped_early)
+        self.assertAlmostEqual(percent, 20.0)
+
+        percent, stopped_early, _ = compare_arrays(actual, create_image(), allowed_percent=3, tile_rows=2,
+                                                   stop_early=False)
+        self.assertFalse(stopped_early)
+        self.assertAlmostEqual(percent, 50.0)
+
+    def test_pixel_tolerance(self):
+        actual = create_image()
+        actual[0, 0] = (8, 8, 8)
+        actual[0, 1] = (9, 0, 0)
+
+        percent, _, mask = compare_arrays(actual, create_image(), pixel_tolerance=8)
+        self.assertAlmostEqual(percent, 1.0)
+        self.assertEqual(mask[0, :2].tolist(), [False, True])
+
+    def test_size_mismatch(self):
+        percent, stopped_early, mask = compare_arrays(create_image(width=12), create_image())
+        self.assertEqual(percent, 100.0)
+        self.assertFalse(stopped_early)
+        self.assertIsNone(mask)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,9 +3,22 @@ import unittest
 from time import sleep
 from appium import webdriver
 import GlobalConstants
-from Helpers import log, detect_device_type, verify_app_launched, set_device_orientation
-from PageObjects.Books import BooksPageObject
-from Locators import set_tablet
+from Helpers import log, detect_device_type, set_device_orientation
+from DeviceGeometry import get_device_geometry
+from AppReset import AppResetManager
+from Devices import DeviceDescriptor
+from Screenshots import DEFAULT_SCREENSHOT_SERVICE, save_screenshot
+from PageObjects.Books.BooksPageObject import BooksPageObject, BooksFavouritesPageObject
+from PageObjects.Authors.AuthorsPageObject import AuthorsPageObject
+from Locators import bind_locator_profile, get_locator_profile
+from WaitEngine import set_implicit_wait
+from Logger import LOGGER
+from Instrumentation import instrument_driver, DEFAULT_COMMAND_STATISTICS
+from SessionRecording import RecordingConnection, ReplayServer
+from SessionPool import DEFAULT_SESSION_POOL
+from HttpTransport import PooledConnection
+from LookupLatency import DEFAULT_TIMEOUT_POLICY
+from Navigation import DEFAULT_NAVIGATION_GRAPH
 
 
 class OurTests(unittest.TestCase):
@@ -15,66 +28,106 @@ class OurTests(unittest.TestCase):
         """Method is called once before all tests execution"""
         desired_caps={}
 
+        # device is set by ParallelRunner through environment, defaults are used for a single device run
+        device = cls.device = DeviceDescriptor.from_environment()
+
         desired_caps['app'] = GlobalConstants.HOST_APP_LOCATION
         desired_caps['bundleId'] = GlobalConstants.BUNDLE_ID
-        # desired_caps['udid'] = '3089538653865389653485634856349346348563'   #iPhone - sample
-        desired_caps['udid'] = '3874653487563409857349057349053745092375903'  # iPad - sample
-        desired_caps['platformVersion'] = '9.3.3'
+        desired_caps['udid'] = device.udid
+        desired_caps['platformVersion'] = device.platform_version
         desired_caps['platformName'] = 'iOS'
-        desired_caps['deviceName'] = "My iPhone"
+        desired_caps['deviceName'] = device.name
         desired_caps['nativeInstrumentsLib'] = 'true'
 
         # desired_caps['fullReset'] = 'true'
         # desired_caps['noReset'] = 'true'
         # desired_caps['newCommandTimeout'] = '100'
+        if DEFAULT_SESSION_POOL.enabled:
+            # pooled session stays idle between test classes and runs
+            desired_caps['newCommandTimeout'] = GlobalConstants.SESSION_IDLE_TIMEOUT
         # desired_caps['launchTimeout'] = 3000
         # experimental caps
         # desired_caps['autoAcceptAlerts'] = 'true'
 
-        cls.driver = webdriver.Remote('http://localhost:4723/wd/hub', desired_caps)
+        # traffic can be recorded to a session file or served from one instead of the device
+        cls.replay_server = None
+        command_executor = None
+        if GlobalConstants.REPLAY_SESSION_FILE:
+            cls.replay_server = ReplayServer(GlobalConstants.REPLAY_SESSION_FILE,
+                                             time_scale=GlobalConstants.REPLAY_TIME_SCALE).start()
+            command_executor = cls.replay_server.url
+        elif GlobalConstants.RECORD_SESSION_FILE:
+            command_executor = RecordingConnection(device.url, GlobalConstants.RECORD_SESSION_FILE)
+
+        # recorded and replayed sessions are not shared, otherwise a warm session is taken from the pool
+        cls.is_pooled_session = command_executor is None
+        if cls.is_pooled_session:
+            cls.driver = instrument_driver(DEFAULT_SESSION_POOL.acquire(device.url, desired_caps))
+        else:
+            cls.driver = instrument_driver(webdriver.Remote(command_executor, desired_caps))
+        cls.reset_manager = AppResetManager()
 
     def setUp(self):
         """Method is called before each test execution"""
 
-        # restart app
-        log("Trying to close the app...")
-        try:
-            self.driver.close_app()
-            log("App is closed!")
-        except:
-            log("Cant close the app!")
-        sleep(3)
-        log("Trying to launch the app...")
-        try:
-            self.driver.launch_app()
-            log("App is launched!")
-        except:
-            log("Cant launch the app!")
-
-
+        # keep debug records of this test only, they are written to file if the test fails
+        LOGGER.clear_ring()
         log("This is before_each setup")
 
-        # verify the app is started correctly
-        self.assertTrue(verify_app_launched(self.driver), "Application didn't start successfully! Test failed!")
-
         self.screenshot_folder = GlobalConstants.DEFAULT_LOCAL_RESULTS_FOLDER
 
-        self.driver.implicitly_wait(GlobalConstants.DEFAULT_WAIT_FOR_ELEMENT)
+        # page elements wait by polling, server implicit wait stays zero
+        set_implicit_wait(self.driver, 0)
 
         self.device_type = detect_device_type(self.driver)
-        if self.device_type == "Tablet":
-            set_tablet()
+        # locators of device's locale and form factor, used by this session only; home page check of reset uses them
+        bind_locator_profile(self.driver, get_locator_profile(locale=self.device.locale, device_type=self.device_type,
+                                                              orientation=get_device_geometry(self.driver).orientation))
+
+        # bring the app to home page, relaunch only if cheaper ways fail
+        self.assertTrue(self.reset_manager.reset(self.driver).is_successful,
+                        "Application didn't start successfully! Test failed!")
 
         log("Test setup finished.")
 
+    def tearDown(self):
+        """Method is called after each test execution"""
+        # wait for screenshots written in background
+        DEFAULT_SCREENSHOT_SERVICE.flush()
+
+        # write debug log of failed test
+        result = getattr(self, '_resultForDoCleanups', None)
+        if result is not None and any(test is self for test, _ in result.failures + result.errors):
+            log_file = GlobalConstants.TEST_LOGS_FOLDER + self._testMethodName + ".log"
+            LOGGER.dump_ring(log_file)
+            log("Test failed, debug log saved to " + log_file)
+        LOGGER.flush()
+
     @classmethod
     def tearDownClass(cls):
-        if cls.driver:
+        cls.reset_manager.log_statistics()
+        DEFAULT_COMMAND_STATISTICS.log_summary()
+        DEFAULT_COMMAND_STATISTICS.export(GlobalConstants.COMMAND_STATISTICS_FILE % cls.device.udid)
+        DEFAULT_TIMEOUT_POLICY.log_summary()
+        DEFAULT_TIMEOUT_POLICY.store.flush()
+        DEFAULT_NAVIGATION_GRAPH.log_statistics()
+        DEFAULT_NAVIGATION_GRAPH.store.flush()
+        if cls.driver and cls.is_pooled_session:
+            if isinstance(cls.driver.command_executor, PooledConnection):
+                cls.driver.command_executor.statistics.log_summary()
+            DEFAULT_SESSION_POOL.release(cls.driver)
+            DEFAULT_SESSION_POOL.log_statistics()
+        elif cls.driver:
             try:
                 cls.driver.quit()
                 log("Driver session closed.")
             except:
                 pass
+        if cls.driver and isinstance(cls.driver.command_executor, RecordingConnection):
+            cls.driver.command_executor.close()
+        if cls.replay_server is not None:
+            cls.replay_server.stop()
+        LOGGER.flush()
 
 # -------------------------- ready tests ----------------------------------
     def test_1_is_installed(self):
@@ -86,19 +139,18 @@ class OurTests(unittest.TestCase):
         books_page.open_books_more_menu()
         books_page.close_books_more_menu()
 
-        self.driver.save_screenshot(self.screenshot_folder + "/test1.png")
+        save_screenshot(self.driver, self.screenshot_folder + "/test1.png")
 
         log("Test \"" + self._testMethodName + "\" passed.")
 
     def test_2_navigation(self):
         log("Test \"" + self._testMethodName + "\" started.")
 
-        # initiate main objects: books page and bottom navigation menu
+        # initiate main objects: books page
         books_page = BooksPageObject(self.driver)
-        bottom_menu = BottomMenuPanePageObject(self.driver, device_type=self.device_type)
 
         sleep(1)
-        self.driver.save_screenshot(self.screenshot_folder + "/Navigation_Books.png")
+        save_screenshot(self.driver, self.screenshot_folder + "/Navigation_Books.png")
 
         # books page
         books_page.open_recent_read()
@@ -107,10 +159,11 @@ class OurTests(unittest.TestCase):
         books_page.open_books_more_menu()
         books_page.close_books_more_menu()
 
-        # authors page
-        authors_page = bottom_menu.open_authors_page()
+        # authors page and back to favourites, along the cheapest route
+        authors_page = DEFAULT_NAVIGATION_GRAPH.navigate(self.driver, AuthorsPageObject)
         sleep(1)
-        self.driver.save_screenshot(self.screenshot_folder + "/Navigation_Authors.png")
+        save_screenshot(self.driver, self.screenshot_folder + "/Navigation_Authors.png")
+        DEFAULT_NAVIGATION_GRAPH.navigate(self.driver, BooksFavouritesPageObject)
 
         log("Test \"" + self._testMethodName + "\" passed.")
 